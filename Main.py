@@ -1,7 +1,13 @@
 from chuc_nang import PlateRecognizer
 from giao_dien import PlateUI
+from cau_hinh import load_config
+import chi_so
 
 if __name__ == "__main__":
-    recognizer = PlateRecognizer()
+    config = load_config(warmup=True)
+    # Bật /metrics và log chỉ số nếu được cấu hình (trước khi tạo bộ nhận diện)
+    chi_so.setup(config)
+    # Làm nóng mô hình ở luồng nền trong lúc giao diện đang mở
+    recognizer = PlateRecognizer(config=config)
     app = PlateUI(recognizer)
     app.run()
\ No newline at end of file
@@ -0,0 +1,143 @@
+import collections
+import tkinter as tk
+from tkinter import Frame, Scrollbar, ttk
+
+# =====================================================================
+# BẢNG LỊCH SỬ NHẬN DIỆN (ẢO HOÁ, CÓ GIỚI HẠN)
+# ---------------------------------------------------------------------
+# - Dữ liệu nằm trong HistoryModel: bộ đệm vòng giữ tối đa `capacity`
+#   dòng mới nhất (dòng cũ đã được lưu ở kho sự kiện, xem kho_su_kien.py).
+# - Treeview chỉ có đúng `visible_rows` dòng được tạo sẵn; cuộn bảng chỉ
+#   đổi nội dung các dòng này (lấy theo trang từ HistoryModel).
+# - Dòng mới được gom lại và vẽ tối đa một lần mỗi refresh_ms, nên bộ nhớ
+#   và chi phí giao diện không tăng theo thời gian chạy.
+# =====================================================================
+
+
+class HistoryModel:
+    def __init__(self, capacity=1000):
+        """Bộ đệm vòng giữ `capacity` dòng lịch sử mới nhất."""
+        self.capacity = capacity
+        self._rows = collections.deque(maxlen=capacity)
+        # Tổng số dòng đã thêm (kể cả dòng đã bị đẩy ra khỏi bộ đệm)
+        self.total = 0
+
+    def append(self, row):
+        self._rows.append(row)
+        self.total += 1
+
+    def __len__(self):
+        return len(self._rows)
+
+    def page(self, start, count):
+        """Lấy `count` dòng bắt đầu từ vị trí `start` (0 = cũ nhất còn giữ)."""
+        start = max(0, start)
+        end = min(len(self._rows), start + count)
+        return [self._rows[i] for i in range(start, end)]
+
+
+class HistoryView:
+    def __init__(self, parent, columns, model=None, visible_rows=8, refresh_ms=250):
+        """
+        Bảng lịch sử ảo hoá.
+            - columns: danh sách (khoá, tiêu đề, độ rộng)
+            - model: HistoryModel (mặc định tạo mới)
+            - visible_rows: số dòng hiển thị (cũng là số item của Treeview)
+            - refresh_ms: khoảng gom cập nhật tối thiểu (ms)
+        """
+        self.model = model or HistoryModel()
+        self.visible_rows = visible_rows
+        self.refresh_ms = refresh_ms
+
+        # Vị trí dòng đầu tiên đang hiển thị và có bám theo dòng mới nhất không
+        self.offset = 0
+        self.follow_tail = True
+        self._refresh_pending = False
+
+        self.frame = Frame(parent, bg="white", bd=1, relief="solid")
+        self.scrollbar = Scrollbar(self.frame, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.table = ttk.Treeview(
+            self.frame,
+            columns=[key for key, _, _ in columns],
+            show="headings",
+            height=visible_rows,
+        )
+        self.table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        for key, heading, width in columns:
+            self.table.heading(key, text=heading)
+            self.table.column(key, width=width, anchor="center")
+
+        # Tạo sẵn các dòng hiển thị, sau này chỉ đổi nội dung
+        self._items = [self.table.insert("", "end", values=()) for _ in range(visible_rows)]
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.table.bind(sequence, self._on_wheel)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # -----------------------------------------------------------------
+    # THÊM DÒNG (GOM CẬP NHẬT)
+    # -----------------------------------------------------------------
+    def push(self, row):
+        """Thêm một dòng; bảng được vẽ lại sau tối đa refresh_ms."""
+        full = len(self.model) == self.model.capacity
+        self.model.append(row)
+        # Bộ đệm đầy: mọi dòng dịch lên một vị trí, giữ nguyên nội dung đang xem
+        if full and not self.follow_tail:
+            self.offset = max(0, self.offset - 1)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.table.after(self.refresh_ms, self.refresh)
+
+    # -----------------------------------------------------------------
+    # VẼ LẠI CÁC DÒNG HIỂN THỊ
+    # -----------------------------------------------------------------
+    def _max_offset(self):
+        return max(0, len(self.model) - self.visible_rows)
+
+    def refresh(self):
+        """Đổ trang hiện tại vào các dòng có sẵn và cập nhật thanh cuộn."""
+        self._refresh_pending = False
+        if self.follow_tail:
+            self.offset = self._max_offset()
+        self.offset = min(self.offset, self._max_offset())
+
+        rows = self.model.page(self.offset, self.visible_rows)
+        for i, item in enumerate(self._items):
+            values = rows[i] if i < len(rows) else ()
+            if self.table.item(item, "values") != tuple(str(v) for v in values):
+                self.table.item(item, values=values)
+
+        total = len(self.model)
+        if total <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.visible_rows) / total)
+
+    # -----------------------------------------------------------------
+    # CUỘN BẢNG
+    # -----------------------------------------------------------------
+    def _scroll_to(self, offset):
+        self.offset = max(0, min(int(offset), self._max_offset()))
+        self.follow_tail = self.offset >= self._max_offset()
+        self.refresh()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(round(float(value) * len(self.model)))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self._scroll_to(self.offset + int(value) * step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self.offset - 3)
+        else:
+            self._scroll_to(self.offset + 3)
+        return "break"  # Không để Treeview tự cuộn (chỉ có visible_rows dòng)
@@ -1,42 +1,5 @@
-BIEN_SO_MAP = {
-    "11": "Cao Bang",
-    "12": "Lang Son",
-    "14": "Quang Ninh",
-    "99": "Bac Ninh", "98": "Bac Ninh",
-    "22": "Tuyen Quang", "23": "Tuyen Quang",
-    "24": "Lao Cai", "21": "Lao Cai",
-    "25": "Lai Chau",
-    "27": "Dien Bien",
-    "26": "Son La",
-    "20": "Thai Nguyen", "97": "Thai Nguyen",
-    "19": "Phu Tho", "28": "Phu Tho", "88": "Phu Tho",
-    "29": "Ha Noi", "30": "Ha Noi", "31": "Ha Noi", "32": "Ha Noi", "33": "Ha Noi", "40": "Ha Noi",
-    "15": "Hai Phong", "16": "Hai Phong", "34": "Hai Phong",
-    "89": "Hung Yen", "17": "Hung Yen",
-    "35": "Ninh Binh", "18": "Ninh Binh", "90": "Ninh Binh",
-    "36": "Thanh Hoa",
-    "37": "Nghe An",
-    "38": "Ha Tinh",
-    "74": "Quang Tri", "73": "Quang Tri",
-    "75": "TP Hue",
-    "43": "Da Nang", "92": "Da Nang",
-    "76": "Quang Ngai", "82": "Quang Ngai",
-    "81": "Gia Lai", "77": "Gia Lai",
-    "47": "Dak Lak", "78": "Dak Lak",
-    "79": "Khanh Hoa", "85": "Khanh Hoa",
-    "49": "Lam Dong", "48": "Lam Dong", "86": "Lam Dong",
-    "60": "Dong Nai", "39": "Dong Nai", "93": "Dong Nai",
-    "41": "TP Ho Chi Minh", "50": "TP Ho Chi Minh",
-    "51": "TP Ho Chi Minh", "52": "TP Ho Chi Minh",
-    "53": "TP Ho Chi Minh", "54": "TP Ho Chi Minh",
-    "55": "TP Ho Chi Minh", "56": "TP Ho Chi Minh",
-    "57": "TP Ho Chi Minh", "58": "TP Ho Chi Minh",
-    "59": "TP Ho Chi Minh", "61": "TP Ho Chi Minh",
-    "62": "Tay Ninh", "70": "Tay Ninh",
-    "66": "Dong Thap", "63": "Dong Thap",
-    "65": "Can Tho", "83": "Can Tho", "95": "Can Tho",
-    "64": "Vinh Long", "71": "Vinh Long", "84": "Vinh Long",
-    "69": "Ca Mau", "94": "Ca Mau",
-    "68": "An Giang", "67": "An Giang",
-    "80": "Cuc CSGT"
-}
+from tinh_thanh import PROVINCES
+
+# Bản đồ mã biển số → tên địa phương KHÔNG DẤU (dùng cho cv2.putText).
+# Sinh từ danh mục tinh_thanh.PROVINCES; sửa tên / mã ở tinh_thanh.py.
+BIEN_SO_MAP = {code: p.ascii_name for p in PROVINCES for code in p.codes}
@@ -0,0 +1,99 @@
+import difflib
+
+# =====================================================================
+# BIỂU QUYẾT THEO TỪNG KÝ TỰ ĐỂ XÁC NHẬN BIỂN SỐ
+# ---------------------------------------------------------------------
+# - Thay vì cần 3 chuỗi giống hệt nhau, mỗi vị trí ký tự được biểu quyết
+#   riêng: độ tin cậy OCR của mỗi lần đọc được cộng dồn cho ký tự ứng
+#   viên tại vị trí đó.
+# - Một ký tự bị đọc nhầm (8/B, 0/D, ...) chỉ làm giảm phiếu tại vị trí
+#   đó, không xoá toàn bộ tiến trình xác nhận.
+# - Các lần đọc được nhóm theo độ dài chuỗi; lần đọc có độ dài khác
+#   (thừa/thiếu ký tự) được căn chỉnh với chuỗi đồng thuận hiện tại để
+#   vẫn góp phiếu cho các vị trí khớp.
+# =====================================================================
+
+
+class CharVoter:
+    def __init__(self, min_weight=1.5, min_share=0.6):
+        """
+        Khởi tạo bộ biểu quyết.
+            - min_weight: tổng độ tin cậy tối thiểu của ký tự thắng ở mỗi vị trí
+            - min_share: tỉ lệ tối thiểu của ký tự thắng so với tổng phiếu tại vị trí
+        """
+        self.min_weight = min_weight
+        self.min_share = min_share
+        # Độ dài chuỗi → danh sách vị trí, mỗi vị trí là {ký tự: tổng độ tin cậy}
+        self.buckets = {}
+        # Độ dài chuỗi → tổng độ tin cậy của các lần đọc có độ dài đó
+        self.length_weight = {}
+        self.reads = 0
+        self.confidence_sum = 0.0
+
+    def _best_length(self):
+        if not self.length_weight:
+            return None
+        return max(self.length_weight, key=self.length_weight.get)
+
+    def consensus(self):
+        """Chuỗi đồng thuận hiện tại (ký tự nhiều phiếu nhất ở mỗi vị trí)."""
+        length = self._best_length()
+        if length is None:
+            return ""
+        return "".join(max(pos, key=pos.get) for pos in self.buckets[length])
+
+    # -----------------------------------------------------------------
+    # THÊM MỘT LẦN ĐỌC
+    # -----------------------------------------------------------------
+    def add(self, text, confidence):
+        """Cộng phiếu của một lần đọc OCR (text, độ tin cậy 0..1)."""
+        if not text:
+            return
+        confidence = max(float(confidence), 1e-3)
+        self.reads += 1
+        self.confidence_sum += confidence
+
+        reference = self.consensus()
+        length = len(text)
+        bucket = self.buckets.setdefault(length, [{} for _ in range(length)])
+        self.length_weight[length] = self.length_weight.get(length, 0.0) + confidence
+
+        for pos, ch in zip(bucket, text):
+            pos[ch] = pos.get(ch, 0.0) + confidence
+
+        # Lần đọc lệch độ dài: căn chỉnh với chuỗi đồng thuận để góp phiếu
+        # cho các vị trí khớp (khối bằng nhau / thay thế cùng độ dài)
+        if reference and len(reference) != length:
+            target = self.buckets[len(reference)]
+            matcher = difflib.SequenceMatcher(None, reference, text, autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == "equal" or (tag == "replace" and i2 - i1 == j2 - j1):
+                    for i, j in zip(range(i1, i2), range(j1, j2)):
+                        target[i][text[j]] = target[i].get(text[j], 0.0) + confidence
+
+    # -----------------------------------------------------------------
+    # KẾT QUẢ
+    # -----------------------------------------------------------------
+    def result(self):
+        """
+        Trả về (biển số, độ tin cậy tổng hợp) khi MỌI vị trí đều vượt ngưỡng,
+        ngược lại trả về None.
+        Độ tin cậy tổng hợp = tỉ lệ đồng thuận thấp nhất giữa các vị trí
+        × độ tin cậy OCR trung bình của các lần đọc.
+        """
+        length = self._best_length()
+        if not length:
+            return None
+
+        chars, shares = [], []
+        for pos in self.buckets[length]:
+            ch = max(pos, key=pos.get)
+            weight = pos[ch]
+            share = weight / sum(pos.values())
+            if weight < self.min_weight or share < self.min_share:
+                return None
+            chars.append(ch)
+            shares.append(share)
+
+        confidence = min(shares) * (self.confidence_sum / self.reads)
+        return "".join(chars), round(confidence, 4)
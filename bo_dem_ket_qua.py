@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from bo_nhan_dang import metadata_path
+from bo_phat_hien import exported_model_path
+
+# =====================================================================
+# BỘ ĐỆM KẾT QUẢ NHẬN DIỆN ẢNH TĨNH (TRÊN ĐĨA, LRU)
+# ---------------------------------------------------------------------
+# - Khoá = băm nội dung ảnh (không phải đường dẫn): cùng một ảnh bằng
+#   chứng mở lại, đổi tên hay chép sang thư mục khác vẫn trúng bộ đệm.
+# - Mỗi mục gắn "phiên bản mô hình": băm của các file mô hình đang dùng
+#   (best.pt hoặc mô hình ONNX / OpenVINO đã xuất theo detector_backend,
+#   mô hình OCR ONNX và bảng ký tự .json khi ocr_backend = onnxruntime)
+#   cùng các cấu hình ảnh hưởng tới kết quả (backend, ngưỡng, chế độ
+#   OCR...). Khi một file mô hình đổi, phiên bản đổi và các mục cũ bị xoá
+#   lúc mở bộ đệm.
+# - Băm của mỗi file chỉ tính lại khi kích thước / mtime của file thay
+#   đổi (lưu trong bảng meta).
+# - Giới hạn dung lượng: vượt max_bytes thì xoá các mục lâu chưa dùng
+#   nhất (LRU theo thời điểm dùng gần nhất).
+# - SQLite, một kết nối dùng chung có khoá: an toàn khi nhiều luồng
+#   nhận diện cùng dùng.
+# =====================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key       TEXT PRIMARY KEY,
+    version   TEXT NOT NULL,
+    value     TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS meta (
+    path   TEXT PRIMARY KEY,
+    size   INTEGER,
+    mtime  REAL,
+    digest TEXT
+);
+"""
+
+# Cấu hình ảnh hưởng tới kết quả nhận diện ảnh tĩnh
+VERSION_KEYS = ("detector_backend", "detector_path", "conf_threshold", "iou_threshold", "imgsz",
+                "ocr_backend", "ocr_model_path", "ocr_mode", "ocr_charset", "ocr_languages",
+                "preprocess", "crop_padding")
+
+
+def content_hash(data):
+    """Băm nội dung (bytes) của ảnh."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_files(config):
+    """Các file mô hình đang dùng theo cấu hình (file chưa có thì bỏ qua)."""
+    backend = config["detector_backend"]
+    paths = [config["model_path"] if backend == "torch" else exported_model_path(config, backend)]
+    if config["ocr_backend"] == "onnxruntime":
+        paths += [config["ocr_model_path"], metadata_path(config["ocr_model_path"])]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            # Mô hình OpenVINO xuất ra thư mục (.xml + .bin)
+            files += sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if os.path.isfile(os.path.join(path, name)))
+        elif os.path.isfile(path):
+            files.append(path)
+    return files
+
+
+class ResultCache:
+    def __init__(self, path, config, max_bytes=64 * 1024 * 1024):
+        """
+        Mở (hoặc tạo) bộ đệm kết quả.
+            - path: file SQLite của bộ đệm
+            - config: cấu hình đang dùng (lấy các file mô hình và VERSION_KEYS)
+            - max_bytes: dung lượng tối đa của các kết quả lưu trong bộ đệm
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Thống kê
+        self.hits = 0
+        self.misses = 0
+
+        self.version = self._model_version(config)
+        with self._lock, self._conn:
+            # Kết quả của mô hình / cấu hình cũ không còn đúng
+            self._conn.execute("DELETE FROM entries WHERE version != ?", (self.version,))
+            self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _digest(self, path):
+        """Băm nội dung file, dùng lại băm đã lưu nếu kích thước / mtime không đổi."""
+        stat = os.stat(path)
+        row = self._conn.execute("SELECT size, mtime, digest FROM meta WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            return row[2]
+        digest = _file_digest(path)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?)",
+                               (path, stat.st_size, stat.st_mtime, digest))
+        return digest
+
+    def _model_version(self, config):
+        """Phiên bản = băm các file mô hình đang dùng + các cấu hình ảnh hưởng tới kết quả."""
+        parts = {key: config.get(key) for key in VERSION_KEYS}
+        parts["models"] = {path: self._digest(path) for path in model_files(config)}
+        return content_hash(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"))
+
+    # -----------------------------------------------------------------
+    # TRA CỨU / LƯU
+    # -----------------------------------------------------------------
+    def get(self, key):
+        """Kết quả đã lưu cho khoá (băm nội dung ảnh), None nếu chưa có."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ? AND version = ?",
+                                     (key, self.version)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        """Lưu kết quả (đối tượng JSON được) rồi xoá mục cũ nếu vượt dung lượng."""
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                               (key, self.version, data, size, time.time()))
+            self._total += size - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Xoá mục lâu chưa dùng nhất tới khi còn khoảng 90% dung lượng cho phép."""
+        target = int(self.max_bytes * 0.9)
+        freed, victims = 0, []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if self._total - freed <= target:
+                break
+            victims.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._total -= freed
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,119 @@
+import time
+import cv2
+import numpy as np
+
+# =====================================================================
+# BỘ ĐỆM KẾT QUẢ OCR THEO TỪNG HỘP BIỂN SỐ
+# ---------------------------------------------------------------------
+# - YOLO chỉ chạy định kỳ, giữa các lần chạy hộp biển số gần như không đổi.
+# - Mỗi biển số được nhận dạng bằng track ID (nếu có) hoặc IoU với các
+#   hộp đã lưu, kèm "vân tay" (ảnh xám thu nhỏ) của vùng cắt để biết ảnh
+#   có thay đổi thật hay không.
+# - Chỉ chạy lại OCR khi vùng cắt thay đổi hoặc mục trong bộ đệm hết hạn.
+# - PlateRecognizer chỉ tra bộ đệm cho track ĐÃ xác nhận; track đang biểu
+#   quyết luôn được đọc lại để có phiếu mới ở mỗi khung.
+# =====================================================================
+
+
+def _iou(a, b):
+    """Tính IoU giữa hai hộp (x1, y1, x2, y2)."""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / float(area_a + area_b - inter)
+
+
+class OCRCache:
+    def __init__(self, max_age=2.0, diff_threshold=10.0, iou_threshold=0.5,
+                 fingerprint_size=(32, 16), max_entries=32):
+        """
+        Khởi tạo bộ đệm OCR.
+            - max_age: thời gian sống tối đa của một mục (giây)
+            - diff_threshold: sai khác trung bình (0-255) giữa hai vân tay
+              để coi là vùng cắt đã thay đổi
+            - iou_threshold: IoU tối thiểu để coi hai hộp là cùng một biển số
+            - fingerprint_size: kích thước ảnh xám thu nhỏ dùng làm vân tay
+            - max_entries: số mục tối đa giữ trong bộ đệm
+        """
+        self.max_age = max_age
+        self.diff_threshold = diff_threshold
+        self.iou_threshold = iou_threshold
+        self.fingerprint_size = fingerprint_size
+        self.max_entries = max_entries
+
+        # Mỗi mục: {"track_id", "box", "fingerprint", "value", "time"}
+        self.entries = []
+        # Thống kê để đo hiệu quả bộ đệm
+        self.hits = 0
+        self.misses = 0
+
+    # -----------------------------------------------------------------
+    # VÂN TAY VÙNG CẮT
+    # -----------------------------------------------------------------
+    def fingerprint(self, crop):
+        """Thu nhỏ vùng cắt thành ảnh xám cố định để so sánh nhanh."""
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        small = cv2.resize(gray, self.fingerprint_size, interpolation=cv2.INTER_AREA)
+        return small.astype(np.int16)
+
+    def _find(self, box, track_id=None):
+        """Tìm mục theo track ID, nếu không có thì theo hộp trùng nhiều nhất."""
+        if track_id is not None:
+            for entry in self.entries:
+                if entry["track_id"] == track_id:
+                    return entry
+            return None
+        best, best_iou = None, self.iou_threshold
+        for entry in self.entries:
+            overlap = _iou(entry["box"], box)
+            if overlap >= best_iou:
+                best, best_iou = entry, overlap
+        return best
+
+    # -----------------------------------------------------------------
+    # TRA CỨU / LƯU KẾT QUẢ
+    # -----------------------------------------------------------------
+    def lookup(self, box, crop, track_id=None):
+        """
+        Tra cứu kết quả OCR cho hộp hiện tại (theo track ID nếu có).
+        Trả về (value, fingerprint):
+            - value là kết quả đã lưu, None nếu cần chạy lại OCR
+            - fingerprint dùng lại khi gọi store() để khỏi tính hai lần
+        """
+        fp = self.fingerprint(crop)
+        entry = self._find(box, track_id)
+        if entry is not None and time.monotonic() - entry["time"] <= self.max_age:
+            diff = np.abs(entry["fingerprint"] - fp).mean()
+            if diff <= self.diff_threshold:
+                # Cập nhật hộp mới nhất để IoU bám theo biển số đang di chuyển
+                entry["box"] = box
+                self.hits += 1
+                return entry["value"], fp
+        self.misses += 1
+        return None, fp
+
+    def store(self, box, fp, value, track_id=None):
+        """Lưu (hoặc thay thế) kết quả OCR của một hộp / track."""
+        entry = self._find(box, track_id)
+        if entry is None:
+            entry = {}
+            self.entries.append(entry)
+        entry.update(track_id=track_id, box=box, fingerprint=fp, value=value, time=time.monotonic())
+
+        # Giới hạn kích thước: bỏ các mục cũ nhất
+        if len(self.entries) > self.max_entries:
+            self.entries.sort(key=lambda e: e["time"])
+            del self.entries[:len(self.entries) - self.max_entries]
+
+    def prune(self):
+        """Xoá các mục đã hết hạn."""
+        now = time.monotonic()
+        self.entries = [e for e in self.entries if now - e["time"] <= self.max_age]
+
+    def clear(self):
+        """Xoá toàn bộ bộ đệm."""
+        self.entries = []
@@ -0,0 +1,182 @@
+import json
+import os
+import cv2
+import numpy as np
+
+# =====================================================================
+# CÁC BACKEND NHẬN DẠNG KÝ TỰ (OCR)
+# ---------------------------------------------------------------------
+# - "easyocr":     easyocr.Reader (PyTorch CRNN, mặc định)
+# - "onnxruntime": bộ nhận dạng của EasyOCR xuất sang ONNX (có thể lượng
+#   tử INT8), chạy bằng ONNX Runtime trên CPU
+# Mọi backend có cùng giao diện mà doc_ky_tu.py dùng (như easyocr.Reader):
+#   recognize(ảnh xám, horizontal_list=[[x_min, x_max, y_min, y_max], ...],
+#             batch_size=..., allowlist=...) → [(hộp, text, confidence)]
+#   readtext(ảnh) → [(hộp, text, confidence)]
+# allowlist giới hạn bảng ký tự khi giải mã (ký tự biển số: PLATE_CHARSET).
+# Tạo mô hình ONNX bằng: python xuat_ocr.py --int8
+# =====================================================================
+
+OCR_BACKENDS = ("easyocr", "onnxruntime")
+
+# Ký tự có thể có trên biển số Việt Nam
+PLATE_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ-."
+
+RECOG_HEIGHT = 64   # Chiều cao đầu vào bộ nhận dạng của EasyOCR
+
+
+def metadata_path(model_path):
+    """File JSON đi kèm mô hình ONNX (bảng ký tự của bộ nhận dạng)."""
+    return os.path.splitext(model_path)[0] + ".json"
+
+
+def _custom_mean(probs):
+    """Độ tin cậy của cả chuỗi theo cách EasyOCR tính (tích xác suất, chuẩn hoá theo độ dài)."""
+    if not len(probs):
+        return 0.0
+    return float(np.prod(probs) ** (2.0 / np.sqrt(len(probs))))
+
+
+# ---------------------------------------------------------------------
+# BACKEND ONNX RUNTIME
+# ---------------------------------------------------------------------
+class OnnxRecognizer:
+    name = "onnxruntime"
+
+    def __init__(self, model_path, threads=0, readtext_reader=None):
+        """
+        Khởi tạo bộ nhận dạng ONNX.
+            - model_path: file .onnx (bảng ký tự đọc từ file .json cùng tên)
+            - threads: số luồng intra-op của ONNX Runtime (0 = mặc định)
+            - readtext_reader: hàm tạo easyocr.Reader, chỉ dùng cho chế độ
+              "readtext" (cần bộ phát hiện chữ CRAFT), tạo lười ở lần gọi đầu
+        """
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        with open(metadata_path(model_path), encoding="utf-8") as f:
+            meta = json.load(f)
+        # Lớp 0 là ký tự trống của CTC, như bộ chuyển đổi của EasyOCR
+        self.character = ["[blank]"] + list(meta["character"])
+        self.height = meta.get("height", RECOG_HEIGHT)
+        self._allowed = {}
+        self._readtext_reader = readtext_reader
+        self._full_reader = None
+
+    def _allowed_classes(self, allowlist):
+        """Chỉ số các lớp được phép khi giải mã (luôn gồm lớp trống 0)."""
+        key = allowlist or ""
+        allowed = self._allowed.get(key)
+        if allowed is None:
+            if allowlist:
+                allowed = np.array([0] + [i for i, c in enumerate(self.character[1:], 1) if c in allowlist])
+            else:
+                allowed = np.arange(len(self.character))
+            self._allowed[key] = allowed
+        return allowed
+
+    def _prepare(self, images):
+        """Đưa các ảnh xám về cùng chiều cao, ghép thành blob (B, 1, H, W) chuẩn hoá [-1, 1]."""
+        resized = []
+        for img in images:
+            h, w = img.shape[:2]
+            new_w = max(1, int(np.ceil(w * self.height / float(h))))
+            resized.append(cv2.resize(img, (new_w, self.height), interpolation=cv2.INTER_CUBIC))
+        width = max(img.shape[1] for img in resized)
+        blob = np.empty((len(resized), 1, self.height, width), dtype=np.float32)
+        for i, img in enumerate(resized):
+            w = img.shape[1]
+            blob[i, 0, :, :w] = img
+            # Phần đệm lặp lại cột cuối (như NormalizePAD của EasyOCR)
+            blob[i, 0, :, w:] = img[:, -1:]
+        blob /= 127.5
+        blob -= 1.0
+        return blob
+
+    def _decode(self, logits, allowed):
+        """Giải mã CTC tham lam trên các lớp được phép; trả về [(text, confidence)]."""
+        logits = logits[:, :, allowed]
+        logits = logits - logits.max(axis=2, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=2, keepdims=True)
+        best = probs.argmax(axis=2)
+        best_prob = probs.max(axis=2)
+
+        reads = []
+        for seq, seq_prob in zip(best, best_prob):
+            # Bỏ ký tự lặp liên tiếp và ký tự trống
+            keep = np.ones(len(seq), dtype=bool)
+            keep[1:] = seq[1:] != seq[:-1]
+            keep &= seq != 0
+            text = "".join(self.character[allowed[i]] for i in seq[keep])
+            reads.append((text, _custom_mean(seq_prob[seq != 0])))
+        return reads
+
+    def recognize_lines(self, images, batch_size=8, allowlist=None):
+        """Nhận dạng danh sách ảnh xám một dòng; trả về [(text, confidence)]."""
+        allowed = self._allowed_classes(allowlist)
+        reads = []
+        for start in range(0, len(images), max(1, batch_size)):
+            blob = self._prepare(images[start:start + batch_size])
+            logits = self.session.run(None, {self.input_name: blob})[0]
+            reads.extend(self._decode(logits, allowed))
+        return reads
+
+    def recognize(self, image, horizontal_list=None, free_list=None, batch_size=1, detail=1,
+                  paragraph=False, allowlist=None, **kwargs):
+        """Giao diện như easyocr.Reader.recognize (chỉ hỗ trợ horizontal_list)."""
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        h, w = image.shape[:2]
+        regions = horizontal_list or [[0, w, 0, h]]
+        crops = [image[max(0, y1):y2, max(0, x1):x2] for x1, x2, y1, y2 in regions]
+        reads = self.recognize_lines(crops, batch_size, allowlist)
+        return [
+            ([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], text, confidence)
+            for (x1, x2, y1, y2), (text, confidence) in zip(regions, reads)
+        ]
+
+    def readtext(self, image, **kwargs):
+        """Chế độ "readtext" cần bộ phát hiện chữ: chuyển cho easyocr.Reader."""
+        if self._full_reader is None:
+            if self._readtext_reader is None:
+                raise RuntimeError("Backend onnxruntime không hỗ trợ chế độ OCR 'readtext'")
+            self._full_reader = self._readtext_reader()
+        return self._full_reader.readtext(image, **kwargs)
+
+
+# ---------------------------------------------------------------------
+# TẠO BACKEND THEO CẤU HÌNH
+# ---------------------------------------------------------------------
+def _cuda_available():
+    """Kiểm tra CUDA (không lỗi nếu chưa cài torch)."""
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+def create_easyocr(config, gpu=None):
+    """easyocr.Reader theo cấu hình (gpu None = theo config["ocr_gpu"] / tự phát hiện)."""
+    import easyocr
+    if gpu is None:
+        gpu = config["ocr_gpu"]
+    if gpu is None:
+        gpu = _cuda_available()
+    return easyocr.Reader(config["ocr_languages"], gpu=gpu)
+
+
+def create_recognizer(config):
+    """Tạo backend OCR theo config["ocr_backend"]."""
+    backend = config["ocr_backend"]
+    if backend == "easyocr":
+        return create_easyocr(config)
+    if backend == "onnxruntime":
+        return OnnxRecognizer(config["ocr_model_path"], readtext_reader=lambda: create_easyocr(config))
+    raise ValueError(f"Backend OCR không hợp lệ: {backend} (chọn một trong {OCR_BACKENDS})")
@@ -0,0 +1,220 @@
+import abc
+import math
+import os
+import cv2
+import numpy as np
+
+# =====================================================================
+# CÁC BACKEND PHÁT HIỆN BIỂN SỐ (YOLO)
+# ---------------------------------------------------------------------
+# - "torch":       ultralytics.YOLO trên trọng số best.pt (mặc định)
+# - "onnxruntime": mô hình ONNX xuất từ best.pt (có thể lượng tử INT8)
+# - "openvino":    mô hình OpenVINO IR xuất từ best.pt (CPU Intel)
+# Mọi backend trả về cùng một định dạng cho mỗi khung hình:
+#   mảng numpy float32 (N, 5) với mỗi dòng [x1, y1, x2, y2, confidence]
+# theo toạ độ điểm ảnh của khung hình gốc.
+# detect / detect_batch nhận imgsz tuỳ chọn cho từng lần gọi (VD: vùng
+# quan tâm nhỏ, xem vung_quan_tam.py); mô hình xuất với kích thước đầu
+# vào cố định thì luôn dùng kích thước đó.
+# Tạo mô hình ONNX/OpenVINO bằng: python xuat_mo_hinh.py --formats onnx openvino
+# =====================================================================
+
+DETECTOR_BACKENDS = ("torch", "onnxruntime", "openvino")
+IMGSZ_STRIDE = 32   # imgsz của YOLO phải là bội của stride
+
+
+def empty_boxes():
+    """Kết quả rỗng (không có biển số)."""
+    return np.zeros((0, 5), dtype=np.float32)
+
+
+def round_imgsz(size):
+    """Làm tròn lên bội gần nhất của IMGSZ_STRIDE (imgsz hợp lệ cho YOLO)."""
+    return int(math.ceil(size / float(IMGSZ_STRIDE))) * IMGSZ_STRIDE
+
+
+# ---------------------------------------------------------------------
+# BACKEND PYTORCH (ULTRALYTICS)
+# ---------------------------------------------------------------------
+class TorchDetector:
+    name = "torch"
+
+    def __init__(self, model_path, device="", conf=0.25, iou=0.45, imgsz=640):
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+        self.device = device
+        self.conf = conf
+        self.iou = iou
+        self.imgsz = imgsz
+
+    def detect_batch(self, frames, imgsz=None):
+        """Phát hiện biển số trên nhiều khung hình bằng một lần gọi mô hình."""
+        kwargs = {"device": self.device} if self.device else {}
+        results = self.model(list(frames), verbose=False, conf=self.conf,
+                             iou=self.iou, imgsz=imgsz or self.imgsz, **kwargs)
+        outputs = []
+        for r in results:
+            if r.boxes is None or len(r.boxes) == 0:
+                outputs.append(empty_boxes())
+                continue
+            xyxy = r.boxes.xyxy.cpu().numpy()
+            conf = r.boxes.conf.cpu().numpy()[:, None]
+            outputs.append(np.hstack([xyxy, conf]).astype(np.float32))
+        return outputs
+
+    def detect(self, frame, imgsz=None):
+        return self.detect_batch([frame], imgsz)[0]
+
+
+# ---------------------------------------------------------------------
+# PHẦN CHUNG CHO MÔ HÌNH ĐÃ XUẤT (ONNX / OPENVINO)
+# ---------------------------------------------------------------------
+class _ExportedDetector(abc.ABC):
+    name = ""
+
+    def __init__(self, conf=0.25, iou=0.45, imgsz=640):
+        self.conf = conf
+        self.iou = iou
+        self.imgsz = imgsz
+        # None = batch động; số nguyên = kích thước batch cố định của mô hình
+        self.fixed_batch = 1
+        # True nếu mô hình có kích thước ảnh đầu vào cố định (bỏ qua imgsz từng lần gọi)
+        self.fixed_size = False
+
+    @abc.abstractmethod
+    def _infer(self, blob):
+        """Chạy mô hình trên blob (B, 3, H, W), trả về đầu ra thô (B, 4+nc, N)."""
+
+    def _letterbox(self, frame, imgsz):
+        """Đưa khung hình về imgsz x imgsz, giữ tỉ lệ, viền xám (giống ultralytics)."""
+        h, w = frame.shape[:2]
+        scale = min(imgsz / h, imgsz / w)
+        new_w, new_h = int(round(w * scale)), int(round(h * scale))
+        pad_x, pad_y = (imgsz - new_w) // 2, (imgsz - new_h) // 2
+
+        canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+        resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+        return canvas, scale, pad_x, pad_y
+
+    def _postprocess(self, output, scale, pad_x, pad_y, shape):
+        """Giải mã đầu ra YOLOv8 (4+nc, N) thành hộp trên khung hình gốc + NMS."""
+        preds = output.T                       # (N, 4+nc)
+        scores = preds[:, 4:].max(axis=1)
+        keep = scores >= self.conf
+        preds, scores = preds[keep], scores[keep]
+        if not len(preds):
+            return empty_boxes()
+
+        cx, cy, bw, bh = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+        boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+        # Bỏ phần viền letterbox và đưa về tỉ lệ khung hình gốc
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / scale
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / scale
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, shape[0])
+
+        xywh = np.column_stack([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]])
+        idx = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), self.conf, self.iou)
+        idx = np.array(idx, dtype=int).reshape(-1)
+        return np.hstack([boxes[idx], scores[idx, None]]).astype(np.float32)
+
+    def detect_batch(self, frames, imgsz=None):
+        """Phát hiện biển số trên nhiều khung hình (ghép batch nếu mô hình cho phép)."""
+        size = self.imgsz if self.fixed_size else (imgsz or self.imgsz)
+        prepared = [self._letterbox(f, size) for f in frames]
+        blob = np.stack([p[0] for p in prepared])[..., ::-1]           # BGR → RGB
+        blob = np.ascontiguousarray(blob.transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+
+        step = self.fixed_batch or len(frames)
+        outputs = [self._infer(blob[i:i + step]) for i in range(0, len(frames), step)]
+        outputs = np.concatenate(outputs, axis=0)
+
+        return [
+            self._postprocess(out, scale, pad_x, pad_y, frame.shape)
+            for out, (_, scale, pad_x, pad_y), frame in zip(outputs, prepared, frames)
+        ]
+
+    def detect(self, frame, imgsz=None):
+        return self.detect_batch([frame], imgsz)[0]
+
+
+# ---------------------------------------------------------------------
+# BACKEND ONNX RUNTIME
+# ---------------------------------------------------------------------
+class OnnxDetector(_ExportedDetector):
+    name = "onnxruntime"
+
+    def __init__(self, model_path, conf=0.25, iou=0.45, imgsz=640, threads=0):
+        super().__init__(conf, iou, imgsz)
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Kích thước đầu vào cố định của mô hình (nếu có) được ưu tiên
+        batch, _, height, _ = model_input.shape
+        self.fixed_batch = batch if isinstance(batch, int) else None
+        if isinstance(height, int):
+            self.imgsz = height
+            self.fixed_size = True
+
+    def _infer(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+# ---------------------------------------------------------------------
+# BACKEND OPENVINO
+# ---------------------------------------------------------------------
+class OpenVINODetector(_ExportedDetector):
+    name = "openvino"
+
+    def __init__(self, model_path, conf=0.25, iou=0.45, imgsz=640):
+        super().__init__(conf, iou, imgsz)
+        import openvino as ov
+        if os.path.isdir(model_path):
+            # Thư mục do ultralytics xuất ra (best_openvino_model/best.xml)
+            xml = [f for f in os.listdir(model_path) if f.endswith(".xml")]
+            model_path = os.path.join(model_path, xml[0])
+        core = ov.Core()
+        model = core.read_model(model_path)
+        shape = model.inputs[0].get_partial_shape()
+        self.fixed_batch = shape[0].get_length() if shape[0].is_static else None
+        if shape[2].is_static:
+            self.imgsz = shape[2].get_length()
+            self.fixed_size = True
+        self.compiled = core.compile_model(model, "CPU")
+
+    def _infer(self, blob):
+        return self.compiled(blob)[0]
+
+
+# ---------------------------------------------------------------------
+# TẠO BACKEND THEO CẤU HÌNH
+# ---------------------------------------------------------------------
+def exported_model_path(config, backend):
+    """Đường dẫn mô hình đã xuất tương ứng với backend (mặc định cạnh best.pt)."""
+    if config.get("detector_path"):
+        return config["detector_path"]
+    stem = os.path.splitext(config["model_path"])[0]
+    if backend == "onnxruntime":
+        return stem + ".onnx"
+    if backend == "openvino":
+        return stem + "_openvino_model"
+    return config["model_path"]
+
+
+def create_detector(config):
+    """Tạo backend phát hiện biển số theo config["detector_backend"]."""
+    backend = config["detector_backend"]
+    kwargs = dict(conf=config["conf_threshold"], iou=config["iou_threshold"], imgsz=config["imgsz"])
+    if backend == "torch":
+        return TorchDetector(config["model_path"], device=config["device"], **kwargs)
+    if backend == "onnxruntime":
+        return OnnxDetector(exported_model_path(config, backend), **kwargs)
+    if backend == "openvino":
+        return OpenVINODetector(exported_model_path(config, backend), **kwargs)
+    raise ValueError(f"Backend phát hiện không hợp lệ: {backend} (chọn một trong {DETECTOR_BACKENDS})")
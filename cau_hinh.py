@@ -0,0 +1,168 @@
+import json
+import os
+
+# =====================================================================
+# CẤU HÌNH HỆ THỐNG NHẬN DIỆN
+# ---------------------------------------------------------------------
+# Thứ tự ưu tiên (sau ghi đè trước):
+#   1. Giá trị mặc định bên dưới
+#   2. File JSON (đường dẫn truyền vào hoặc biến môi trường BIEN_SO_CONFIG)
+#   3. Biến môi trường BIEN_SO_*
+#   4. Tham số truyền trực tiếp vào load_config(...)
+# Module này không import thư viện nặng để các công cụ khác dùng được ngay.
+# =====================================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULTS = {
+    # Đường dẫn trọng số YOLO (tương đối theo thư mục dự án)
+    "model_path": os.path.join(BASE_DIR, "runs", "detect", "train_bien_so_100epoch", "weights", "best.pt"),
+    # Thiết bị chạy YOLO: "" = tự chọn, "cpu", "cuda:0", ...
+    "device": "",
+    # Backend phát hiện: "torch", "onnxruntime" hoặc "openvino" (xem bo_phat_hien.py)
+    "detector_backend": "torch",
+    # Đường dẫn mô hình đã xuất ("" = cạnh best.pt: best.onnx / best_openvino_model)
+    "detector_path": "",
+    # Ngưỡng tin cậy, ngưỡng IoU của NMS và kích thước ảnh đầu vào YOLO
+    "conf_threshold": 0.25,
+    "iou_threshold": 0.45,
+    "imgsz": 640,
+    # Vùng quan tâm theo làn (xem vung_quan_tam.py): tên làn / nguồn video /
+    # "default" (camera giao diện) → đa giác [[x, y], ...] theo điểm ảnh hoặc
+    # tỉ lệ 0..1; imgsz cho vùng cắt (0 = tự tính theo imgsz và kích thước ROI)
+    "rois": {},
+    "roi_imgsz": 0,
+    # Độ phân giải yêu cầu khi mở camera / nguồn video [rộng, cao]
+    "capture_size": [640, 480],
+    # Phát hiện theo ô cho camera độ phân giải cao (xem chia_o.py): cạnh ô
+    # (0 = tắt), tỉ lệ chồng lấn giữa các ô và số ô tối đa mỗi lần gọi YOLO
+    "tile_size": 0,
+    "tile_overlap": 0.2,
+    "tile_max_batch": 8,
+    # Backend OCR: "easyocr" (PyTorch) hoặc "onnxruntime" (xem bo_nhan_dang.py)
+    "ocr_backend": "easyocr",
+    # Mô hình nhận dạng ONNX do xuat_ocr.py tạo ra (kèm file .json cùng tên).
+    # Mặc định bản FP32 (đã so khớp logits với PyTorch khi xuất); bản INT8
+    # (nhan_dang_int8.onnx, xuat_ocr.py --int8) chỉ dùng sau khi xem báo cáo độ chính xác
+    "ocr_model_path": os.path.join(BASE_DIR, "mo_hinh_ocr", "nhan_dang.onnx"),
+    # Bảng ký tự được phép khi giải mã OCR bằng ONNX ("" = toàn bộ bảng ký tự của mô hình)
+    "ocr_charset": "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ-.",
+    # Ngôn ngữ EasyOCR
+    "ocr_languages": ["vi"],
+    # EasyOCR dùng GPU: None = tự phát hiện CUDA
+    "ocr_gpu": None,
+    # Chế độ OCR (xem doc_ky_tu.OCR_MODES)
+    "ocr_mode": "rows",
+    # Số vùng cắt tối đa trong một lần gọi bộ nhận dạng (doc_ky_tu.read_plates)
+    "ocr_batch_size": 8,
+    # Tiền xử lý vùng biển số trước OCR (xem tien_xu_ly.py): bật / tắt và tỉ
+    # lệ nới hộp YOLO mỗi phía
+    "preprocess": True,
+    "crop_padding": 0.06,
+    # Lập lịch YOLO thích ứng (xem lap_lich.py): khoảng cách nhỏ nhất khi có
+    # chuyển động, khoảng làm mới khi cảnh tĩnh (khung hình) và ngân sách ms/khung
+    "detect_min_interval": 2,
+    "detect_idle_interval": 30,
+    "frame_budget_ms": 40.0,
+    # FPS hiển thị tối đa của camera trên giao diện (độc lập với tốc độ nhận diện)
+    "display_fps": 20,
+    # Danh bạ chủ xe: file CSV (cột plate, owner) hoặc SQLite (bảng owners);
+    # "" = chưa có danh bạ, gán tên ngẫu nhiên trong chu_xe.py
+    "owner_registry": "",
+    # Cho phép khớp biển số sai 1 ký tự với danh bạ
+    "owner_fuzzy": True,
+    # File SQLite lưu sự kiện nhận diện (xem kho_su_kien.py); "" = không lưu
+    "event_db": "su_kien.db",
+    # Bộ đệm kết quả ảnh tĩnh theo nội dung ảnh + phiên bản mô hình (xem
+    # bo_dem_ket_qua.py); "" = tắt. Dung lượng tối đa tính bằng MB
+    "result_cache": "ket_qua_anh.db",
+    "result_cache_mb": 64,
+    # Số luồng nhận diện ảnh tải lên từ giao diện (mỗi luồng một bản mô hình)
+    "upload_workers": 1,
+    # Nguồn video cho nguon_video.py (chỉ số camera, URL RTSP, file, "synthetic")
+    "sources": ["0"],
+    # Số luồng nhận diện dùng chung cho mọi nguồn (0 = số nhân CPU)
+    "workers": 0,
+    # Chạy suy luận giả ở luồng nền ngay khi khởi tạo để làm nóng mô hình
+    "warmup": False,
+    # Chỉ số vận hành (xem chi_so.py): cổng HTTP /metrics (0 = tắt), địa chỉ
+    # lắng nghe và chu kỳ ghi log JSON (giây, 0 = tắt)
+    "metrics_port": 0,
+    "metrics_host": "127.0.0.1",
+    "metrics_log_interval": 0,
+    # Dịch vụ HTTP nhận diện ảnh (xem dich_vu_http.py): địa chỉ, số luồng
+    # mô hình, cửa sổ gom yêu cầu (ms) và số ảnh tối đa mỗi lô YOLO, số yêu
+    # cầu chờ tối đa (quá thì trả 503), thời gian chờ (giây) và cỡ ảnh tối đa (MB)
+    "http_host": "127.0.0.1",
+    "http_port": 8080,
+    "http_workers": 1,
+    "http_batch_window_ms": 5,
+    "http_max_batch": 8,
+    "http_queue_limit": 64,
+    "http_timeout": 10.0,
+    "http_max_upload_mb": 10,
+}
+
+# Biến môi trường → (khoá cấu hình, hàm chuyển kiểu)
+ENV_VARS = {
+    "BIEN_SO_MODEL_PATH": ("model_path", str),
+    "BIEN_SO_DEVICE": ("device", str),
+    "BIEN_SO_DETECTOR_BACKEND": ("detector_backend", str),
+    "BIEN_SO_DETECTOR_PATH": ("detector_path", str),
+    "BIEN_SO_OCR_LANGS": ("ocr_languages", lambda v: [x.strip() for x in v.split(",") if x.strip()]),
+    "BIEN_SO_OCR_GPU": ("ocr_gpu", lambda v: v.strip().lower() in ("1", "true", "yes", "on")),
+    "BIEN_SO_OCR_MODE": ("ocr_mode", str),
+    "BIEN_SO_OCR_BACKEND": ("ocr_backend", str),
+    "BIEN_SO_OCR_MODEL_PATH": ("ocr_model_path", str),
+    "BIEN_SO_PREPROCESS": ("preprocess", lambda v: v.strip().lower() in ("1", "true", "yes", "on")),
+    "BIEN_SO_FRAME_BUDGET_MS": ("frame_budget_ms", float),
+    "BIEN_SO_DISPLAY_FPS": ("display_fps", float),
+    "BIEN_SO_OWNER_REGISTRY": ("owner_registry", str),
+    "BIEN_SO_EVENT_DB": ("event_db", str),
+    "BIEN_SO_RESULT_CACHE": ("result_cache", str),
+    "BIEN_SO_UPLOAD_WORKERS": ("upload_workers", int),
+    "BIEN_SO_CAPTURE_SIZE": ("capture_size", lambda v: [int(x) for x in v.lower().split("x")]),
+    "BIEN_SO_TILE_SIZE": ("tile_size", int),
+    "BIEN_SO_SOURCES": ("sources", lambda v: [x.strip() for x in v.split(",") if x.strip()]),
+    "BIEN_SO_WORKERS": ("workers", int),
+    "BIEN_SO_WARMUP": ("warmup", lambda v: v.strip().lower() in ("1", "true", "yes", "on")),
+    "BIEN_SO_METRICS_PORT": ("metrics_port", int),
+    "BIEN_SO_METRICS_LOG_INTERVAL": ("metrics_log_interval", float),
+    "BIEN_SO_HTTP_HOST": ("http_host", str),
+    "BIEN_SO_HTTP_PORT": ("http_port", int),
+    "BIEN_SO_HTTP_WORKERS": ("http_workers", int),
+    "BIEN_SO_HTTP_MAX_BATCH": ("http_max_batch", int),
+}
+
+
+def load_config(path=None, **overrides):
+    """
+    Đọc cấu hình và trả về dict các giá trị đã gộp.
+        - path: file JSON cấu hình (mặc định lấy từ BIEN_SO_CONFIG nếu có)
+        - overrides: giá trị ghi đè cuối cùng (bỏ qua các giá trị None)
+    """
+    config = dict(DEFAULTS)
+
+    path = path or os.environ.get("BIEN_SO_CONFIG")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            config.update(json.load(f))
+
+    for name, (key, convert) in ENV_VARS.items():
+        value = os.environ.get(name)
+        if value is None:
+            continue
+        # Chuỗi rỗng có nghĩa (VD: BIEN_SO_EVENT_DB="" để tắt kho sự kiện);
+        # riêng khoá số thì bỏ qua vì không có giá trị rỗng
+        if not value.strip() and convert in (int, float):
+            continue
+        config[key] = convert(value)
+
+    config.update({k: v for k, v in overrides.items() if v is not None})
+
+    # Đường dẫn tương đối được hiểu theo thư mục dự án
+    for key in ("model_path", "detector_path", "ocr_model_path", "event_db", "owner_registry",
+                "result_cache"):
+        if config[key] and not os.path.isabs(config[key]):
+            config[key] = os.path.join(BASE_DIR, config[key])
+    return config
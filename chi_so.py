@@ -0,0 +1,296 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =====================================================================
+# CHỈ SỐ VẬN HÀNH (COUNTER / GAUGE / HISTOGRAM) + /metrics
+# ---------------------------------------------------------------------
+# - Các chỉ số được khai báo một lần ở mức module (REGISTRY.counter(...)).
+# - Khi REGISTRY chưa bật, inc / set / observe trả về ngay sau một phép
+#   kiểm tra cờ, time() trả về ngữ cảnh rỗng dùng chung → gần như không
+#   tốn chi phí trên đường xử lý nóng.
+# - setup(config) bật chỉ số, mở cổng HTTP nội bộ trả /metrics theo định
+#   dạng văn bản Prometheus và (tuỳ chọn) ghi log JSON định kỳ.
+# - stage_profiler() cho một đối tượng dùng được làm PlateRecognizer.
+#   profiler: mỗi bước (yolo / crop / preprocess / ocr) thành một nhãn của histogram.
+# =====================================================================
+
+# Ngưỡng (giây) mặc định của histogram độ trễ
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_NO_TIMER = nullcontext()
+logger = logging.getLogger("bien_so.metrics")
+
+
+def _escape(value):
+    """Thoát \\, " và xuống dòng trong giá trị nhãn (VD: đường dẫn, tên nguồn RTSP)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Timer:
+    __slots__ = ("metric", "start")
+
+    def __init__(self, metric):
+        self.metric = metric
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metric.observe(time.perf_counter() - self.start)
+        return False
+
+
+# ---------------------------------------------------------------------
+# CÁC LOẠI CHỈ SỐ
+# ---------------------------------------------------------------------
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry, name, help_text, labelnames=(), label_values=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.label_values = tuple(label_values)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self, values):
+        return type(self)(self.registry, self.name, self.help, self.labelnames, values)
+
+    def labels(self, *values):
+        """Chỉ số con theo giá trị nhãn (được tạo một lần rồi dùng lại)."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child(values)
+        return child
+
+    def _series(self):
+        """Các chỉ số thực sự có giá trị (bản thân hoặc các chỉ số con)."""
+        return list(self._children.values()) if self.labelnames else [self]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self.value += amount
+
+    def _samples(self):
+        return [(self.name, self.label_values, None, self.value)]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.value = 0.0
+
+    def set(self, value):
+        if self.registry.enabled:
+            self.value = value
+
+    def _samples(self):
+        return [(self.name, self.label_values, None, self.value)]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets=LATENCY_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Ô cuối: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self, values):
+        # Chỉ số con dùng đúng ngưỡng của cha (số ô counts khớp với buckets)
+        return Histogram(self.registry, self.name, self.help, self.labelnames, values, buckets=self.buckets)
+
+    def observe(self, value):
+        if not self.registry.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        """Ngữ cảnh đo thời gian: with histogram.time(): ..."""
+        if not self.registry.enabled:
+            return _NO_TIMER
+        return _Timer(self)
+
+    def _samples(self):
+        samples, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            samples.append((self.name + "_bucket", self.label_values, ("le", le), cumulative))
+        samples.append((self.name + "_sum", self.label_values, None, self.sum))
+        samples.append((self.name + "_count", self.label_values, None, self.count))
+        return samples
+
+
+class _StageProfiler:
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def stage(self, name):
+        """Cùng giao diện với do_hieu_nang.StageProfiler."""
+        return self.histogram.labels(name).time()
+
+
+# ---------------------------------------------------------------------
+# SỔ ĐĂNG KÝ CHỈ SỐ
+# ---------------------------------------------------------------------
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(self, name, help_text, labelnames, (), **kwargs)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._get(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def stage_profiler(self):
+        """Profiler cho PlateRecognizer: histogram plate_stage_seconds{stage=...}."""
+        return _StageProfiler(self.histogram(
+            "plate_stage_seconds", "Thời gian từng bước nhận diện", ("stage",)
+        ))
+
+    # -----------------------------------------------------------------
+    # XUẤT DỮ LIỆU
+    # -----------------------------------------------------------------
+    def render(self):
+        """Văn bản theo định dạng Prometheus (text exposition 0.0.4)."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            help_text = metric.help.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {metric.name} {help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for series in metric._series():
+                for name, values, extra, value in series._samples():
+                    lines.append(f"{name}{_format_labels(metric.labelnames, values, extra)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Giá trị hiện tại dạng dict (cho log JSON); histogram → count / tổng / trung bình."""
+        data = {}
+        for metric in list(self._metrics.values()):
+            for series in metric._series():
+                key = metric.name + (("{" + ",".join(series.label_values) + "}") if series.label_values else "")
+                if isinstance(series, Histogram):
+                    mean = series.sum / series.count if series.count else 0.0
+                    data[key] = {"count": series.count, "sum": round(series.sum, 6), "mean": round(mean, 6)}
+                else:
+                    data[key] = series.value
+        return data
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ---------------------------------------------------------------------
+# HTTP /metrics VÀ LOG ĐỊNH KỲ
+# ---------------------------------------------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # Không in mỗi lần Prometheus lấy số liệu
+
+
+def start_http_server(port, host="127.0.0.1", registry=REGISTRY):
+    """Mở cổng HTTP nội bộ trả /metrics ở luồng nền; trả về server."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_log_reporter(interval, registry=REGISTRY):
+    """Ghi snapshot chỉ số dạng JSON mỗi `interval` giây (logger "bien_so.metrics")."""
+    def loop():
+        while True:
+            time.sleep(interval)
+            logger.info(json.dumps(registry.snapshot(), ensure_ascii=False))
+
+    thread = threading.Thread(target=loop, name="metrics-log", daemon=True)
+    thread.start()
+    return thread
+
+
+def setup(config, registry=REGISTRY):
+    """
+    Bật chỉ số theo cấu hình:
+        - metrics_port: cổng HTTP /metrics (0 = không mở)
+        - metrics_log_interval: chu kỳ ghi log JSON (giây, 0 = không ghi)
+    Không bật gì nếu cả hai đều tắt.
+    """
+    port, interval = config["metrics_port"], config["metrics_log_interval"]
+    if not port and not interval:
+        return None
+    registry.enabled = True
+    server = None
+    if port:
+        server = start_http_server(port, config["metrics_host"], registry)
+    if interval:
+        if not logging.getLogger().handlers:
+            logging.basicConfig(level=logging.INFO)
+        start_log_reporter(interval, registry)
+    return server
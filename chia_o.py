@@ -0,0 +1,118 @@
+import math
+import numpy as np
+from bo_phat_hien import empty_boxes, round_imgsz
+
+# =====================================================================
+# PHÁT HIỆN THEO Ô (TILED INFERENCE) CHO CAMERA ĐỘ PHÂN GIẢI CAO
+# ---------------------------------------------------------------------
+# - Khung hình 1080p / 4K đưa thẳng vào YOLO bị thu nhỏ về imgsz, biển
+#   số ở xa chỉ còn vài điểm ảnh. Thay vào đó khung hình được chia thành
+#   các ô tile_size x tile_size chồng lấn nhau (overlap), mỗi ô chạy YOLO
+#   ở đúng độ phân giải gốc.
+# - Các ô được gửi theo lô (detect_batch, tối đa max_batch ô mỗi lần).
+# - Hộp được đưa về toạ độ khung hình gốc rồi gộp ở đường nối giữa các ô
+#   bằng NMS theo "giao / diện tích hộp nhỏ hơn": biển số bị ô cắt dở vẫn
+#   bị hộp đầy đủ ở ô bên cạnh loại bỏ.
+# - Vùng cắt OCR lấy từ khung hình gốc (đủ độ phân giải).
+# - Khung hình không lớn hơn một ô thì chạy YOLO bình thường.
+# =====================================================================
+
+
+def tile_origins(length, tile, overlap):
+    """Vị trí bắt đầu các ô trên một chiều, đều nhau, ô cuối sát mép."""
+    if length <= tile:
+        return [0]
+    step = tile - overlap
+    count = int(math.ceil((length - overlap) / float(step)))
+    last = length - tile
+    return [int(round(i * last / float(count - 1))) for i in range(count)]
+
+
+def merge_boxes(boxes, threshold=0.5):
+    """
+    NMS tham lam trên mảng (N, 5) [x1, y1, x2, y2, confidence]: bỏ hộp
+    có phần giao với một hộp điểm cao hơn chiếm quá `threshold` diện
+    tích của hộp nhỏ hơn trong hai hộp.
+    """
+    if len(boxes) < 2:
+        return boxes
+    boxes = boxes[np.argsort(-boxes[:, 4])]
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    alive = np.ones(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if not alive[i]:
+            continue
+        keep.append(i)
+        rest = np.nonzero(alive[i + 1:])[0] + i + 1
+        if not len(rest):
+            break
+        iw = np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0])
+        ih = np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1])
+        inter = iw.clip(0) * ih.clip(0)
+        smaller = np.minimum(areas[i], areas[rest]).clip(1e-6)
+        alive[rest[inter / smaller > threshold]] = False
+    return boxes[keep]
+
+
+class TiledDetector:
+    def __init__(self, tile_size=640, overlap=0.2, max_batch=8, merge_threshold=0.5):
+        """
+        Khởi tạo bộ phát hiện theo ô.
+            - tile_size: cạnh ô vuông (điểm ảnh), cũng là imgsz của YOLO
+            - overlap: tỉ lệ chồng lấn giữa hai ô kề nhau (0..0.5), nên lớn
+              hơn bề rộng biển số lớn nhất
+            - max_batch: số ô tối đa trong một lần gọi detect_batch
+            - merge_threshold: ngưỡng gộp hộp ở đường nối (xem merge_boxes)
+        """
+        if not 0 <= overlap < 1:
+            raise ValueError(f"overlap phải trong [0, 1): {overlap}")
+        self.tile_size = tile_size
+        self.overlap = int(round(tile_size * overlap))
+        self.max_batch = max(1, max_batch)
+        self.merge_threshold = merge_threshold
+        self._shape = None
+        self._tiles = []
+
+    def tiles(self, shape):
+        """Danh sách ô (x1, y1, x2, y2) phủ khung hình (được lưu theo kích thước)."""
+        if shape[:2] != self._shape:
+            h, w = shape[:2]
+            self._tiles = [
+                (x, y, min(w, x + self.tile_size), min(h, y + self.tile_size))
+                for y in tile_origins(h, self.tile_size, self.overlap)
+                for x in tile_origins(w, self.tile_size, self.overlap)
+            ]
+            self._shape = shape[:2]
+        return self._tiles
+
+    def detect(self, models, frame):
+        """
+        Chạy YOLO theo ô (models.detect_batch) trên khung hình.
+        Trả về mảng (N, 5) theo toạ độ khung hình gốc.
+        Ảnh vừa một ô (VD: vùng bao ROI nhỏ) chạy một lần ở độ phân giải gốc.
+        """
+        tiles = self.tiles(frame.shape)
+        if len(tiles) == 1:
+            return models.detect(frame, min(self.tile_size, round_imgsz(max(frame.shape[:2]))))
+
+        found = []
+        for start in range(0, len(tiles), self.max_batch):
+            batch = tiles[start:start + self.max_batch]
+            crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in batch]
+            for (x1, y1, _, _), boxes in zip(batch, models.detect_batch(crops, imgsz=self.tile_size)):
+                if len(boxes):
+                    boxes = boxes.copy()
+                    boxes[:, [0, 2]] += x1
+                    boxes[:, [1, 3]] += y1
+                    found.append(boxes)
+        if not found:
+            return empty_boxes()
+        return merge_boxes(np.concatenate(found), self.merge_threshold)
+
+
+def tiler_from_config(config):
+    """TiledDetector theo cấu hình, None nếu tắt (tile_size = 0)."""
+    if not config["tile_size"]:
+        return None
+    return TiledDetector(config["tile_size"], config["tile_overlap"], config["tile_max_batch"])
@@ -0,0 +1,202 @@
+import bisect
+import csv
+import logging
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from chuan_hoa_bien_so import normalize_plate
+
+# =====================================================================
+# DANH BẠ CHỦ XE ĐÃ ĐĂNG KÝ (TRA CỨU THEO BIỂN SỐ)
+# ---------------------------------------------------------------------
+# - Nguồn: file CSV (cột "plate", "owner") hoặc SQLite (bảng "owners"
+#   với cột plate, owner). Biển số được chuẩn hoá như khi nhận diện nên
+#   "59x1-12345" trong danh bạ khớp với "59-X1 123.45" đọc được.
+# - Chỉ mục gọn: mảng biển số đã sắp xếp + mảng chủ xe song song, tra
+#   cứu chính xác bằng bisect (O(log n)).
+# - Tra cứu gần đúng (sai 1 ký tự: thay, thừa hoặc thiếu) bằng chỉ mục
+#   "xoá một ký tự": mỗi biển số sinh các biến thể bỏ đi một ký tự, băm
+#   thành mảng int64 đã sắp xếp (numpy) → tìm bằng searchsorted, không
+#   cần dict hàng triệu chuỗi.
+# - Tự nạp lại khi file thay đổi (kiểm tra mtime định kỳ); việc nạp chạy
+#   ở luồng nền và chỉ mục mới được thay thế nguyên khối.
+# =====================================================================
+
+logger = logging.getLogger("bien_so.chu_xe_dang_ky")
+
+SQLITE_EXTS = (".db", ".sqlite", ".sqlite3")
+
+
+def _compact(plate):
+    """Bỏ dấu phân cách của biển số chuẩn ("59-X1 123.45" → "59X112345")."""
+    return plate.replace("-", "").replace(" ", "").replace(".", "")
+
+
+def _variants(key):
+    """Chính key và các biến thể bỏ đi đúng một ký tự (i = len(key) cho lại key)."""
+    return (key[:i] + key[i + 1:] for i in range(len(key) + 1))
+
+
+def _within_one(a, b):
+    """True nếu khoảng cách chỉnh sửa giữa a và b không quá 1."""
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        return sum(x != y for x, y in zip(a, b)) <= 1
+    if la > lb:
+        a, b = b, a
+    # b dài hơn a đúng một ký tự: bỏ ký tự lệch đầu tiên rồi so
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+# ---------------------------------------------------------------------
+# CHỈ MỤC (BẤT BIẾN SAU KHI DỰNG)
+# ---------------------------------------------------------------------
+class _Index:
+    def __init__(self, rows):
+        """rows: danh sách (biển số chuẩn, chủ xe)."""
+        rows = sorted({plate: owner for plate, owner in rows}.items())
+        self.plates = [plate for plate, _ in rows]
+        self.owners = [owner for _, owner in rows]
+        self.keys = [_compact(plate) for plate in self.plates]
+
+        # Chỉ mục xoá-một-ký-tự: băm(biến thể) → vị trí biển số
+        hashes = np.fromiter((hash(v) for key in self.keys for v in _variants(key)), dtype=np.int64)
+        counts = np.fromiter((len(key) + 1 for key in self.keys), dtype=np.int64, count=len(self.keys))
+        positions = np.repeat(np.arange(len(self.keys), dtype=np.int32), counts)
+        order = np.argsort(hashes)
+        self.hashes = hashes[order]
+        self.positions = positions[order]
+
+    def __len__(self):
+        return len(self.plates)
+
+    def exact(self, plate):
+        i = bisect.bisect_left(self.plates, plate)
+        if i < len(self.plates) and self.plates[i] == plate:
+            return i
+        return None
+
+    def near(self, plate):
+        """Vị trí các biển số cách plate đúng 1 lần chỉnh sửa."""
+        key = _compact(plate)
+        probes = np.fromiter((hash(v) for v in _variants(key)), dtype=np.int64)
+        left = np.searchsorted(self.hashes, probes, side="left")
+        right = np.searchsorted(self.hashes, probes, side="right")
+        found = set()
+        for lo, hi in zip(left, right):
+            for pos in self.positions[lo:hi]:
+                pos = int(pos)
+                # Kiểm tra lại (băm có thể trùng)
+                if pos not in found and self.keys[pos] != key and _within_one(self.keys[pos], key):
+                    found.add(pos)
+        return sorted(found)
+
+
+class OwnerRegistry:
+    def __init__(self, path, table="owners", fuzzy=True, check_interval=2.0):
+        """
+        Khởi tạo danh bạ chủ xe.
+            - path: file CSV hoặc SQLite (.db / .sqlite / .sqlite3)
+            - table: tên bảng khi dùng SQLite
+            - fuzzy: cho phép khớp biển số sai 1 ký tự
+            - check_interval: chu kỳ kiểm tra file thay đổi (giây)
+        Danh bạ được nạp ngay (đồng bộ) ở lần khởi tạo.
+        """
+        self.path = path
+        self.table = table
+        self.fuzzy = fuzzy
+        self.check_interval = check_interval
+
+        self._index = _Index([])
+        self._mtime = None
+        self._last_check = 0.0
+        self._reloading = threading.Lock()
+        # Số dòng bị bỏ do biển số không hợp lệ ở lần nạp gần nhất
+        self.skipped = 0
+        self.reload()
+
+    # -----------------------------------------------------------------
+    # NẠP DANH BẠ
+    # -----------------------------------------------------------------
+    def _read_rows(self):
+        if self.path.lower().endswith(SQLITE_EXTS):
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            try:
+                yield from conn.execute(f"SELECT plate, owner FROM {self.table}")
+            finally:
+                conn.close()
+        else:
+            with open(self.path, encoding="utf-8-sig", newline="") as f:
+                for row in csv.DictReader(f):
+                    yield row.get("plate"), row.get("owner")
+
+    def reload(self):
+        """Đọc lại file và thay chỉ mục (an toàn khi đang tra cứu)."""
+        with self._reloading:
+            mtime = os.path.getmtime(self.path)
+            rows, skipped = [], 0
+            for raw_plate, owner in self._read_rows():
+                plate = normalize_plate(raw_plate or "")
+                if plate is None:
+                    skipped += 1
+                    continue
+                rows.append((plate, owner))
+            self._index = _Index(rows)
+            self._mtime = mtime
+            self.skipped = skipped
+
+    def _check_reload(self):
+        """Nạp lại ở luồng nền nếu file đã thay đổi (kiểm tra tối đa mỗi check_interval)."""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return  # File tạm thời không có (đang được ghi đè)
+        if mtime != self._mtime and not self._reloading.locked():
+            threading.Thread(target=self._safe_reload, name="owner-reload", daemon=True).start()
+
+    def _safe_reload(self):
+        try:
+            self.reload()
+        except (OSError, ValueError, sqlite3.Error, csv.Error) as e:
+            # Giữ chỉ mục cũ; lần kiểm tra sau sẽ thử nạp lại
+            logger.warning("Không thể nạp lại danh bạ chủ xe %s: %s", self.path, e)
+
+    def __len__(self):
+        return len(self._index)
+
+    # -----------------------------------------------------------------
+    # TRA CỨU
+    # -----------------------------------------------------------------
+    def find(self, plate):
+        """
+        Tìm chủ xe của biển số (dạng chuẩn).
+        Trả về (biển số trong danh bạ, chủ xe, khoảng cách) hoặc None.
+            - khoảng cách 0: khớp chính xác
+            - khoảng cách 1: sai 1 ký tự và chỉ có MỘT biển số gần như vậy
+        """
+        self._check_reload()
+        index = self._index  # Giữ tham chiếu: reload có thể thay chỉ mục
+        pos = index.exact(plate)
+        if pos is not None:
+            return index.plates[pos], index.owners[pos], 0
+        if self.fuzzy:
+            near = index.near(plate)
+            if len(near) == 1:
+                return index.plates[near[0]], index.owners[near[0]], 1
+        return None
+
+    def lookup(self, plate):
+        """Tên chủ xe hoặc None."""
+        found = self.find(plate)
+        return found[1] if found else None
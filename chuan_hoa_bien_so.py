@@ -0,0 +1,165 @@
+import re
+from tinh_thanh import VALID_CODES
+
+# =====================================================================
+# CHUẨN HOÁ & KIỂM TRA BIỂN SỐ VIỆT NAM
+# ---------------------------------------------------------------------
+# - Chuỗi OCR thô ("59-x1 123 45", "59X1.12345", "5S-XI 12З.4S", ...)
+#   được đưa về dạng chuẩn:
+#       xe máy: "59-X1 123.45"   (hoặc "59-X1 1234", "29-AA 123.45")
+#       ô tô:   "51F-123.45"     (hoặc "51F-1234", "51LD-123.45")
+# - Mỗi vị trí ký tự có loại cố định (số / chữ) nên các lỗi nhầm lẫn
+#   của OCR được sửa theo vị trí: O→0, I→1, B→8, S→5 ở vị trí số và
+#   0→D, 8→B, 5→S ở vị trí chữ. Ký tự Kirin / Hy Lạp giống chữ Latin
+#   (З→3, О→O, Х→X, ...) được đổi theo bảng _HOMOGLYPHS; chỉ khoảng
+#   trắng, '-' và '.' được bỏ, ký tự lạ khác làm chuỗi bị loại.
+# - Chuỗi không thể là biển số hợp lệ (sai độ dài, mã tỉnh không tồn
+#   tại, ký tự không sửa được) bị loại (trả về None) trước khi biểu quyết.
+# =====================================================================
+
+# Sửa nhầm lẫn theo vị trí (bảng dịch dựng sẵn một lần)
+_TO_DIGIT = str.maketrans({"O": "0", "Q": "0", "D": "0", "U": "0", "I": "1", "L": "1",
+                           "J": "1", "Z": "2", "B": "8", "S": "5", "G": "6", "A": "4"})
+_TO_LETTER = str.maketrans({"0": "D", "8": "B", "5": "S", "2": "Z", "6": "G", "4": "A",
+                            "O": "D", "Q": "D", "W": "V"})
+_DIGITS = frozenset("0123456789")
+# Chữ cái dùng trong sê-ri (không dùng I, O, Q, W)
+_LETTERS = frozenset("ABCDEFGHJKLMNPRSTUVXYZ")
+
+# Ký tự Kirin / Hy Lạp trông giống chữ Latin hoặc chữ số (OCR đôi khi trả
+# về các ký tự này); chỉ các ký tự liệt kê ở đây mới được đổi
+_HOMOGLYPHS = str.maketrans({
+    # Kirin (chữ hoa, sau upper())
+    "А": "A", "В": "B", "Е": "E", "З": "3", "І": "I", "Ј": "J", "К": "K", "М": "M",
+    "Н": "H", "О": "O", "Р": "P", "С": "C", "Ѕ": "S", "Т": "T", "У": "Y", "Х": "X",
+    # Hy Lạp
+    "Α": "A", "Β": "B", "Ε": "E", "Ζ": "Z", "Η": "H", "Ι": "I", "Κ": "K", "Μ": "M",
+    "Ν": "N", "Ο": "O", "Ρ": "P", "Τ": "T", "Υ": "Y", "Χ": "X",
+})
+# Ký tự phân cách được bỏ đi; mọi ký tự lạ khác làm chuỗi bị loại
+_SEPARATORS = re.compile(r"[\s.\-]+")
+_ALNUM = re.compile(r"^[0-9A-Z]*$")
+_HEAD = re.compile(r"^[^\s]*?(?=\s)|^.*(?=-)")
+
+# Mẫu biển số: (loại, kiểu ký tự phần đầu, độ dài phần số)
+# "D" = chữ số, "L" = chữ cái
+PLATE_PATTERNS = (
+    ("xe_may", "DDLD", 5),
+    ("xe_may", "DDLD", 4),
+    ("xe_may", "DDLL", 5),
+    ("o_to", "DDL", 5),
+    ("o_to", "DDL", 4),
+    ("o_to", "DDLL", 5),
+    ("o_to", "DDLL", 4),
+)
+
+# Biểu thức kiểm tra dạng chuẩn cuối cùng
+MOTORBIKE_RE = re.compile(r"^(\d{2})-([A-Z][0-9A-Z]) (\d{3}\.\d{2}|\d{4})$")
+CAR_RE = re.compile(r"^(\d{2})([A-Z]{1,2})-(\d{3}\.\d{2}|\d{4})$")
+
+# Số ký tự tối đa được sửa; sửa nhiều hơn coi như đọc sai
+MAX_FIXES = 3
+
+
+def _fix(chars, kinds):
+    """Sửa từng ký tự theo loại vị trí; trả về (chuỗi đã sửa, số lần sửa) hoặc None."""
+    out, fixes = [], 0
+    for ch, kind in zip(chars, kinds):
+        if kind == "D":
+            fixed = ch if ch in _DIGITS else ch.translate(_TO_DIGIT)
+            if fixed not in _DIGITS:
+                return None
+        else:
+            fixed = ch if ch in _LETTERS else ch.translate(_TO_LETTER)
+            if fixed not in _LETTERS:
+                return None
+        fixes += fixed != ch
+        out.append(fixed)
+    return "".join(out), fixes
+
+
+def _head_length(text):
+    """
+    Số ký tự chữ/số của phần đầu (trước khoảng trắng đầu tiên — dòng trên
+    của biển 2 dòng — hoặc trước dấu '-' cuối cùng), None nếu không rõ.
+    """
+    match = _HEAD.match(text)
+    if match is None:
+        return None
+    return len(_SEPARATORS.sub("", match.group(0)))
+
+
+def parse_plate(text):
+    """
+    Phân tích chuỗi OCR thô.
+    Trả về dict {'plate', 'province_code', 'series', 'number', 'kind', 'fixes'}
+    hoặc None nếu không thể là biển số hợp lệ.
+        - plate: dạng chuẩn (VD: "59-X1 123.45")
+        - kind: "xe_may" hoặc "o_to"
+        - fixes: số ký tự đã sửa nhầm lẫn
+    """
+    if not text:
+        return None
+    text = text.upper().strip().translate(_HOMOGLYPHS)
+    compact = _SEPARATORS.sub("", text)
+    if not _ALNUM.match(compact):
+        return None  # Ký tự không phải chữ / số / dấu phân cách
+    head = _head_length(text)
+    two_rows = any(c.isspace() for c in text)
+
+    best = None
+    for kind, prefix, digits in PLATE_PATTERNS:
+        if len(prefix) + digits != len(compact):
+            continue
+        fixed = _fix(compact, prefix + "D" * digits)
+        if fixed is None:
+            continue
+        chars, fixes = fixed
+        if fixes > MAX_FIXES or chars[:2] not in VALID_CODES:
+            continue
+        # Ưu tiên mẫu khớp cấu trúc nhìn thấy: độ dài phần đầu, số dòng
+        penalty = fixes
+        if head is not None and head != len(prefix):
+            penalty += 2
+        if two_rows != (kind == "xe_may"):
+            penalty += 1
+        if best is None or penalty < best[0]:
+            best = (penalty, kind, prefix, chars, fixes)
+
+    if best is None:
+        return None
+    _, kind, prefix, chars, fixes = best
+    code, series, number = chars[:2], chars[2:len(prefix)], chars[len(prefix):]
+    if len(number) == 5:
+        number = f"{number[:3]}.{number[3:]}"
+    if kind == "xe_may":
+        plate = f"{code}-{series} {number}"
+    else:
+        plate = f"{code}{series}-{number}"
+    return {
+        "plate": plate,
+        "province_code": code,
+        "series": series,
+        "number": number,
+        "kind": kind,
+        "fixes": fixes,
+    }
+
+
+def normalize_plate(text):
+    """Trả về biển số dạng chuẩn, hoặc None nếu chuỗi không hợp lệ."""
+    if text and is_valid_plate(text):
+        return text  # Đã ở dạng chuẩn (VD: dữ liệu danh bạ), khỏi phân tích
+    parsed = parse_plate(text)
+    return parsed["plate"] if parsed else None
+
+
+def is_valid_plate(plate):
+    """Kiểm tra chuỗi đã ở dạng chuẩn và hợp lệ."""
+    match = MOTORBIKE_RE.match(plate) or CAR_RE.match(plate)
+    return match is not None and match.group(1) in VALID_CODES
+
+
+def province_code(plate):
+    """Mã tỉnh của biển số dạng chuẩn (hai ký tự đầu)."""
+    return plate[:2]
@@ -1,165 +1,466 @@
 import cv2
-from ultralytics import YOLO
-import easyocr
 import datetime
+import numpy as np
 import random
-from bien_so_map_dau import BIEN_SO_MAP_DAU   # Bản đồ mã tỉnh → tên địa phương (đầu biển số)
-from bien_so_map import BIEN_SO_MAP           # Bản đồ mã biển số → địa phương
-from chu_xe import CHU_XE                     # Danh sách tên chủ xe ngẫu nhiên
+import time
+from contextlib import nullcontext
+from tinh_thanh import province_name          # Mã tỉnh → tên địa phương (tra mảng 100 ô)
+from chu_xe import CHU_XE                     # Tên chủ xe ngẫu nhiên (khi chưa cấu hình danh bạ)
+from chu_xe_dang_ky import OwnerRegistry      # Danh bạ chủ xe đã đăng ký (CSV / SQLite)
+from bo_dem_ocr import OCRCache               # Bộ đệm kết quả OCR theo từng hộp biển số
+from doc_ky_tu import read_plates, OCR_MODES  # Nhận dạng ký tự theo lô (bỏ qua bước phát hiện chữ)
+from tien_xu_ly import PlatePreprocessor      # Nới hộp, ảnh xám, CLAHE, chỉnh nghiêng
+from vung_quan_tam import region_from_config  # Vùng quan tâm (ROI) của camera: YOLO chỉ chạy trong vùng
+from chia_o import tiler_from_config          # Phát hiện theo ô cho khung hình độ phân giải cao
+from cau_hinh import load_config              # Cấu hình (đường dẫn mô hình, thiết bị, ngôn ngữ OCR)
+from mo_hinh import ModelBundle               # YOLO + EasyOCR tải lười, an toàn đa luồng
+from theo_doi import PlateTracker             # Theo dõi nhiều biển số (Kalman + IoU)
+from lap_lich import DetectionScheduler       # Lập lịch chạy YOLO theo chuyển động / ngân sách CPU
+from nguon_video import open_capture          # Mở camera / URL RTSP / file video / nguồn tổng hợp
+from kho_su_kien import EventStore            # Lưu sự kiện nhận diện vào SQLite (ghi nền)
+from bo_dem_ket_qua import ResultCache, content_hash  # Bộ đệm kết quả ảnh tĩnh theo nội dung ảnh
+from chuan_hoa_bien_so import normalize_plate  # Chuẩn hoá "59-X1 123.45", loại chuỗi sai
+from chi_so import REGISTRY                   # Chỉ số vận hành (/metrics), không tốn chi phí khi tắt
 
 # =====================================================================
 # CẤU HÌNH MÔ HÌNH & OCR
 # ---------------------------------------------------------------------
 # - Sử dụng mô hình YOLO để phát hiện vùng chứa biển số xe trong hình.
-# - Sử dụng EasyOCR để nhận diện ký tự trên biển số (text recognition).
+# - Sử dụng EasyOCR để nhận diện ký tự trên biển số (text recognition);
+#   bộ nhận dạng có thể chạy bằng ONNX Runtime INT8 (ocr_backend, xem
+#   bo_nhan_dang.py), giải mã giới hạn trong ký tự biển số (ocr_charset).
+# - Mô hình KHÔNG được tải khi import module: PlateRecognizer sở hữu một
+#   ModelBundle và chỉ tải ở lần dùng đầu tiên. Đường dẫn mô hình, thiết
+#   bị và ngôn ngữ OCR lấy từ cau_hinh.py (file JSON / biến môi trường).
 # =====================================================================
 
-MODEL_PATH = "D:/Do_An_AI/runs/detect/train_bien_so_100epoch/weights/best.pt"
-model = YOLO(MODEL_PATH)
-reader = easyocr.Reader(['vi'], gpu=True) # thay False nếu không có cài đặt cuda và GPU mạnh
+# Ngữ cảnh rỗng dùng khi chưa gắn bộ đo thời gian (không tốn chi phí)
+_NO_STAGE = nullcontext()
+
+# Chỉ số vận hành của đường xử lý nóng (xem chi_so.py)
+FRAME_SECONDS = REGISTRY.histogram("plate_frame_seconds", "Thời gian detect_plate cho một khung hình")
+DETECT_DECISIONS = REGISTRY.counter("plate_detect_decisions_total",
+                                    "Quyết định chạy / bỏ YOLO của bộ lập lịch", ("run", "reason"))
+OCR_CROPS = REGISTRY.counter("plate_ocr_crops_total", "Số vùng biển số, theo nguồn kết quả OCR", ("source",))
+ACTIVE_TRACKS = REGISTRY.gauge("plate_active_tracks", "Số track đang hoạt động")
+STABILIZE_SECONDS = REGISTRY.histogram("plate_stabilize_seconds", "Thời gian stabilize_plate")
+CONFIRMED = REGISTRY.counter("plate_confirmed_total", "Số biển số đã xác nhận")
+
 
 # =====================================================================
 # LỚP PlateRecognizer — XỬ LÝ NHẬN DIỆN BIỂN SỐ
 # ---------------------------------------------------------------------
 # Chức năng:
-#   - Mở và đọc luồng camera (Webcam)
+#   - Mở và đọc luồng camera (Webcam, RTSP, file video)
+#     Nhiều camera cùng lúc: xem nguon_video.SourceManager (mỗi làn một
+#     PlateRecognizer không mở camera, mô hình dùng chung theo luồng)
 #   - Phát hiện vị trí biển số bằng YOLO
 #   - Nhận diện ký tự bằng EasyOCR
-#   - Xác nhận biển số ổn định (lọc nhiễu)
-#   - Gắn thông tin chủ xe và địa phương
+#   - Theo dõi từng biển số bằng track ID riêng
+#   - Xác nhận biển số ổn định theo từng track (lọc nhiễu)
+#   - Gắn thông tin chủ xe (tra danh bạ đăng ký) và địa phương
+#   - Lưu biển số đã xác nhận vào kho sự kiện (kho_su_kien.py)
 # =====================================================================
 class PlateRecognizer:
-    def __init__(self):
-        """Khởi tạo camera và các biến dùng trong quá trình nhận diện."""
-        # Mở camera (ID 0 = camera mặc định)
-        self.cap = cv2.VideoCapture(0)
-        # Đặt kích thước khung hình camera
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    def __init__(self, ocr_mode=None, camera_index=0, config=None, models=None, events=None,
+                 owners=None, results=None):
+        """
+        Khởi tạo camera và các biến dùng trong quá trình nhận diện.
+            - ocr_mode: "rows" (tách 2 dòng, chỉ chạy bộ nhận dạng),
+              "crop" hoặc "readtext" (mặc định lấy từ cấu hình)
+            - camera_index: ID camera, URL RTSP, file video hoặc "synthetic";
+              None = không mở camera (chạy không giao diện / do SourceManager cấp khung hình)
+            - config: dict cấu hình (mặc định: cau_hinh.load_config())
+            - models: ModelBundle dùng chung (mặc định: tạo mới từ cấu hình)
+            - events: EventStore dùng chung (mặc định: mở theo cấu hình "event_db")
+            - owners: OwnerRegistry dùng chung (mặc định: nạp theo cấu hình "owner_registry")
+            - results: ResultCache dùng chung cho ảnh tĩnh (mặc định: mở theo cấu hình "result_cache")
+        """
+        self.config = config or load_config()
+        # Mô hình chỉ được tải ở lần dùng đầu tiên
+        self.models = models or ModelBundle(self.config)
+        if self.config["warmup"]:
+            self.models.warmup(background=True)
+
+        # Kho sự kiện: chỉ đóng khi release() nếu do chính đối tượng này mở
+        self._owns_events = events is None and bool(self.config["event_db"])
+        self.events = events
+        if self._owns_events:
+            self.events = EventStore(self.config["event_db"])
+        # Danh bạ chủ xe; None = chưa cấu hình (gán tên ngẫu nhiên như cũ)
+        self.owners = owners
+        if owners is None and self.config["owner_registry"]:
+            self.owners = OwnerRegistry(self.config["owner_registry"], fuzzy=self.config["owner_fuzzy"])
+        # Bộ đệm kết quả ảnh tĩnh (recognize_from_image); đóng khi release() nếu tự mở
+        self._owns_results = results is None and bool(self.config["result_cache"])
+        self.results = results
+        if self._owns_results:
+            self.results = ResultCache(self.config["result_cache"], self.config,
+                                       max_bytes=int(self.config["result_cache_mb"] * 1024 * 1024))
+        # Tên làn xe (do SourceManager đặt), được gắn vào kết quả
+        self.lane = None
+        # Vùng quan tâm của camera (SourceManager gán lại theo tên làn); None = cả khung
+        self.roi = region_from_config(self.config, "default")
+        # Chia khung hình lớn thành các ô chồng lấn cho YOLO; None = chạy cả khung
+        self.tiler = tiler_from_config(self.config)
+
+        self.cap = None
+        if camera_index is not None:
+            # Mở nguồn video (ID 0 = camera mặc định) với khung hình 640x480
+            self.cap = open_capture(camera_index, tuple(self.config["capture_size"]))
 
         # Trạng thái hoạt động của camera
         self.running = False
-        # Đếm số khung hình (để giảm tần suất YOLO chạy)
+        # Đếm số khung hình đã xử lý
         self.frame_count = 0
-        # Lưu kết quả YOLO gần nhất (để dùng lại giữa các khung hình)
-        self.last_results = []
-        # Bộ đệm lưu tạm biển số (để xác nhận biển số ổn định)
-        self.plate_buffer = []
+        # Lập lịch YOLO: bỏ qua cảnh tĩnh, chạy dày khi có chuyển động
+        self.scheduler = DetectionScheduler(
+            min_interval=self.config["detect_min_interval"],
+            idle_interval=self.config["detect_idle_interval"],
+            budget_ms=self.config["frame_budget_ms"],
+        )
+        # Bộ theo dõi: mỗi biển số một track, dự đoán vị trí giữa các lần chạy YOLO
+        self.tracker = PlateTracker()
         # Biển số đã được xác nhận gần nhất
         self.last_confirmed_plate = ""
-        # Bản đồ lưu thông tin chủ xe cho từng biển số
+        # Thời điểm xác nhận gần nhất của từng biển số (chống báo trùng khi
+        # track bị mất rồi bắt lại cùng một xe) và khoảng chống trùng (giây)
+        self.recent_confirmed = {}
+        self.repeat_window = 10.0
+        # Chủ xe ngẫu nhiên đã gán cho từng biển số (chỉ dùng khi không có danh bạ)
         self.plate_owner_map = {}
+        # Bộ đệm OCR: chỉ đọc lại khi vùng biển số thay đổi hoặc hết hạn
+        self.ocr_cache = OCRCache()
+        # Chế độ OCR (mặc định bỏ qua bộ phát hiện chữ của EasyOCR)
+        ocr_mode = ocr_mode or self.config["ocr_mode"]
+        if ocr_mode not in OCR_MODES:
+            raise ValueError(f"Chế độ OCR không hợp lệ: {ocr_mode} (chọn một trong {OCR_MODES})")
+        self.ocr_mode = ocr_mode
+        # Số vùng cắt tối đa trong một lần gọi bộ nhận dạng
+        self.ocr_batch_size = self.config["ocr_batch_size"]
+        # Chỉ giải mã ký tự có thể có trên biển số (None = toàn bộ bảng ký tự).
+        # Chỉ áp dụng cho bộ nhận dạng ONNX; EasyOCR giữ nguyên cách giải mã gốc
+        self.ocr_allowlist = None
+        if self.config["ocr_backend"] == "onnxruntime":
+            self.ocr_allowlist = self.config["ocr_charset"] or None
+        # Tiền xử lý vùng biển số trước OCR; None = đưa vùng cắt gốc vào OCR
+        self.preprocessor = None
+        if self.config["preprocess"]:
+            self.preprocessor = PlatePreprocessor(padding=self.config["crop_padding"])
+        # Bộ đo thời gian từng bước (do_hieu_nang.StageProfiler hoặc histogram
+        # plate_stage_seconds khi đã bật chỉ số); None = tắt
+        self.profiler = REGISTRY.stage_profiler() if REGISTRY.enabled else None
+
+    def _stage(self, name):
+        """Đo thời gian một bước xử lý (không làm gì nếu chưa gắn profiler)."""
+        if self.profiler is None:
+            return _NO_STAGE
+        return self.profiler.stage(name)
+
+    def _ocr_inputs(self, frame, boxes, crops, start=0):
+        """
+        Ảnh đưa vào OCR cho các vùng biển số: ảnh đã tiền xử lý (nếu bật)
+        hoặc vùng cắt gốc. Bộ đệm OCR vẫn so khớp trên vùng cắt gốc.
+        start: bộ đệm tiền xử lý đầu tiên (xem PlatePreprocessor.prepare).
+        """
+        if self.preprocessor is None:
+            return crops
+        with self._stage("preprocess"):
+            prepared = self.preprocessor.prepare(frame, boxes, start)
+        return [p if p is not None else c for p, c in zip(prepared, crops)]
 
     # -----------------------------------------------------------------
     # PHÁT HIỆN BIỂN SỐ TRONG KHUNG HÌNH
     # -----------------------------------------------------------------
-    def detect_plate(self, frame):
+    def detect_plate(self, frame, models=None):
         """
         Hàm phát hiện biển số trong khung hình.
-        - Dùng YOLO để xác định vị trí biển số.
-        - Dùng EasyOCR để đọc ký tự trong vùng biển số.
-        - Trả về chuỗi ký tự của biển số hiện tại.
+        - models: ModelBundle dùng cho lần gọi này (luồng nhận diện của
+          SourceManager truyền bản mô hình riêng), mặc định self.models.
+        - Dùng YOLO để xác định vị trí biển số, bộ theo dõi để giữ track ID
+          và dự đoán vị trí giữa các lần chạy YOLO.
+        - Dùng EasyOCR để đọc ký tự trong vùng biển số của từng track, chuẩn
+          hoá về dạng "59-X1 123.45" và bỏ chuỗi không hợp lệ.
+        - Trả về danh sách dict cho các biển số đọc được trong khung này:
+            {'track_id', 'plate', 'confidence', 'box', 'fresh'}
+          (fresh=True nếu OCR vừa chạy, False nếu lấy từ bộ đệm)
         """
+        models = models or self.models
         self.frame_count += 1
+        frame_start = time.perf_counter()
 
-        # Để tránh chạy YOLO ở mỗi khung hình (tốn tài nguyên),
-        # chỉ chạy mỗi 15 khung hình một lần.
-        if self.frame_count % 15 == 0:
-            results = model(frame)           # Phát hiện mới bằng YOLO
-            self.last_results = results      # Lưu lại kết quả mới
-        else:
-            results = self.last_results      # Dùng kết quả trước đó
-
-        current_plate = ""  # Biển số hiện tại (đọc được trong khung này)
-
-        # Duyệt qua các kết quả phát hiện của YOLO
-        for r in results:
-            # Lấy danh sách tọa độ hộp (bounding boxes)
-            boxes = r.boxes.xyxy.cpu().numpy() if r.boxes is not None else []
-            for box in boxes:
-                x1, y1, x2, y2 = map(int, box[:4])  # Lấy tọa độ khung
-                # Vẽ khung quanh biển số
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-                # Cắt vùng chứa biển số ra khỏi khung hình
-                bien_so_crop = frame[y1:y2, x1:x2]
-                if bien_so_crop.size == 0:
-                    continue  # Nếu ảnh rỗng thì bỏ qua
-
-                # Dùng OCR đọc chữ trên biển số
-                result = reader.readtext(bien_so_crop)
-                # Ghép các chuỗi ký tự đọc được
-                text = " ".join([res[1] for res in result]) if result else ""
-
-                if text:
-                    # Lấy mã tỉnh từ biển số (VD: “51F-123.45” → “51”)
-                    ma_tinh = text.split("-")[0] if "-" in text else text[:2]
-                    # Tra cứu địa phương tương ứng
-                    dia_phuong = BIEN_SO_MAP.get(ma_tinh, "Không rõ địa phương")
-                    current_plate = text
-                    # Hiển thị biển số + địa phương lên khung hình
-                    cv2.putText(
-                        frame,
-                        f"{text} ({dia_phuong})",
-                        (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.8,
-                        (0, 255, 0),
-                        2
-                    )
-
-        return current_plate  # Trả về biển số đọc được
+        # Dự đoán vị trí các track cho khung hình hiện tại
+        self.tracker.predict()
+        # Để tránh chạy YOLO ở mỗi khung hình (tốn tài nguyên), bộ lập lịch
+        # quyết định dựa trên chuyển động, track chưa xác nhận và ngân sách CPU
+        pending = any(t.confirmed_plate is None for t in self.tracker.tracks)
+        run_detection, reason = self.scheduler.should_detect(frame, pending)
+        DETECT_DECISIONS.labels("yes" if run_detection else "no", reason).inc()
+        detect_ms = None
+        if run_detection:
+            with self._stage("yolo"):
+                if self.roi is not None:
+                    detections = self.roi.detect(models, frame, self.tiler)  # YOLO chỉ trên vùng quan tâm
+                elif self.tiler is not None:
+                    detections = self.tiler.detect(models, frame)           # YOLO theo ô (độ phân giải gốc)
+                else:
+                    detections = models.detect(frame)                        # Phát hiện mới bằng YOLO
+                detect_ms = (time.perf_counter() - frame_start) * 1000
+                self.tracker.update(detections)                          # Ghép phát hiện với các track
+
+        with self._stage("crop"):
+            # Bỏ các mục OCR đã hết hạn trước khi tra cứu
+            self.ocr_cache.prune()
+
+            # Cắt vùng biển số và tra bộ đệm trước, chỉ OCR vùng đã thay đổi.
+            # Track chưa xác nhận luôn OCR lại ở mỗi khung: chỉ lần đọc thật
+            # mới góp phiếu, đọc từ bộ đệm sẽ làm chậm xác nhận (xe đứng yên
+            # trước barie phải chờ bộ đệm hết hạn mới có phiếu tiếp theo)
+            plates = []
+            for track in self.tracker.active_tracks():
+                box, bien_so_crop = self._crop(frame, track.box)
+                if bien_so_crop is None:
+                    continue
+                if track.confirmed_plate is None:
+                    cached, fingerprint = None, self.ocr_cache.fingerprint(bien_so_crop)
+                else:
+                    cached, fingerprint = self.ocr_cache.lookup(box, bien_so_crop, track.id)
+                # [track ID, hộp, vùng cắt, (text, confidence), vân tay, OCR vừa chạy?]
+                plates.append([track.id, box, bien_so_crop, cached, fingerprint, False])
+
+        # Đọc tất cả vùng chưa có trong bộ đệm bằng MỘT lần gọi OCR
+        pending = [p for p in plates if p[3] is None]
+        if pending:
+            inputs = self._ocr_inputs(frame, [p[1] for p in pending], [p[2] for p in pending])
+            with self._stage("ocr"):
+                reads = read_plates(models.reader, inputs, self.ocr_mode, self.ocr_batch_size,
+                                    self.ocr_allowlist)
+            for p, (text, confidence) in zip(pending, reads):
+                # Chuẩn hoá ngay; chuỗi không thể là biển số → rỗng (không biểu quyết)
+                read = (normalize_plate(text) or "", confidence)
+                self.ocr_cache.store(p[1], p[4], read, p[0])
+                p[3], p[5] = read, True
+            OCR_CROPS.labels("ocr").inc(len(pending))
+        OCR_CROPS.labels("cache").inc(len(plates) - len(pending))
+        ACTIVE_TRACKS.set(len(plates))
+
+        if self.roi is not None:
+            self.roi.draw(frame)
+        current_plates = []
+        for track_id, (x1, y1, x2, y2), _, (text, confidence), _, fresh in plates:
+            # Vẽ khung quanh biển số
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+
+            if text:
+                # Tra cứu địa phương theo mã tỉnh (VD: “51F-123.45” → “51”),
+                # tên không dấu vì font của cv2.putText không có dấu
+                dia_phuong = province_name(text, accented=False)
+                current_plates.append({
+                    "track_id": track_id,
+                    "plate": text,
+                    "confidence": confidence,
+                    "box": (x1, y1, x2, y2),
+                    "fresh": fresh,
+                })
+                # Hiển thị track ID + biển số + địa phương lên khung hình
+                cv2.putText(
+                    frame,
+                    f"#{track_id} {text} ({dia_phuong})",
+                    (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.8,
+                    (0, 255, 0),
+                    2
+                )
+
+        # Cập nhật thời gian xử lý cho bộ lập lịch (ngân sách CPU)
+        total_ms = (time.perf_counter() - frame_start) * 1000
+        self.scheduler.record(detect_ms, total_ms - (detect_ms or 0.0))
+        FRAME_SECONDS.observe(total_ms / 1000)
+
+        return current_plates  # Trả về các biển số đọc được
+
+    # -----------------------------------------------------------------
+    # CẮT VÙNG BIỂN SỐ TỪ KẾT QUẢ YOLO
+    # -----------------------------------------------------------------
+    def _crop(self, frame, box):
+        """
+        Cắt vùng biển số (hộp được giới hạn trong khung hình).
+        Trả về ((x1, y1, x2, y2), vùng cắt) hoặc (hộp, None) nếu vùng rỗng.
+        """
+        h, w = frame.shape[:2]
+        x1, y1 = max(0, int(box[0])), max(0, int(box[1]))
+        x2, y2 = min(w, int(box[2])), min(h, int(box[3]))
+        # Cắt vùng chứa biển số ra khỏi khung hình
+        # (cắt trước khi vẽ khung để viền xanh không lọt vào OCR)
+        bien_so_crop = frame[y1:y2, x1:x2]
+        if bien_so_crop.size == 0:
+            return (x1, y1, x2, y2), None
+        return (x1, y1, x2, y2), bien_so_crop
+
+    def _collect_crops(self, frame, results):
+        """
+        Gom tất cả vùng biển số trong kết quả YOLO
+        (mảng (N, 5): [x1, y1, x2, y2, confidence]).
+        Trả về danh sách ((x1, y1, x2, y2), vùng cắt, độ tin cậy YOLO),
+        bỏ qua vùng rỗng.
+        """
+        crops = []
+        for det in results:
+            box, bien_so_crop = self._crop(frame, det)
+            if bien_so_crop is None:
+                continue  # Nếu ảnh rỗng thì bỏ qua
+            crops.append((box, bien_so_crop, float(det[4])))
+        return crops
 
     # -----------------------------------------------------------------
     # ỔN ĐỊNH KẾT QUẢ NHẬN DIỆN (CHỐNG NHIỄU)
     # -----------------------------------------------------------------
-    def stabilize_plate(self, current_plate):
+    def stabilize_plate(self, current_plates):
         """
-        Kiểm tra xem biển số có xuất hiện liên tục đủ lâu
-        để xác nhận là hợp lệ hay không.
-        Khi đủ điều kiện, trả về thông tin chi tiết:
-            - Biển số
-            - Tên chủ xe
-            - Địa phương
-            - Thời gian nhận diện
+        Xác nhận biển số theo từng track: mỗi lần OCR thật (không tính kết
+        quả lấy từ bộ đệm) góp phiếu theo từng ký tự với trọng số là độ tin
+        cậy OCR. Biển số được xác nhận khi mọi vị trí ký tự đều vượt ngưỡng
+        (xem bieu_quyet.CharVoter). Mỗi track chỉ xác nhận một lần.
+        Trả về danh sách kết quả mới xác nhận, mỗi kết quả gồm:
+            - Biển số, tên chủ xe, địa phương, thời gian nhận diện,
+              track ID và độ tin cậy tổng hợp
         """
-        if not current_plate:
-            return None  # Nếu không có biển số, bỏ qua
-
-        # Thêm biển số hiện tại vào bộ đệm
-        self.plate_buffer.append(current_plate)
-        # Giới hạn bộ đệm 5 phần tử (FIFO)
-        if len(self.plate_buffer) > 5:
-            self.plate_buffer.pop(0)
-
-        # Nếu cùng 1 biển số xuất hiện >= 3 lần trong 5 khung gần nhất
-        # và khác với biển số đã xác nhận gần nhất → xác nhận mới
-        if self.plate_buffer.count(current_plate) >= 3 and current_plate != self.last_confirmed_plate:
-            # Lấy mã tỉnh từ biển số
-            ma_tinh = current_plate.split("-")[0] if "-" in current_plate else current_plate[:2]
-            # Tra cứu tên địa phương từ mã tỉnh
-            dia_phuong = BIEN_SO_MAP_DAU.get(ma_tinh, "Không rõ địa phương")
-
-            # Nếu biển số chưa có chủ xe → gán ngẫu nhiên
-            if current_plate not in self.plate_owner_map:
-                self.plate_owner_map[current_plate] = random.choice(CHU_XE)
-            ten_chu_xe = self.plate_owner_map[current_plate]
-
-            # Lấy thời gian hiện tại
-            now = datetime.datetime.now().strftime("%H:%M:%S %d/%m/%Y")
-
-            # Cập nhật biển số đã xác nhận gần nhất
-            self.last_confirmed_plate = current_plate
-
-            # Trả về kết quả nhận diện ổn định
-            return {
-                "plate": current_plate,
-                "owner": ten_chu_xe,
-                "location": dia_phuong,
-                "time": now
+        with STABILIZE_SECONDS.time():
+            confirmed = self._stabilize(current_plates)
+        CONFIRMED.inc(len(confirmed))
+        return confirmed
+
+    def _stabilize(self, current_plates):
+        confirmed = []
+        now = time.monotonic()
+        for read in current_plates:
+            track = self.tracker.get(read["track_id"])
+            if track is None or track.confirmed_plate or not read["fresh"]:
+                continue
+
+            track.voter.add(read["plate"], read["confidence"])
+            voted = track.voter.result()
+            if voted is None:
+                continue  # Chưa đủ điều kiện ổn định
+            plate, confidence = voted
+
+            track.confirmed_plate = plate
+            # Bỏ qua nếu cùng biển số vừa được xác nhận (track mất rồi bắt lại)
+            last = self.recent_confirmed.get(plate)
+            self.recent_confirmed[plate] = now
+            if last is not None and now - last < self.repeat_window:
+                continue
+
+            result = self._make_result(plate)
+            result["track_id"] = track.id
+            result["confidence"] = confidence
+            if self.lane is not None:
+                result["lane"] = self.lane
+            if self.events is not None:
+                self.events.record(result)  # Không chặn: ghi ở luồng nền
+            confirmed.append(result)
+
+        # Dọn các biển số đã quá khoảng chống trùng
+        if len(self.recent_confirmed) > 256:
+            self.recent_confirmed = {
+                p: t for p, t in self.recent_confirmed.items() if now - t < self.repeat_window
             }
+        return confirmed
+
+    def _make_result(self, plate):
+        """Tạo kết quả nhận diện: biển số, chủ xe, địa phương, thời gian."""
+        # Tra cứu tên địa phương từ mã tỉnh (biển số đã ở dạng chuẩn)
+        dia_phuong = province_name(plate)
+
+        registered_plate = None
+        if self.owners is not None:
+            # Tra danh bạ (chính xác, hoặc sai 1 ký tự nếu chỉ có một biển gần)
+            found = self.owners.find(plate)
+            if found is not None:
+                registered_plate, ten_chu_xe, _ = found
+            else:
+                ten_chu_xe = "Chưa đăng ký"
+        else:
+            # Không có danh bạ: biển số chưa có chủ xe → gán ngẫu nhiên
+            if plate not in self.plate_owner_map:
+                self.plate_owner_map[plate] = random.choice(CHU_XE)
+            ten_chu_xe = self.plate_owner_map[plate]
 
-        return None  # Nếu chưa đủ điều kiện ổn định thì không trả về gì
+        # Lấy thời gian hiện tại
+        now = datetime.datetime.now().strftime("%H:%M:%S %d/%m/%Y")
+
+        # Cập nhật biển số đã xác nhận gần nhất
+        self.last_confirmed_plate = plate
+
+        result = {
+            "plate": plate,
+            "owner": ten_chu_xe,
+            "location": dia_phuong,
+            "time": now
+        }
+        # Khớp gần đúng: biển số trong danh bạ khác biển số đọc được
+        if registered_plate is not None and registered_plate != plate:
+            result["registered_plate"] = registered_plate
+        return result
+
+    # -----------------------------------------------------------------
+    # ĐỌC TẤT CẢ BIỂN SỐ TRONG MỘT KHUNG HÌNH (KHÔNG LƯU TRẠNG THÁI)
+    # -----------------------------------------------------------------
+    def read_frame(self, frame):
+        """
+        Chạy YOLO + OCR trên một khung hình độc lập (ảnh tĩnh, video lưu trữ).
+        Không dùng lại kết quả cũ và không vẽ lên khung hình.
+        Trả về danh sách dict:
+            {'plate', 'province', 'box', 'confidence', 'det_confidence'}
+        """
+        return self.read_frames([frame])[0]
+
+    def read_frames(self, frames, models=None):
+        """
+        Như read_frame cho nhiều ảnh độc lập: YOLO chạy MỘT lần gọi theo lô
+        (detect_batch) và vùng biển số của mọi ảnh được đọc bằng MỘT lần
+        gọi OCR. Dùng cho dịch vụ HTTP gom nhiều yêu cầu (dich_vu_http.py).
+        - models: ModelBundle dùng cho lần gọi này, mặc định self.models.
+        Trả về danh sách kết quả (như read_frame) theo đúng thứ tự frames.
+        """
+        models = models or self.models
+        if not frames:
+            return []
+        with self._stage("yolo"):
+            if len(frames) == 1:
+                detections = [models.detect(frames[0])]
+            else:
+                detections = models.detect_batch(frames)
+
+        # [(chỉ số ảnh, hộp, độ tin cậy YOLO)] và ảnh đưa vào OCR, theo cùng thứ tự
+        owners, inputs = [], []
+        for i, (frame, results) in enumerate(zip(frames, detections)):
+            with self._stage("crop"):
+                crops = self._collect_crops(frame, results)
+            # Bộ đệm tiền xử lý tiếp nối sau các vùng của ảnh trước (cùng một lần OCR)
+            inputs.extend(self._ocr_inputs(frame, [b for b, _, _ in crops], [c for _, c, _ in crops],
+                                           start=len(inputs)))
+            owners.extend((i, box, det_confidence) for box, _, det_confidence in crops)
+        # Đọc tất cả biển số của mọi ảnh bằng một lần gọi OCR
+        with self._stage("ocr"):
+            reads = read_plates(models.reader, inputs, self.ocr_mode, self.ocr_batch_size,
+                                self.ocr_allowlist)
+
+        plates = [[] for _ in frames]
+        for (i, box, det_confidence), (raw, confidence) in zip(owners, reads):
+            # Bỏ chuỗi không thể là biển số hợp lệ
+            text = normalize_plate(raw)
+            if not text:
+                continue
+            plates[i].append({
+                "plate": text,
+                "province": province_name(text),
+                "box": list(box),
+                "confidence": round(confidence, 4),
+                "det_confidence": round(det_confidence, 4),
+            })
+        return plates
 
     # -----------------------------------------------------------------
     # NHẬN DIỆN BIỂN SỐ TỪ ẢNH TĨNH (TẢI LÊN)
@@ -167,64 +468,65 @@ class PlateRecognizer:
     def recognize_from_image(self, image_path):
         """
         Nhận diện biển số từ ảnh tĩnh (ảnh được tải lên từ giao diện).
-        Trả về kết quả tương tự như stabilize_plate: 
-            {'plate', 'owner', 'location', 'time'}
+        Ảnh đã nhận diện trước đó (cùng nội dung, cùng phiên bản mô hình)
+        lấy kết quả từ bộ đệm, không chạy lại YOLO / OCR.
+        Trả về kết quả tương tự như stabilize_plate:
+            {'plate', 'owner', 'location', 'time', 'image', 'cached'}
         """
-        # Đọc ảnh từ đường dẫn
-        frame = cv2.imread(image_path)
+        # Đọc file một lần: vừa băm làm khoá bộ đệm, vừa giải mã ảnh
+        try:
+            with open(image_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR) if data else None
         if frame is None:
             print("⚠️ Không thể đọc ảnh từ:", image_path)
             return None
 
-        # Phát hiện biển số
-        results = model(frame)
-        current_plate = ""
-
-        for r in results:
-            boxes = r.boxes.xyxy.cpu().numpy() if r.boxes is not None else []
-            for box in boxes:
-                x1, y1, x2, y2 = map(int, box[:4])
-                bien_so_crop = frame[y1:y2, x1:x2]
-                if bien_so_crop.size == 0:
-                    continue
-
-                result = reader.readtext(bien_so_crop)
-                text = " ".join([res[1] for res in result]) if result else ""
+        plates = None
+        if self.results is not None:
+            key = content_hash(data)
+            plates = self.results.get(key)
+        cached = plates is not None
+        if not cached:
+            # Phát hiện và đọc tất cả biển số trong ảnh (bộ mô hình có thể
+            # dùng chung với luồng camera / các luồng tải ảnh khác)
+            with self.models.infer_lock:
+                plates = self.read_frame(frame)
+            if self.results is not None:
+                self.results.put(key, plates)
 
-                if text:
-                    ma_tinh = text.split("-")[0] if "-" in text else text[:2]
-                    dia_phuong = BIEN_SO_MAP.get(ma_tinh, "Không rõ địa phương")
-                    current_plate = text
-                    # Hiển thị trực tiếp trên ảnh (nếu muốn)
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    cv2.putText(frame, f"{text} ({dia_phuong})", (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        current_plate = ""
+        for plate in plates:
+            (x1, y1, x2, y2), text = plate["box"], plate["plate"]
+            dia_phuong = province_name(text, accented=False)
+            current_plate = text
+            # Hiển thị trực tiếp trên ảnh (nếu muốn)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(frame, f"{text} ({dia_phuong})", (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
 
         # Nếu không đọc được biển số
         if not current_plate:
             return None
 
-        # Gán chủ xe ngẫu nhiên nếu chưa có
-        if current_plate not in self.plate_owner_map:
-            self.plate_owner_map[current_plate] = random.choice(CHU_XE)
-
-        ten_chu_xe = self.plate_owner_map[current_plate]
-        ma_tinh = current_plate.split("-")[0] if "-" in current_plate else current_plate[:2]
-        dia_phuong = BIEN_SO_MAP_DAU.get(ma_tinh, "Không rõ địa phương")
-        now = datetime.datetime.now().strftime("%H:%M:%S %d/%m/%Y")
-
-        return {
-            "plate": current_plate,
-            "owner": ten_chu_xe,
-            "location": dia_phuong,
-            "time": now,
-            "image": frame  # Trả thêm ảnh có vẽ khung biển số
-        }
+        result = self._make_result(current_plate)
+        if self.events is not None:
+            self.events.record(result, source=image_path)
+        result["image"] = frame  # Trả thêm ảnh có vẽ khung biển số
+        result["cached"] = cached
+        return result
 
     # -----------------------------------------------------------------
     # GIẢI PHÓNG TÀI NGUYÊN
     # -----------------------------------------------------------------
     def release(self):
-        """Giải phóng camera và đóng các cửa sổ OpenCV."""
-        self.cap.release()
+        """Giải phóng camera, ghi nốt sự kiện và đóng các cửa sổ OpenCV."""
+        if self.cap is not None:
+            self.cap.release()
+        if self._owns_events:
+            self.events.close()
+        if self._owns_results:
+            self.results.close()
         cv2.destroyAllWindows()
@@ -0,0 +1,399 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+import cv2
+import numpy as np
+from chi_so import REGISTRY, setup as setup_metrics
+
+# =====================================================================
+# DỊCH VỤ HTTP NHẬN DIỆN BIỂN SỐ (ASYNCIO, GOM LÔ ĐỘNG)
+# ---------------------------------------------------------------------
+# Cho hệ thống bán vé / điều khiển barie gửi ảnh trực tiếp, không cần
+# giao diện Tkinter. Chỉ dùng thư viện chuẩn (asyncio), lắng nghe nội bộ.
+#
+#   POST /recognize   thân là ảnh JPEG/PNG (Content-Type: image/jpeg ...)
+#                     hoặc multipart/form-data (phần file đầu tiên)
+#                     → {"plates": [{"plate", "province", "box",
+#                        "confidence", "det_confidence"}], ...}
+#   GET  /healthz     → 200 {"status": "ok", ...} khi mô hình đã sẵn sàng,
+#                       503 {"status": "loading"} khi đang tải
+#
+# Gom lô động:
+# - Yêu cầu được giải mã ảnh rồi đưa vào hàng đợi có giới hạn
+#   (http_queue_limit; đầy → 503 ngay, không xếp hàng vô hạn).
+# - Mỗi luồng mô hình (http_workers, mỗi luồng một ModelBundle) lấy yêu
+#   cầu đầu tiên, chờ thêm tối đa http_batch_window_ms để gom tới
+#   http_max_batch ảnh, rồi chạy YOLO MỘT lần theo lô và OCR MỘT lần cho
+#   mọi vùng biển số (PlateRecognizer.read_frames).
+# - Trong lúc một lô đang chạy, yêu cầu mới tiếp tục dồn vào lô sau, nên
+#   tải càng cao thì lô càng lớn thay vì xếp hàng từng lần gọi mô hình.
+# - Mỗi yêu cầu có thời gian chờ (http_timeout): quá hạn → 504; yêu cầu
+#   đã hết hạn bị bỏ khỏi lô trước khi chạy mô hình.
+# - Dịch vụ chỉ trả kết quả đọc được, không ghi kho sự kiện.
+#
+# Ví dụ:
+#   python dich_vu_http.py --port 8080 --workers 2 --max-batch 8
+#   curl --data-binary @anh.jpg -H "Content-Type: image/jpeg" http://127.0.0.1:8080/recognize
+# =====================================================================
+
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "Số yêu cầu HTTP theo đường dẫn và mã trả về",
+                                 ("path", "status"))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram("http_recognize_seconds",
+                                          "Thời gian xử lý một yêu cầu /recognize (gồm thời gian chờ lô)")
+HTTP_BATCH_SIZE = REGISTRY.histogram("http_batch_size", "Số ảnh mỗi lần gọi mô hình",
+                                     buckets=(1, 2, 4, 8, 16, 32))
+HTTP_QUEUE_DEPTH = REGISTRY.gauge("http_queue_depth", "Số yêu cầu đang chờ gom lô")
+
+STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large",
+    415: "Unsupported Media Type", 500: "Internal Server Error",
+    503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+MAX_HEADERS = 100
+# Nhãn "path" của chỉ số: đường dẫn lạ gom về "other" để số chuỗi chỉ số không tăng mãi
+ROUTES = ("/recognize", "/healthz")
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _Job:
+    __slots__ = ("frame", "future")
+
+    def __init__(self, frame, future):
+        self.frame = frame
+        self.future = future
+
+
+# ---------------------------------------------------------------------
+# GOM LÔ ĐỘNG
+# ---------------------------------------------------------------------
+class MicroBatcher:
+    def __init__(self, recognizers, window_ms=5, max_batch=8, queue_limit=64):
+        """
+        Gom các yêu cầu đồng thời thành lô cho mô hình.
+            - recognizers: danh sách PlateRecognizer, mỗi cái một luồng mô hình
+            - window_ms: thời gian chờ tối đa để gom thêm yêu cầu vào lô
+            - max_batch: số ảnh tối đa mỗi lô
+            - queue_limit: số yêu cầu chờ tối đa (quá thì từ chối)
+        Phải gọi start() bên trong vòng lặp asyncio.
+        """
+        self.recognizers = recognizers
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.queue_limit = max(1, queue_limit)
+        self._executor = ThreadPoolExecutor(max_workers=len(recognizers), thread_name_prefix="http-model")
+        self._queue = None
+        self._arrived = None
+        self._tasks = []
+        # Thống kê: số lô và số ảnh đã chạy
+        self.batches = 0
+        self.images = 0
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_limit)
+        self._arrived = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._worker(r)) for r in self.recognizers]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def qsize(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, frame, timeout):
+        """Đưa một ảnh vào lô kế tiếp và chờ kết quả (danh sách biển số)."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(_Job(frame, future))
+        except asyncio.QueueFull:
+            raise HttpError(503, "Hàng đợi nhận diện đã đầy, thử lại sau")
+        self._arrived.set()
+        HTTP_QUEUE_DEPTH.set(self._queue.qsize())
+        try:
+            # Hết hạn → future bị huỷ, luồng mô hình sẽ bỏ qua yêu cầu này
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise HttpError(504, "Quá thời gian chờ nhận diện")
+
+    async def _collect(self):
+        """Lấy yêu cầu đầu tiên rồi gom thêm trong cửa sổ thời gian."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        HTTP_QUEUE_DEPTH.set(self._queue.qsize())
+        # Bỏ yêu cầu đã hết hạn / khách đã ngắt trong lúc chờ
+        return [job for job in batch if not job.future.done()]
+
+    async def _worker(self, recognizer):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            HTTP_BATCH_SIZE.observe(len(batch))
+            try:
+                results = await loop.run_in_executor(self._executor, recognizer.read_frames,
+                                                     [job.frame for job in batch])
+            except Exception as exc:
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.images += len(batch)
+            for job, plates in zip(batch, results):
+                if not job.future.done():
+                    job.future.set_result(plates)
+
+
+# ---------------------------------------------------------------------
+# MÁY CHỦ HTTP
+# ---------------------------------------------------------------------
+def _decode_image(data):
+    """Giải mã JPEG/PNG từ bytes; None nếu không phải ảnh hợp lệ."""
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def _image_bytes(content_type, body):
+    """Lấy bytes ảnh từ thân yêu cầu: ảnh thô hoặc phần file đầu tiên của multipart."""
+    if not body:
+        raise HttpError(400, "Thiếu ảnh trong thân yêu cầu")
+    # Giữ nguyên chữ hoa/thường của boundary, chỉ so kiểu nội dung không phân biệt
+    kind = content_type.split(";", 1)[0].strip().lower()
+    if kind == "multipart/form-data":
+        message = BytesParser(policy=HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body)
+        for part in message.iter_parts():
+            if part.get_filename() or part.get_content_maintype() == "image":
+                return part.get_payload(decode=True)
+        raise HttpError(400, "Không có file ảnh trong multipart/form-data")
+    if kind and not kind.startswith("image/") and kind != "application/octet-stream":
+        raise HttpError(415, "Chỉ nhận ảnh JPEG/PNG hoặc multipart/form-data")
+    return body
+
+
+class PlateService:
+    def __init__(self, batcher, config):
+        """
+        Máy chủ HTTP quanh MicroBatcher.
+            - config: lấy http_timeout và http_max_upload_mb
+        """
+        self.batcher = batcher
+        self.timeout = config["http_timeout"]
+        self.max_body = int(config["http_max_upload_mb"] * 1024 * 1024)
+        self.started = time.time()
+
+    # -----------------------------------------------------------------
+    # ĐỌC / GHI HTTP/1.1
+    # -----------------------------------------------------------------
+    async def _read_request(self, reader):
+        """Đọc một yêu cầu; trả về (method, path, headers, body) hoặc None khi khách đóng kết nối."""
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Dòng yêu cầu không hợp lệ")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HttpError(400, "Quá nhiều header")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(411, "Cần Content-Length (không hỗ trợ chunked)")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HttpError(400, "Content-Length không hợp lệ")
+        if length > self.max_body:
+            raise HttpError(413, f"Ảnh vượt quá {self.max_body // (1024 * 1024)} MB")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+
+    async def handle(self, reader, writer):
+        """Phục vụ một kết nối (hỗ trợ keep-alive)."""
+        try:
+            while True:
+                keep_alive, path = False, "?"
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.timeout)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, payload = await self._route(method, path, headers, body)
+                except HttpError as exc:
+                    status, payload = exc.status, {"error": exc.message}
+                except asyncio.TimeoutError:
+                    status, payload = 408, {"error": "Quá thời gian đọc yêu cầu"}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    raise
+                except Exception as exc:  # Lỗi mô hình: trả 500, giữ dịch vụ chạy
+                    status, payload = 500, {"error": str(exc)}
+                HTTP_REQUESTS.labels(path if path in ROUTES else "other", str(status)).inc()
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    # -----------------------------------------------------------------
+    # ĐỊNH TUYẾN
+    # -----------------------------------------------------------------
+    async def _route(self, method, path, headers, body):
+        if path == "/healthz":
+            if method != "GET":
+                raise HttpError(405, "Chỉ hỗ trợ GET")
+            return self._health()
+        if path == "/recognize":
+            if method != "POST":
+                raise HttpError(405, "Chỉ hỗ trợ POST")
+            with HTTP_REQUEST_SECONDS.time():
+                return 200, await self._recognize(headers, body)
+        raise HttpError(404, "Không có đường dẫn này")
+
+    def _health(self):
+        ready = all("detector" in r.models.load_times and "reader" in r.models.load_times
+                    for r in self.batcher.recognizers)
+        payload = {
+            "status": "ok" if ready else "loading",
+            "queue": self.batcher.qsize(),
+            "queue_limit": self.batcher.queue_limit,
+            "workers": len(self.batcher.recognizers),
+            "batches": self.batcher.batches,
+            "images": self.batcher.images,
+            "uptime_s": round(time.time() - self.started, 1),
+        }
+        return (200 if ready else 503), payload
+
+    async def _recognize(self, headers, body):
+        start = time.perf_counter()
+        data = _image_bytes(headers.get("content-type", ""), body)
+        loop = asyncio.get_running_loop()
+        # Giải mã ảnh ngoài vòng lặp sự kiện (không chặn các kết nối khác)
+        frame = await loop.run_in_executor(None, _decode_image, data)
+        if frame is None:
+            raise HttpError(400, "Không giải mã được ảnh (chỉ nhận JPEG/PNG)")
+        plates = await self.batcher.submit(frame, self.timeout)
+        return {
+            "plates": plates,
+            "width": frame.shape[1],
+            "height": frame.shape[0],
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+
+def create_recognizers(config, workers):
+    """Mỗi luồng mô hình một PlateRecognizer (không mở camera, không ghi kho sự kiện)."""
+    from chuc_nang import PlateRecognizer
+    config = dict(config, event_db="", result_cache="")
+    recognizers = []
+    for _ in range(max(1, workers)):
+        owners = recognizers[0].owners if recognizers else None
+        recognizer = PlateRecognizer(camera_index=None, config=config, owners=owners)
+        if config["warmup"]:
+            recognizer.models.warmup(background=True)
+        recognizers.append(recognizer)
+    return recognizers
+
+
+async def serve(config, recognizers):
+    """Chạy dịch vụ tới khi bị huỷ."""
+    batcher = MicroBatcher(recognizers, config["http_batch_window_ms"], config["http_max_batch"],
+                           config["http_queue_limit"])
+    batcher.start()
+    service = PlateService(batcher, config)
+    server = await asyncio.start_server(service.handle, config["http_host"], config["http_port"])
+    print(f"✔ Dịch vụ nhận diện: http://{config['http_host']}:{config['http_port']}/recognize "
+          f"({len(recognizers)} luồng mô hình, lô tối đa {batcher.max_batch}, "
+          f"cửa sổ {config['http_batch_window_ms']} ms)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main(argv=None):
+    from cau_hinh import load_config
+
+    config = load_config(warmup=True)
+    parser = argparse.ArgumentParser(description="Dịch vụ HTTP nhận diện biển số (gom lô động)")
+    parser.add_argument("--host", default=config["http_host"])
+    parser.add_argument("--port", type=int, default=config["http_port"])
+    parser.add_argument("--workers", type=int, default=config["http_workers"],
+                        help="Số luồng mô hình (mỗi luồng một bản YOLO + OCR)")
+    parser.add_argument("--max-batch", type=int, default=config["http_max_batch"])
+    parser.add_argument("--window-ms", type=float, default=config["http_batch_window_ms"],
+                        help="Thời gian chờ gom thêm yêu cầu vào lô (0 = không chờ)")
+    parser.add_argument("--queue-limit", type=int, default=config["http_queue_limit"])
+    parser.add_argument("--timeout", type=float, default=config["http_timeout"])
+    args = parser.parse_args(argv)
+    config.update(http_host=args.host, http_port=args.port, http_workers=args.workers,
+                  http_max_batch=args.max_batch, http_batch_window_ms=args.window_ms,
+                  http_queue_limit=args.queue_limit, http_timeout=args.timeout)
+
+    setup_metrics(config)
+    recognizers = create_recognizers(config, config["http_workers"])
+    try:
+        asyncio.run(serve(config, recognizers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import platform
+import sys
+import threading
+import time
+import numpy as np
+
+# =====================================================================
+# ĐO HIỆU NĂNG NHẬN DIỆN (BENCHMARK)
+# ---------------------------------------------------------------------
+# - Phát lại một tập ảnh cố định (thư mục / glob, lặp vòng) hoặc một
+#   video qua PlateRecognizer và đo thời gian từng bước:
+#       decode → yolo → crop → preprocess → ocr → stabilize → render
+#   (yolo / crop / preprocess / ocr đo bên trong PlateRecognizer qua móc _stage).
+# - Báo cáo phân vị độ trễ (p50 / p90 / p99), FPS đầu-cuối, số biển số
+#   mỗi giây và bộ nhớ đỉnh (RSS), ghi ra JSON để so sánh các lần chạy.
+# - So sánh cấu hình: mỗi tổ hợp (khoảng chạy YOLO, chế độ OCR, batch
+#   OCR, backend, số luồng) chạy trong một tiến trình mới để RSS và bộ
+#   nhớ đệm của mô hình không ảnh hưởng lẫn nhau.
+#
+# Ví dụ:
+#   python do_hieu_nang.py anh_mau/ --frames 300 --output bench.json
+#   python do_hieu_nang.py cong.mp4 --detect-interval 1 5 15 --ocr-mode rows crop --workers 1 2
+# =====================================================================
+
+STAGES = ("decode", "yolo", "crop", "preprocess", "ocr", "stabilize", "render")
+
+
+# ---------------------------------------------------------------------
+# BỘ ĐO THỜI GIAN TỪNG BƯỚC
+# ---------------------------------------------------------------------
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageProfiler:
+    def __init__(self):
+        """Ghi lại thời gian (giây) của từng bước; an toàn khi nhiều luồng cùng ghi."""
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Ngữ cảnh đo một bước: with profiler.stage("ocr"): ..."""
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def clear(self):
+        with self._lock:
+            self.samples = {}
+
+    def summary(self):
+        """Thống kê (ms) cho từng bước: count, mean, p50, p90, p99, max."""
+        report = {}
+        for name, values in self.samples.items():
+            ms = np.array(values) * 1000.0
+            report[name] = {
+                "count": int(ms.size),
+                "mean_ms": round(float(ms.mean()), 3),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p90_ms": round(float(np.percentile(ms, 90)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                "max_ms": round(float(ms.max()), 3),
+            }
+        return report
+
+
+def peak_rss_mb():
+    """Bộ nhớ đỉnh của tiến trình (MB), None nếu không đo được."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux trả về KB, macOS trả về byte
+        return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024.0 * 1024.0), 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+# ---------------------------------------------------------------------
+# NGUỒN KHUNG HÌNH CỐ ĐỊNH
+# ---------------------------------------------------------------------
+def _frames(inputs, count, profiler):
+    """
+    Sinh `count` khung hình (đo bước decode): video đọc tuần tự, ảnh được
+    giải mã lại mỗi lần và lặp vòng theo thứ tự cố định.
+    """
+    import cv2
+    from xu_ly_hang_loat import _expand_inputs, VIDEO_EXTS
+
+    paths = _expand_inputs(inputs)
+    if not paths:
+        raise ValueError("Không tìm thấy ảnh hoặc video nào để đo")
+
+    videos = [p for p in paths if p.lower().endswith(VIDEO_EXTS)]
+    if videos:
+        produced, index = 0, 0
+        while produced < count:
+            path = videos[index % len(videos)]
+            index += 1
+            cap = cv2.VideoCapture(path)
+            read = 0
+            while produced < count:
+                with profiler.stage("decode"):
+                    ret, frame = cap.read()
+                if not ret:
+                    break
+                read += 1
+                produced += 1
+                yield frame
+            cap.release()
+            if read == 0:
+                raise ValueError(f"Không đọc được video: {path}")
+        return
+
+    for i in range(count):
+        with profiler.stage("decode"):
+            frame = cv2.imread(paths[i % len(paths)])
+        if frame is None:
+            raise ValueError(f"Không đọc được ảnh: {paths[i % len(paths)]}")
+        yield frame
+
+
+# ---------------------------------------------------------------------
+# MỘT LẦN CHẠY VỚI MỘT CẤU HÌNH
+# ---------------------------------------------------------------------
+def run_benchmark(inputs, frames=300, warmup=10, mode="stream", workers=1, **overrides):
+    """
+    Chạy đo với một cấu hình và trả về dict báo cáo.
+        - mode: "stream" (detect_plate + stabilize_plate, như camera) hoặc
+          "still" (read_frame, như xử lý ảnh hàng loạt)
+        - workers: số luồng, mỗi luồng một PlateRecognizer + bản mô hình
+          riêng, cùng phát lại tập khung hình (như nhiều camera)
+        - overrides: ghi đè cấu hình (xem cau_hinh.DEFAULTS)
+    """
+    from cau_hinh import load_config
+    from chuc_nang import PlateRecognizer
+    from hien_thi import FrameRenderer
+
+    # Không ghi sự kiện, không dùng bộ đệm kết quả ảnh (trúng bộ đệm làm sai số đo)
+    config = load_config(event_db="", result_cache="", warmup=False, **overrides)
+    profiler = StageProfiler()
+    recognizers = []
+    for _ in range(workers):
+        recognizer = PlateRecognizer(camera_index=None, config=config)
+        recognizer.profiler = profiler
+        recognizers.append(recognizer)
+
+    # Làm nóng (tải mô hình, cấp phát bộ đệm) rồi xoá số liệu
+    warm_frames = list(_frames(inputs, max(1, warmup), profiler))
+    for recognizer in recognizers:
+        recognizer.models.wait_ready()
+        for frame in warm_frames:
+            recognizer.read_frame(frame.copy())
+    profiler.clear()
+
+    counts = {"plates_read": 0, "plates_confirmed": 0, "frames": 0}
+    counts_lock = threading.Lock()
+
+    def worker(recognizer):
+        renderer = FrameRenderer(None, (640, 480))
+        read = confirmed = done = 0
+        for frame in _frames(inputs, frames, profiler):
+            if mode == "still":
+                read += len(recognizer.read_frame(frame))
+            else:
+                current = recognizer.detect_plate(frame)
+                read += len(current)
+                with profiler.stage("stabilize"):
+                    confirmed += len(recognizer.stabilize_plate(current))
+                with profiler.stage("render"):
+                    renderer.convert(frame)
+            done += 1
+        with counts_lock:
+            counts["plates_read"] += read
+            counts["plates_confirmed"] += confirmed
+            counts["frames"] += done
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(r,)) for r in recognizers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    stages = profiler.summary()
+    scheduler = recognizers[0].scheduler.counters if mode == "stream" else None
+    # Khoảng thực tế giữa hai lần chạy YOLO (bộ lập lịch có thể giãn theo ngân sách)
+    effective_interval = None
+    if scheduler is not None and sum(scheduler["run"].values()):
+        decisions = sum(scheduler["run"].values()) + sum(scheduler["skip"].values())
+        effective_interval = round(decisions / sum(scheduler["run"].values()), 2)
+    return {
+        "config": {
+            "mode": mode,
+            "workers": workers,
+            "detector_backend": config["detector_backend"],
+            "ocr_backend": config["ocr_backend"],
+            "ocr_mode": config["ocr_mode"],
+            "ocr_batch_size": config["ocr_batch_size"],
+            "preprocess": config["preprocess"],
+            "detect_min_interval": config["detect_min_interval"],
+            "detect_idle_interval": config["detect_idle_interval"],
+            "frame_budget_ms": config["frame_budget_ms"] if math.isfinite(config["frame_budget_ms"]) else None,
+        },
+        "effective_detect_interval": effective_interval,
+        "frames": counts["frames"],
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(counts["frames"] / elapsed, 2) if elapsed else None,
+        "plates_read_per_s": round(counts["plates_read"] / elapsed, 2) if elapsed else None,
+        "plates_confirmed": counts["plates_confirmed"],
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {name: stages[name] for name in STAGES if name in stages},
+        "scheduler": scheduler,
+        "model_load_s": {k: round(v, 3) for k, v in recognizers[0].models.load_times.items()},
+    }
+
+
+def _run_in_child(args):
+    inputs, frames, warmup, mode, workers, overrides = args
+    return run_benchmark(inputs, frames, warmup, mode, workers, **overrides)
+
+
+# ---------------------------------------------------------------------
+# SO SÁNH NHIỀU CẤU HÌNH
+# ---------------------------------------------------------------------
+def _grid(args):
+    """Tất cả tổ hợp cấu hình cần chạy (mỗi tổ hợp: (workers, overrides))."""
+    combos = []
+    for interval, ocr_mode, batch, backend, ocr_backend, preprocess, workers in itertools.product(
+        args.detect_interval or [None], args.ocr_mode or [None], args.batch_size or [None],
+        args.backend or [None], args.ocr_backend or [None], args.preprocess or [None], args.workers,
+    ):
+        overrides = {"ocr_mode": ocr_mode, "ocr_batch_size": batch, "detector_backend": backend,
+                     "ocr_backend": ocr_backend,
+                     "preprocess": None if preprocess is None else preprocess == "on"}
+        if interval is not None:
+            # Khoảng cố định: chạy YOLO đúng mỗi `interval` khung hình; bỏ ngân
+            # sách CPU để bộ lập lịch không tự giãn khoảng khi YOLO chậm
+            overrides.update(detect_min_interval=interval, detect_idle_interval=interval,
+                             frame_budget_ms=float("inf"))
+        combos.append((workers, {k: v for k, v in overrides.items() if v is not None}))
+    return combos
+
+
+def _print_table(runs, stream):
+    header = f"{'fps':>8} {'biển/s':>8} {'yolo p50':>9} {'ocr p50':>9} {'RSS MB':>8}  cấu hình"
+    print(header, file=stream)
+    for run in runs:
+        stages = run["stages"]
+        yolo = stages.get("yolo", {}).get("p50_ms", float("nan"))
+        ocr = stages.get("ocr", {}).get("p50_ms", float("nan"))
+        print(f"{run['fps']:>8} {run['plates_read_per_s']:>8} {yolo:>9} {ocr:>9} "
+              f"{run['peak_rss_mb']!s:>8}  {json.dumps(run['config'], ensure_ascii=False)}", file=stream)
+
+
+def main(argv=None):
+    from doc_ky_tu import OCR_MODES
+    from bo_phat_hien import DETECTOR_BACKENDS
+    from bo_nhan_dang import OCR_BACKENDS
+
+    parser = argparse.ArgumentParser(description="Đo hiệu năng nhận diện biển số theo từng bước")
+    parser.add_argument("inputs", nargs="+", help="Thư mục ảnh, mẫu glob hoặc file video")
+    parser.add_argument("--frames", type=int, default=300, help="Số khung hình đo mỗi luồng")
+    parser.add_argument("--warmup", type=int, default=10, help="Số khung hình làm nóng (không tính)")
+    parser.add_argument("--mode", choices=("stream", "still"), default="stream")
+    parser.add_argument("--detect-interval", type=int, nargs="*", help="Chạy YOLO mỗi N khung hình")
+    parser.add_argument("--ocr-mode", nargs="*", choices=OCR_MODES)
+    parser.add_argument("--batch-size", type=int, nargs="*", help="Số vùng cắt mỗi lần gọi OCR")
+    parser.add_argument("--backend", nargs="*", choices=DETECTOR_BACKENDS)
+    parser.add_argument("--ocr-backend", nargs="*", choices=OCR_BACKENDS)
+    parser.add_argument("--preprocess", nargs="*", choices=("on", "off"),
+                        help="Tiền xử lý vùng biển số trước OCR (tien_xu_ly.py)")
+    parser.add_argument("--workers", type=int, nargs="*", default=[1], help="Số luồng nhận diện")
+    parser.add_argument("--output", default=None, help="File JSON kết quả (mặc định: stdout)")
+    args = parser.parse_args(argv)
+
+    combos = _grid(args)
+    runs = []
+    # Mỗi cấu hình một tiến trình mới ("spawn"): RSS đỉnh đo riêng từng cấu hình
+    context = multiprocessing.get_context("spawn")
+    for workers, overrides in combos:
+        with context.Pool(1) as pool:
+            run = pool.apply(_run_in_child, ((args.inputs, args.frames, args.warmup,
+                                              args.mode, workers, overrides),))
+        runs.append(run)
+        print(f"✔ {json.dumps(run['config'], ensure_ascii=False)}: {run['fps']} FPS", file=sys.stderr)
+
+    report = {
+        "inputs": args.inputs,
+        "frames": args.frames,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+    _print_table(runs, sys.stderr)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
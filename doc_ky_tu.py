@@ -0,0 +1,161 @@
+import cv2
+import numpy as np
+
+# =====================================================================
+# NHẬN DẠNG KÝ TỰ THEO LÔ (BATCHED OCR)
+# ---------------------------------------------------------------------
+# - YOLO đã xác định vị trí biển số nên không cần chạy bộ phát hiện chữ
+#   (CRAFT) của EasyOCR nữa.
+# - Tất cả vùng cắt trong một khung hình được đưa về cùng chiều cao,
+#   ghép cạnh nhau trên một ảnh nền, rồi gọi reader.recognize() MỘT lần
+#   với danh sách vùng (horizontal_list) tương ứng.
+# - Kết quả được ánh xạ lại đúng vùng cắt ban đầu theo toạ độ x.
+# - Biển xe máy Việt Nam có 2 dòng (VD: "59-X1" / "123.45") nên mỗi vùng
+#   cắt được tách thành dòng trên và dòng dưới trước khi nhận dạng.
+# =====================================================================
+
+OCR_HEIGHT = 64   # Chiều cao chung (bằng chiều cao đầu vào mô hình nhận dạng)
+OCR_GAP = 16      # Khoảng trống giữa các vùng trên ảnh ghép
+
+# Các chế độ OCR:
+#   - "rows":     tách 2 dòng rồi chỉ chạy bộ nhận dạng (mặc định, nhanh nhất)
+#   - "crop":     chỉ chạy bộ nhận dạng trên cả vùng cắt (1 dòng)
+#   - "readtext": chạy đầy đủ EasyOCR (có bước phát hiện chữ CRAFT)
+OCR_MODES = ("rows", "crop", "readtext")
+
+ONE_LINE_ASPECT = 2.6      # Tỉ lệ rộng/cao từ mức này trở lên coi là biển 1 dòng
+SPLIT_BAND = (0.3, 0.7)    # Vùng tìm đường cắt giữa 2 dòng (theo chiều cao)
+SPLIT_VALLEY_RATIO = 0.35  # Đáy của profile phải thấp hơn tỉ lệ này so với đỉnh
+
+
+def _to_gray(image):
+    """Chuyển ảnh BGR sang ảnh xám (giữ nguyên nếu đã là ảnh xám)."""
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+def _resize_to_height(gray, height):
+    """Thay đổi kích thước ảnh theo chiều cao cho trước, giữ tỉ lệ."""
+    h, w = gray.shape[:2]
+    new_w = max(1, int(round(w * height / float(h))))
+    interpolation = cv2.INTER_AREA if h > height else cv2.INTER_CUBIC
+    return cv2.resize(gray, (new_w, height), interpolation=interpolation)
+
+
+def split_rows(crop):
+    """
+    Tách vùng biển số thành các dòng chữ (ảnh xám).
+    - Biển dài (1 dòng) được giữ nguyên.
+    - Biển 2 dòng được cắt tại "khe" giữa hai dòng, tìm bằng profile
+      chiếu ngang của ảnh nhị phân; nếu không thấy khe rõ thì cắt giữa.
+    """
+    gray = _to_gray(crop)
+    h, w = gray.shape[:2]
+    if h < 8 or w / float(h) >= ONE_LINE_ASPECT:
+        return [gray]
+
+    # Nhị phân hoá Otsu, chữ tối trên nền sáng → điểm chữ = 1
+    _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    profile = binary.sum(axis=1)
+
+    lo, hi = int(h * SPLIT_BAND[0]), int(h * SPLIT_BAND[1])
+    cut = lo + int(np.argmin(profile[lo:hi]))
+    if profile[cut] > SPLIT_VALLEY_RATIO * profile.max():
+        cut = h // 2  # Không thấy khe rõ ràng → dùng tỉ lệ cố định
+
+    return [gray[:cut], gray[cut:]]
+
+
+def build_canvas(crops, height=OCR_HEIGHT, gap=OCR_GAP):
+    """
+    Ghép các vùng cắt thành một ảnh xám duy nhất.
+    Trả về (canvas, regions) với regions là danh sách
+    [x_min, x_max, y_min, y_max] theo đúng thứ tự crops.
+    """
+    resized = [_resize_to_height(_to_gray(c), height) for c in crops]
+    total_w = sum(img.shape[1] for img in resized) + gap * (len(resized) + 1)
+    canvas = np.full((height, total_w), 255, dtype=np.uint8)
+
+    regions = []
+    x = gap
+    for img in resized:
+        w = img.shape[1]
+        canvas[:, x:x + w] = img
+        regions.append([x, x + w, 0, height])
+        x += w + gap
+    return canvas, regions
+
+
+def recognize_batch(reader, crops, batch_size=8, allowlist=None):
+    """
+    Nhận dạng ký tự cho nhiều vùng ảnh (1 dòng) bằng một lần gọi EasyOCR.
+    allowlist: chỉ giải mã các ký tự này (None = toàn bộ bảng ký tự).
+    Trả về danh sách (text, confidence) theo đúng thứ tự crops;
+    vùng không đọc được trả về ("", 0.0).
+    """
+    if not crops:
+        return []
+
+    canvas, regions = build_canvas(crops)
+    results = reader.recognize(
+        canvas,
+        horizontal_list=regions,
+        free_list=[],
+        batch_size=max(1, min(batch_size, len(regions))),
+        allowlist=allowlist,
+        detail=1,
+        paragraph=False,
+    )
+
+    # Ánh xạ kết quả về vùng cắt theo toạ độ x_min của từng vùng
+    index_by_x = {region[0]: i for i, region in enumerate(regions)}
+    reads = [("", 0.0)] * len(crops)
+    for box, text, confidence in results:
+        i = index_by_x.get(int(box[0][0]))
+        if i is not None:
+            reads[i] = (text.strip(), float(confidence))
+    return reads
+
+
+def read_plates(reader, crops, mode="rows", batch_size=8, allowlist=None):
+    """
+    Đọc ký tự cho danh sách vùng biển số theo chế độ OCR đã chọn.
+    allowlist: bảng ký tự được phép (VD: ký tự biển số), None = không giới hạn.
+    Trả về danh sách (text, confidence) theo đúng thứ tự crops.
+    """
+    if not crops:
+        return []
+
+    if mode == "readtext":
+        reads = []
+        for crop in crops:
+            result = reader.readtext(crop, allowlist=allowlist)
+            text = " ".join([res[1] for res in result]) if result else ""
+            confidence = sum(res[2] for res in result) / len(result) if result else 0.0
+            reads.append((text, float(confidence)))
+        return reads
+
+    if mode == "crop":
+        return recognize_batch(reader, crops, batch_size, allowlist)
+
+    # Chế độ "rows": gom tất cả các dòng của mọi biển vào một lô duy nhất
+    rows, owners = [], []
+    for i, crop in enumerate(crops):
+        for row in split_rows(crop):
+            if row.size:
+                rows.append(row)
+                owners.append(i)
+
+    row_reads = recognize_batch(reader, rows, batch_size, allowlist)
+
+    # Ghép các dòng của cùng một biển (dòng trên + " " + dòng dưới)
+    texts = [[] for _ in crops]
+    confidences = [[] for _ in crops]
+    for i, (text, confidence) in zip(owners, row_reads):
+        if text:
+            texts[i].append(text)
+            confidences[i].append(confidence)
+
+    return [
+        (" ".join(t), sum(c) / len(c) if c else 0.0)
+        for t, c in zip(texts, confidences)
+    ]
@@ -1,16 +1,38 @@
 import tkinter as tk
-from tkinter import Label, Button, Frame, Scrollbar, ttk, filedialog, messagebox
-from PIL import Image, ImageTk
-import cv2
+from tkinter import Label, Button, Frame, ttk, filedialog, messagebox
+from luong_xu_ly import PlatePipeline
+from hien_thi import FrameRenderer
+from bang_lich_su import HistoryModel, HistoryView
+from tai_anh import UploadPool
+from chi_so import REGISTRY
+
+# Chỉ số vận hành của vòng cập nhật giao diện (xem chi_so.py)
+UI_UPDATE_SECONDS = REGISTRY.histogram("ui_update_seconds", "Thời gian một lần update_frame")
+UI_FRAMES_SHOWN = REGISTRY.counter("ui_frames_shown_total", "Số khung hình camera đã hiển thị")
+QUEUE_DROPPED = REGISTRY.gauge("pipeline_dropped_frames", "Số khung hình bị bỏ ở hàng đợi", ("queue",))
+QUEUE_DEPTH = REGISTRY.gauge("pipeline_queue_depth", "Số phần tử đang chờ trong hàng đợi", ("queue",))
 
 class PlateUI:
     def __init__(self, detector):
         self.detector = detector
+        # Luồng xử lý chạy nền: camera → YOLO/OCR → chuẩn bị ảnh hiển thị
+        self.pipeline = PlatePipeline(detector)
         self.window = tk.Tk()
         self.window.title("Nhận diện biển số xe")
         self.window.geometry("1300x850")
 
         self._build_ui()
+        # Hiển thị dùng lại một PhotoImage cho mỗi khung; camera giới hạn FPS
+        # hiển thị riêng (tốc độ nhận diện do luồng nền quyết định)
+        self.camera_renderer = FrameRenderer(self.camera_label, (640, 480),
+                                             max_fps=detector.config["display_fps"])
+        # Khung hình mới nhất chưa kịp hiển thị (chờ tới lượt theo giới hạn FPS)
+        self._latest_frame = None
+        self.upload_renderer = FrameRenderer(self.upload_label, (640, 480))
+        # Ảnh tải lên được nhận diện trên nhóm luồng nền (xem tai_anh.py)
+        self.uploads = UploadPool(detector)
+        self._polling_uploads = False
+        self._upload_misses = 0
 
     # ---------------------------------------------------------------
     # XÂY DỰNG GIAO DIỆN
@@ -44,26 +66,14 @@ class PlateUI:
 
         # --- Lịch sử ---
         Label(self.window, text="Lịch sử nhận diện:", font=("Arial", 11, "bold")).pack(pady=(5, 0))
-        frame_history = Frame(self.window, bg="white", bd=1, relief="solid")
-        frame_history.pack(pady=5)
-
-        scrollbar_y = Scrollbar(frame_history)
-        scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
-
-        self.history_table = ttk.Treeview(
-            frame_history,
-            columns=("time", "plate"),
-            show="headings",
-            yscrollcommand=scrollbar_y.set,
-            height=8
+        # Bảng ảo hoá: chỉ giữ 1000 dòng mới nhất, chỉ vẽ các dòng đang hiển thị
+        self.history = HistoryView(
+            self.window,
+            columns=[("time", "Thời gian", 220), ("plate", "Biển số", 350)],
+            model=HistoryModel(capacity=1000),
+            visible_rows=8,
         )
-        self.history_table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar_y.config(command=self.history_table.yview)
-
-        self.history_table.heading("time", text="Thời gian")
-        self.history_table.heading("plate", text="Biển số")
-        self.history_table.column("time", width=220, anchor="center")
-        self.history_table.column("plate", width=350, anchor="center")
+        self.history.pack(pady=5)
 
         style = ttk.Style()
         style.configure("Treeview.Heading", font=("Arial", 10, "bold"))
@@ -83,92 +93,125 @@ class PlateUI:
         self.btn_upload.grid(row=0, column=2, padx=10)
         self.btn_exit.grid(row=0, column=3, padx=10)
 
+        # --- Tiến độ nhận diện ảnh tải lên ---
+        self.upload_progress = ttk.Progressbar(button_frame, length=300, mode="determinate")
+        self.upload_progress.grid(row=1, column=0, columnspan=3, pady=(8, 0))
+        self.upload_status = Label(button_frame, text="")
+        self.upload_status.grid(row=1, column=3, pady=(8, 0))
+
     # ---------------------------------------------------------------
     # CAMERA
     # ---------------------------------------------------------------
     def start_camera(self):
-        self.detector.running = True
+        if self.pipeline.is_running():
+            return
+        if not self.pipeline.start():
+            messagebox.showerror("Không có camera", "Không mở được camera để bắt đầu nhận diện.")
+            return
         self.update_frame()
 
     def stop_camera(self):
-        self.detector.running = False
+        self.pipeline.stop()
 
     # ---------------------------------------------------------------
     # TẢI ẢNH VÀ NHẬN DIỆN
     # ---------------------------------------------------------------
     def load_image(self):
-        """Chọn file ảnh, hiển thị và nhận diện biển số."""
-        file_path = filedialog.askopenfilename(
+        """Chọn một hoặc nhiều file ảnh và đưa vào nhóm luồng nhận diện nền."""
+        file_paths = filedialog.askopenfilenames(
             title="Chọn ảnh",
             filetypes=[("Image Files", "*.jpg;*.jpeg;*.png;*.bmp")]
         )
-        if not file_path:
+        if not file_paths:
             return
 
-        # --- Nhận diện ---
-        result = self.detector.recognize_from_image(file_path)
-        if not result:
-            messagebox.showwarning("Không phát hiện", "Không tìm thấy biển số nào trong ảnh.")
-            self.upload_label.config(image="", text="Không nhận diện được", fg="red")
+        if not self.uploads.busy():
+            self._upload_misses = 0
+        self.uploads.submit(list(file_paths))
+        self._show_upload_progress()
+        if not self._polling_uploads:
+            self._polling_uploads = True
+            self.upload_label.after(100, self.poll_uploads)
+
+    def poll_uploads(self):
+        """Lấy kết quả ảnh đã nhận diện xong, cập nhật tiến độ và lịch sử."""
+        for path, result, error in self.uploads.poll():
+            if error is not None:
+                print(f"⚠️ Lỗi nhận diện ảnh {path}: {error}")
+            if not result:
+                self._upload_misses += 1
+                self.upload_renderer.clear(text="Không nhận diện được", fg="red")
+                continue
+
+            # --- Hiển thị ảnh có vẽ khung (thu nhỏ về 640x480 nếu cần) ---
+            self.upload_renderer.show(result["image"], force=True)
+
+            # --- Hiển thị kết quả ---
+            plate_text = f"Biển số: {result['plate']} (Chủ xe: {result['owner']} - {result['location']})"
+            self.plate_label.config(text=plate_text)
+
+            # --- Lưu vào lịch sử ---
+            self.history.push((result["time"], f"{result['plate']} ({result['owner']} - {result['location']})"))
+
+        self._show_upload_progress()
+        if self.uploads.busy():
+            self.upload_label.after(100, self.poll_uploads)
             return
 
-        # --- Hiển thị ảnh có vẽ khung ---
-        frame_rgb = cv2.cvtColor(result["image"], cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(frame_rgb)
-        img = img.resize((640, 480))
-        imgtk = ImageTk.PhotoImage(img)
-
-        self.upload_label.imgtk = imgtk
-        self.upload_label.configure(image=imgtk, text="")
-
-        # --- Hiển thị kết quả ---
-        plate_text = f"Biển số: {result['plate']} (Chủ xe: {result['owner']} - {result['location']})"
-        self.plate_label.config(text=plate_text)
+        self._polling_uploads = False
+        if self._upload_misses:
+            messagebox.showwarning(
+                "Không phát hiện",
+                f"Không tìm thấy biển số nào trong {self._upload_misses}/{self.uploads.total} ảnh."
+            )
 
-        # --- Lưu vào lịch sử ---
-        self.history_table.insert(
-            "",
-            "end",
-            values=(result["time"], f"{result['plate']} ({result['owner']} - {result['location']})")
-        )
-        self.history_table.yview_moveto(1.0)
+    def _show_upload_progress(self):
+        total, done = self.uploads.total, self.uploads.done
+        self.upload_progress.config(maximum=max(1, total), value=done)
+        self.upload_status.config(text=f"Ảnh: {done}/{total}" if total else "")
 
     # ---------------------------------------------------------------
     # CẬP NHẬT CAMERA FRAME
     # ---------------------------------------------------------------
     def update_frame(self):
-        if not self.detector.running:
-            return
-        ret, frame = self.detector.cap.read()
-        if not ret:
+        """Lấy kết quả đã xử lý xong từ luồng nền và cập nhật giao diện."""
+        if not self.pipeline.is_running():
             return
 
-        current_plate = self.detector.detect_plate(frame)
-        result = self.detector.stabilize_plate(current_plate)
+        with UI_UPDATE_SECONDS.time():
+            self._update_frame()
+        self.camera_label.after(self.camera_renderer.delay_ms(), self.update_frame)
+
+    def _update_frame(self):
+        frame, results = self.pipeline.poll()
 
-        if result:
+        for result in results:
             self.plate_label.config(
                 text=f"Biển số: {result['plate']} (Chủ xe: {result['owner']} - {result['location']})"
             )
-            self.history_table.insert(
-                "",
-                "end",
-                values=(result["time"], f"{result['plate']} ({result['owner']} - {result['location']})")
-            )
-            self.history_table.yview_moveto(1.0)
-
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_resized = cv2.resize(frame_rgb, (640, 480))
-        img = Image.fromarray(frame_resized)
-        imgtk = ImageTk.PhotoImage(image=img)
-        self.camera_label.imgtk = imgtk
-        self.camera_label.configure(image=imgtk)
-
-        self.camera_label.after(10, self.update_frame)
+            self.history.push((result["time"], f"{result['plate']} ({result['owner']} - {result['location']})"))
+
+        # Chỉ hiển thị khung mới nhất khi tới lượt theo giới hạn FPS
+        if frame is not None:
+            self._latest_frame = frame
+        if self._latest_frame is not None and self.camera_renderer.show(self._latest_frame):
+            self._latest_frame = None
+            UI_FRAMES_SHOWN.inc()
+
+        if REGISTRY.enabled:
+            pipeline, events = self.pipeline, self.detector.events
+            QUEUE_DROPPED.labels("frame").set(pipeline.frame_queue.dropped)
+            QUEUE_DROPPED.labels("output").set(pipeline.output_queue.dropped)
+            QUEUE_DEPTH.labels("result").set(pipeline.result_queue.qsize())
+            if events is not None:
+                QUEUE_DEPTH.labels("events").set(events.pending())
+                QUEUE_DROPPED.labels("events").set(events.dropped)
 
     # ---------------------------------------------------------------
     # CHẠY ỨNG DỤNG
     # ---------------------------------------------------------------
     def run(self):
         self.window.mainloop()
+        self.pipeline.stop()
+        self.uploads.shutdown()
         self.detector.release()
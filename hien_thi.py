@@ -0,0 +1,82 @@
+import time
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+# =====================================================================
+# HIỂN THỊ KHUNG HÌNH LÊN TKINTER (DÙNG LẠI BỘ ĐỆM)
+# ---------------------------------------------------------------------
+# - Một PhotoImage duy nhất cho mỗi Label, cập nhật tại chỗ bằng paste()
+#   thay vì tạo PhotoImage mới cho từng khung hình.
+# - Bộ đệm RGBA (và bộ đệm thu nhỏ) được cấp phát một lần, cvtColor /
+#   resize ghi thẳng vào đó; ảnh PIL chỉ là lớp bọc trên bộ đệm (không
+#   sao chép — PIL chỉ ánh xạ được bộ đệm 4 byte/điểm ảnh, nên dùng RGBA).
+# - Bỏ qua resize khi khung hình đã đúng kích thước hiển thị.
+# - Giới hạn FPS hiển thị riêng, độc lập với tốc độ nhận diện.
+# - Chỉ gọi từ luồng Tkinter (bộ đệm dùng chung, không khoá).
+# =====================================================================
+
+
+class FrameRenderer:
+    def __init__(self, label, size=(640, 480), max_fps=None):
+        """
+        Khởi tạo bộ hiển thị cho một Label.
+            - size: kích thước hiển thị (rộng, cao)
+            - max_fps: FPS hiển thị tối đa (None = không giới hạn)
+        """
+        self.label = label
+        self.size = size
+        self.min_period = 1.0 / max_fps if max_fps else 0.0
+
+        w, h = size
+        self._rgba = np.empty((h, w, 4), dtype=np.uint8)
+        self._scaled = np.empty((h, w, 3), dtype=np.uint8)
+        # Ảnh PIL bọc trực tiếp bộ đệm RGBA (thay đổi theo bộ đệm)
+        self._image = Image.frombuffer("RGBA", size, self._rgba, "raw", "RGBA", 0, 1)
+        self._photo = None
+        self._attached = False
+        self._last_time = 0.0
+        # Số khung hình đã hiển thị / bỏ qua do giới hạn FPS
+        self.shown = 0
+        self.skipped = 0
+
+    def due(self):
+        """True nếu đã đủ khoảng thời gian để hiển thị khung hình tiếp theo."""
+        return time.monotonic() - self._last_time >= self.min_period
+
+    def delay_ms(self, minimum=5):
+        """Thời gian (ms) nên chờ trước lần cập nhật tiếp theo."""
+        remaining = self.min_period - (time.monotonic() - self._last_time)
+        return max(minimum, int(remaining * 1000))
+
+    def convert(self, frame):
+        """Chuyển khung hình BGR vào bộ đệm RGBA (thu nhỏ nếu cần)."""
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=self._rgba)
+        return self._image
+
+    def show(self, frame, force=False):
+        """
+        Hiển thị khung hình BGR lên Label.
+        Trả về False nếu bị bỏ qua do giới hạn FPS (trừ khi force=True).
+        """
+        if not force and not self.due():
+            self.skipped += 1
+            return False
+        self._last_time = time.monotonic()
+        image = self.convert(frame)
+        if self._photo is None:
+            self._photo = ImageTk.PhotoImage("RGBA", self.size)
+            self.label.imgtk = self._photo  # Giữ tham chiếu để Tk không thu hồi ảnh
+        if not self._attached:
+            self.label.configure(image=self._photo, text="")
+            self._attached = True
+        self._photo.paste(image)
+        self.shown += 1
+        return True
+
+    def clear(self, **label_options):
+        """Gỡ ảnh khỏi Label (VD: để hiện thông báo), PhotoImage vẫn được giữ lại."""
+        self.label.configure(image="", **label_options)
+        self._attached = False
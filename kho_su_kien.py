@@ -0,0 +1,220 @@
+import datetime
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from chuan_hoa_bien_so import province_code
+
+logger = logging.getLogger("bien_so.kho_su_kien")
+
+# =====================================================================
+# KHO SỰ KIỆN NHẬN DIỆN (SQLITE, CHỈ GHI THÊM)
+# ---------------------------------------------------------------------
+# - Mỗi biển số đã xác nhận (stabilize_plate, recognize_from_image) được
+#   ghi thành một dòng sự kiện, không sửa / xoá.
+# - record() chỉ đưa sự kiện vào hàng đợi, KHÔNG BAO GIỜ chặn vòng nhận
+#   diện; một luồng nền gom thành lô và ghi bằng executemany trong một
+#   giao dịch. Hàng đợi đầy (đĩa quá chậm) thì bỏ sự kiện và đếm lại.
+# - SQLite ở chế độ WAL: đọc (truy vấn) không chặn ghi và ngược lại.
+# - Chỉ mục trên biển số, mã tỉnh và thời gian để truy vấn nhanh khi
+#   bảng có hàng triệu dòng.
+# =====================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id            INTEGER PRIMARY KEY,
+    ts            REAL NOT NULL,
+    plate         TEXT NOT NULL,
+    province_code TEXT,
+    location      TEXT,
+    owner         TEXT,
+    confidence    REAL,
+    lane          TEXT,
+    track_id      INTEGER,
+    source        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_plate ON events (plate, ts);
+CREATE INDEX IF NOT EXISTS idx_events_province ON events (province_code, ts);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+"""
+
+COLUMNS = ("ts", "plate", "province_code", "location", "owner",
+           "confidence", "lane", "track_id", "source")
+
+
+def _to_epoch(value):
+    """Nhận datetime hoặc số giây epoch, trả về số giây epoch."""
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class EventStore:
+    def __init__(self, path, batch_size=500, flush_interval=0.5, max_pending=100000):
+        """
+        Khởi tạo kho sự kiện.
+            - path: file SQLite (tạo mới nếu chưa có)
+            - batch_size: số sự kiện tối đa trong một giao dịch ghi
+            - flush_interval: thời gian chờ tối đa (giây) trước khi ghi lô chưa đầy
+            - max_pending: số sự kiện tối đa chờ ghi (vượt quá thì bỏ)
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        # Thống kê ghi
+        self.written = 0
+        self.dropped = 0
+
+        # Tạo bảng / chỉ mục và bật WAL ngay để truy vấn dùng được từ đầu
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # -----------------------------------------------------------------
+    # GHI SỰ KIỆN (KHÔNG CHẶN)
+    # -----------------------------------------------------------------
+    def record(self, result, source=None):
+        """
+        Đưa một kết quả đã xác nhận vào hàng đợi ghi.
+            - result: dict có 'plate' (và 'owner', 'location', 'confidence',
+              'lane', 'track_id' nếu có)
+            - source: nguồn ảnh / camera (tuỳ chọn)
+        Trả về False nếu sự kiện bị bỏ vì hàng đợi đầy hoặc kho đã đóng.
+        """
+        if self._closed:
+            return False
+        plate = result["plate"]
+        row = (
+            time.time(),
+            plate,
+            province_code(plate),
+            result.get("location"),
+            result.get("owner"),
+            result.get("confidence"),
+            result.get("lane"),
+            result.get("track_id"),
+            source,
+        )
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            # Nhiều luồng nhận diện cùng ghi: tăng bộ đếm dưới khoá
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _ensure_writer(self):
+        """Khởi động luồng ghi ở lần ghi đầu tiên."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._writer_loop, name="event-writer", daemon=True)
+                    self._thread.start()
+
+    def _writer_loop(self):
+        conn = self._connect()
+        sql = f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        try:
+            while True:
+                row = self._queue.get()
+                if row is None:
+                    return
+                batch = [row]
+                deadline = time.monotonic() + self.flush_interval
+                stop = False
+                # Gom lô: tới batch_size sự kiện hoặc hết flush_interval
+                while len(batch) < self.batch_size:
+                    try:
+                        row = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if row is None:
+                        stop = True
+                        break
+                    batch.append(row)
+                try:
+                    with conn:
+                        conn.executemany(sql, batch)
+                    self.written += len(batch)
+                except sqlite3.Error:
+                    # CSDL bị khoá quá lâu, đầy đĩa...: bỏ lô này nhưng giữ luồng ghi
+                    with self._lock:
+                        self.dropped += len(batch)
+                    logger.exception("Không ghi được %d sự kiện vào %s", len(batch), self.path)
+                finally:
+                    # Luôn đánh dấu xong để flush() không bị treo
+                    for _ in range(len(batch) + stop):
+                        self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def pending(self):
+        """Số sự kiện đang chờ luồng ghi."""
+        return self._queue.qsize()
+
+    def flush(self):
+        """Chờ tới khi mọi sự kiện trong hàng đợi đã được ghi."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Ghi nốt các sự kiện còn lại và dừng luồng ghi."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+
+    # -----------------------------------------------------------------
+    # TRUY VẤN
+    # -----------------------------------------------------------------
+    def _query(self, sql, params):
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def sightings(self, plate, limit=1000):
+        """Các lần thấy biển số plate, mới nhất trước."""
+        return self._query(
+            "SELECT * FROM events WHERE plate = ? ORDER BY ts DESC LIMIT ?",
+            (plate, limit),
+        )
+
+    def between(self, start, end, province_code=None, limit=1000):
+        """
+        Các sự kiện trong khoảng [start, end) theo thứ tự thời gian.
+            - start, end: datetime hoặc số giây epoch
+            - province_code: chỉ lấy biển số của một tỉnh (VD: "59")
+        """
+        sql = "SELECT * FROM events WHERE ts >= ? AND ts < ?"
+        params = [_to_epoch(start), _to_epoch(end)]
+        if province_code is not None:
+            sql = "SELECT * FROM events WHERE province_code = ? AND ts >= ? AND ts < ?"
+            params.insert(0, province_code)
+        return self._query(sql + " ORDER BY ts LIMIT ?", params + [limit])
+
+    def count(self):
+        """Tổng số sự kiện đã ghi xuống đĩa."""
+        return self._query("SELECT COUNT(*) AS n FROM events", ())[0]["n"]
@@ -0,0 +1,105 @@
+import math
+import cv2
+import numpy as np
+
+# =====================================================================
+# LẬP LỊCH CHẠY YOLO THÍCH ỨNG (THAY CHO "MỖI 15 KHUNG HÌNH")
+# ---------------------------------------------------------------------
+# - Phát hiện chuyển động rẻ bằng hiệu hai khung hình xám thu nhỏ.
+# - Cảnh tĩnh, không có track chưa xác nhận → bỏ qua YOLO (chỉ làm mới
+#   định kỳ sau idle_interval khung hình).
+# - Có chuyển động hoặc có track chưa xác nhận → chạy YOLO dày hơn
+#   (mỗi min_interval khung hình).
+# - Ngân sách CPU (ms/khung hình): nếu YOLO quá chậm so với ngân sách,
+#   khoảng cách giữa các lần chạy được nới ra cho vừa.
+# - counters đếm số lần chạy / bỏ qua theo từng lý do.
+# =====================================================================
+
+
+class DetectionScheduler:
+    def __init__(self, min_interval=2, idle_interval=30, budget_ms=40.0,
+                 motion_ratio=0.01, pixel_threshold=25, motion_size=(160, 120)):
+        """
+        Khởi tạo bộ lập lịch.
+            - min_interval: khoảng cách nhỏ nhất (khung hình) giữa hai lần chạy YOLO
+            - idle_interval: cảnh tĩnh vẫn chạy YOLO sau ngần này khung hình
+            - budget_ms: ngân sách xử lý trung bình cho mỗi khung hình (ms)
+            - motion_ratio: tỉ lệ điểm ảnh thay đổi tối thiểu để coi là có chuyển động
+            - pixel_threshold: mức chênh lệch xám để coi một điểm ảnh là thay đổi
+            - motion_size: kích thước ảnh thu nhỏ dùng để so sánh
+        """
+        self.min_interval = min_interval
+        self.idle_interval = idle_interval
+        self.budget_ms = budget_ms
+        self.motion_ratio = motion_ratio
+        self.pixel_threshold = pixel_threshold
+        self.motion_size = motion_size
+
+        self._previous = None
+        self.frames_since_detect = idle_interval  # Chạy ngay ở khung hình đầu
+        # Thời gian trung bình (EMA, ms) của YOLO và phần còn lại mỗi khung hình
+        self.detect_ms = 0.0
+        self.other_ms = 0.0
+
+        self.counters = {
+            "run": {"motion": 0, "tracks": 0, "refresh": 0},
+            "skip": {"static": 0, "interval": 0, "budget": 0},
+        }
+
+    # -----------------------------------------------------------------
+    # PHÁT HIỆN CHUYỂN ĐỘNG
+    # -----------------------------------------------------------------
+    def motion(self, frame):
+        """Trả về tỉ lệ điểm ảnh thay đổi so với khung hình trước (0..1)."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        small = cv2.resize(gray, self.motion_size, interpolation=cv2.INTER_AREA)
+        previous, self._previous = self._previous, small
+        if previous is None:
+            return 1.0
+        changed = cv2.absdiff(small, previous) > self.pixel_threshold
+        return float(np.count_nonzero(changed)) / changed.size
+
+    def budget_interval(self):
+        """Khoảng cách tối thiểu giữa hai lần chạy YOLO để giữ trong ngân sách."""
+        spare = self.budget_ms - self.other_ms
+        if self.detect_ms <= 0 or spare <= 0:
+            return self.min_interval if spare > 0 else self.idle_interval
+        return max(self.min_interval, int(math.ceil(self.detect_ms / spare)))
+
+    # -----------------------------------------------------------------
+    # QUYẾT ĐỊNH CHẠY / BỎ QUA
+    # -----------------------------------------------------------------
+    def should_detect(self, frame, pending_tracks=False):
+        """
+        Quyết định có chạy YOLO ở khung hình này không.
+            - pending_tracks: có track đang theo dõi mà chưa xác nhận biển số
+        Trả về (True/False, lý do).
+        """
+        self.frames_since_detect += 1
+        moving = self.motion(frame) >= self.motion_ratio
+
+        if self.frames_since_detect >= self.idle_interval:
+            decision = (True, "refresh")
+        elif not moving and not pending_tracks:
+            decision = (False, "static")
+        else:
+            interval = self.budget_interval()
+            if self.frames_since_detect >= interval:
+                decision = (True, "motion" if moving else "tracks")
+            elif self.frames_since_detect >= self.min_interval:
+                decision = (False, "budget")
+            else:
+                decision = (False, "interval")
+
+        run, reason = decision
+        self.counters["run" if run else "skip"][reason] += 1
+        if run:
+            self.frames_since_detect = 0
+        return decision
+
+    def record(self, detect_ms=None, other_ms=None, alpha=0.2):
+        """Cập nhật thời gian trung bình của YOLO / phần xử lý còn lại (ms)."""
+        if detect_ms is not None:
+            self.detect_ms = detect_ms if not self.detect_ms else (1 - alpha) * self.detect_ms + alpha * detect_ms
+        if other_ms is not None:
+            self.other_ms = other_ms if not self.other_ms else (1 - alpha) * self.other_ms + alpha * other_ms
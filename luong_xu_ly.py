@@ -0,0 +1,169 @@
+import logging
+import queue
+import threading
+import time
+import cv2
+
+# =====================================================================
+# LUỒNG XỬ LÝ NHIỀU TẦNG (CAPTURE → NHẬN DIỆN → GIAO DIỆN)
+# ---------------------------------------------------------------------
+# - Luồng đọc camera chỉ giữ khung hình mới nhất.
+# - Luồng nhận diện chạy YOLO + OCR bằng PlateRecognizer.
+# - Các tầng nối với nhau bằng hàng đợi có giới hạn, khi đầy thì bỏ
+#   phần tử cũ nhất để độ trễ đầu-cuối luôn bị chặn.
+# - Giao diện Tkinter chỉ lấy khung hình đã vẽ xong (không chạy mô hình)
+#   và tự hiển thị bằng bộ đệm dùng lại (xem hien_thi.FrameRenderer).
+# =====================================================================
+
+logger = logging.getLogger("bien_so.luong_xu_ly")
+
+
+class DropOldestQueue:
+    def __init__(self, maxsize=1):
+        """Hàng đợi có giới hạn: khi đầy, bỏ phần tử cũ nhất để nhận phần tử mới."""
+        self._queue = queue.Queue(maxsize=maxsize)
+        # Số phần tử đã bị bỏ (để theo dõi khi xử lý không theo kịp)
+        self.dropped = 0
+
+    def put(self, item):
+        """Đưa phần tử vào hàng đợi, không bao giờ chặn luồng gọi."""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Lấy phần tử, trả về None nếu hết thời gian chờ."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def get_nowait(self):
+        """Lấy phần tử nếu có sẵn, ngược lại trả về None."""
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+class PlatePipeline:
+    def __init__(self, detector):
+        """
+        Khởi tạo luồng xử lý quanh một PlateRecognizer.
+            - detector: đối tượng PlateRecognizer (có cap, detect_plate, stabilize_plate)
+        """
+        self.detector = detector
+
+        # Hàng đợi giữa các tầng (chỉ giữ phần tử mới nhất)
+        self.frame_queue = DropOldestQueue(maxsize=1)    # capture → nhận diện
+        self.output_queue = DropOldestQueue(maxsize=1)   # nhận diện → giao diện
+        # Biển số đã xác nhận hiếm khi xuất hiện nên không được bỏ
+        self.result_queue = queue.Queue()
+
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    # -----------------------------------------------------------------
+    # KHỞI ĐỘNG / DỪNG
+    # -----------------------------------------------------------------
+    def start(self):
+        """
+        Khởi động hai luồng xử lý (nếu chưa chạy).
+        Trả về False nếu detector không có camera / camera chưa mở được.
+        """
+        if self._threads:
+            return True
+        cap = self.detector.cap
+        if cap is None or not cap.isOpened():
+            # VD: PlateRecognizer(camera_index=None) hoặc camera không mở được
+            logger.warning("Không có camera để bắt đầu nhận diện")
+            self.detector.running = False
+            return False
+        self._stop_event.clear()
+        self.detector.running = True
+        # Giảm bộ đệm của camera để không tích khung hình cũ
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        for target, name in (
+            (self._capture_loop, "capture"),
+            (self._inference_loop, "inference"),
+        ):
+            thread = threading.Thread(target=target, name=f"plate-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return True
+
+    def stop(self):
+        """Dừng các luồng và chờ chúng kết thúc."""
+        self._stop_event.set()
+        self.detector.running = False
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    def is_running(self):
+        return bool(self._threads) and not self._stop_event.is_set()
+
+    # -----------------------------------------------------------------
+    # CÁC TẦNG XỬ LÝ
+    # -----------------------------------------------------------------
+    def _capture_loop(self):
+        """Đọc camera liên tục, chỉ giữ khung hình mới nhất."""
+        while not self._stop_event.is_set():
+            try:
+                ret, frame = self.detector.cap.read()
+            except Exception:
+                # Lỗi của backend video: ghi lại, chờ chút rồi đọc tiếp
+                logger.exception("Lỗi đọc khung hình từ camera")
+                ret, frame = False, None
+            if not ret:
+                time.sleep(0.01)
+                continue
+            self.frame_queue.put(frame)
+
+    def _inference_loop(self):
+        """Chạy YOLO + OCR + ổn định biển số trên khung hình mới nhất."""
+        while not self._stop_event.is_set():
+            frame = self.frame_queue.get(timeout=0.1)
+            if frame is None:
+                continue
+            try:
+                # Bộ mô hình dùng chung với các luồng nhận diện ảnh tải lên
+                with self.detector.models.infer_lock:
+                    current_plates = self.detector.detect_plate(frame)
+                for result in self.detector.stabilize_plate(current_plates):
+                    self.result_queue.put(result)
+            except Exception:
+                # Một khung lỗi (OCR, ONNX, kho sự kiện...) không được làm chết
+                # luồng nhận diện: giao diện vẫn nhận khung hình tiếp theo
+                logger.exception("Lỗi nhận diện khung hình")
+            self.output_queue.put(frame)  # Khung hình BGR đã vẽ kết quả
+
+    # -----------------------------------------------------------------
+    # GIAO DIỆN LẤY KẾT QUẢ
+    # -----------------------------------------------------------------
+    def poll(self):
+        """
+        Lấy kết quả đã xử lý xong (không chặn).
+        Trả về (frame, results):
+            - frame: khung hình BGR đã vẽ mới nhất hoặc None nếu chưa có khung mới
+            - results: danh sách biển số đã xác nhận kể từ lần gọi trước
+        """
+        frame = self.output_queue.get_nowait()
+
+        results = []
+        while True:
+            try:
+                results.append(self.result_queue.get_nowait())
+            except queue.Empty:
+                break
+        return frame, results
@@ -0,0 +1,108 @@
+import threading
+import time
+import numpy as np
+from bo_phat_hien import create_detector
+from bo_nhan_dang import create_recognizer
+
+# =====================================================================
+# QUẢN LÝ MÔ HÌNH (YOLO + EASYOCR) — TẢI LƯỜI, AN TOÀN ĐA LUỒNG
+# ---------------------------------------------------------------------
+# - Mô hình chỉ được tải ở lần dùng đầu tiên (không tải khi import).
+# - Bộ phát hiện được tạo theo backend trong cấu hình (torch / onnxruntime
+#   / openvino), xem bo_phat_hien.py; bộ OCR theo ocr_backend (easyocr /
+#   onnxruntime), xem bo_nhan_dang.py.
+# - Nhiều luồng cùng gọi lần đầu thì chỉ một luồng tải, các luồng khác chờ.
+# - Nhiều luồng dùng chung một bộ mô hình thì suy luận dưới infer_lock.
+# - Thời gian tải và làm nóng được ghi lại trong load_times để đo
+#   thời gian khởi động nguội.
+# =====================================================================
+
+
+class ModelBundle:
+    def __init__(self, config):
+        """
+        Khởi tạo bộ mô hình từ cấu hình (xem cau_hinh.load_config).
+        Chưa tải mô hình nào ở bước này.
+        """
+        self.config = config
+        self._detector = None
+        self._reader = None
+        self._lock = threading.Lock()
+        # Khoá suy luận: các luồng dùng chung một bộ mô hình (VD: camera và ảnh
+        # tải lên của giao diện) chạy YOLO / OCR lần lượt, không chạy chồng
+        self.infer_lock = threading.Lock()
+        self._warmup_thread = None
+        # Thời gian (giây) tải từng mô hình và làm nóng
+        self.load_times = {}
+
+    # -----------------------------------------------------------------
+    # TẢI MÔ HÌNH KHI CẦN
+    # -----------------------------------------------------------------
+    @property
+    def detector(self):
+        """Backend YOLO phát hiện biển số (tải ở lần gọi đầu tiên)."""
+        if self._detector is None:
+            with self._lock:
+                if self._detector is None:
+                    start = time.perf_counter()
+                    self._detector = create_detector(self.config)
+                    self.load_times["detector"] = time.perf_counter() - start
+        return self._detector
+
+    @property
+    def reader(self):
+        """Bộ đọc OCR: easyocr.Reader hoặc backend ONNX (tải ở lần gọi đầu tiên)."""
+        if self._reader is None:
+            with self._lock:
+                if self._reader is None:
+                    start = time.perf_counter()
+                    self._reader = create_recognizer(self.config)
+                    self.load_times["reader"] = time.perf_counter() - start
+        return self._reader
+
+    def detect(self, frame, imgsz=None):
+        """
+        Chạy YOLO trên một khung hình (imgsz: kích thước đầu vào cho lần gọi
+        này, mặc định theo cấu hình).
+        Trả về mảng (N, 5): [x1, y1, x2, y2, confidence] cho mỗi biển số.
+        """
+        return self.detector.detect(frame, imgsz)
+
+    def detect_batch(self, frames, imgsz=None):
+        """Chạy YOLO trên nhiều ảnh bằng một lần gọi; trả về danh sách mảng (N, 5)."""
+        return self.detector.detect_batch(frames, imgsz)
+
+    # -----------------------------------------------------------------
+    # LÀM NÓNG MÔ HÌNH
+    # -----------------------------------------------------------------
+    def warmup(self, background=True):
+        """
+        Tải mô hình và chạy một lần suy luận giả để lần nhận diện thật
+        đầu tiên không bị chậm. Khi background=True, chạy ở luồng nền và
+        trả về luồng đó.
+        """
+        if background:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(
+                    target=self._warmup, name="model-warmup", daemon=True
+                )
+                self._warmup_thread.start()
+            return self._warmup_thread
+        self._warmup()
+        return None
+
+    def _warmup(self):
+        # Tải trước (thời gian tải đã được ghi riêng), sau đó mới đo suy luận
+        self.detector
+        self.reader
+        with self.infer_lock:
+            start = time.perf_counter()
+            self.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+            self.reader.recognize(np.full((64, 256), 255, dtype=np.uint8))
+            self.load_times["warmup"] = time.perf_counter() - start
+
+    def wait_ready(self, timeout=None):
+        """Chờ luồng làm nóng (nếu có) hoàn tất."""
+        if self._warmup_thread is not None:
+            self._warmup_thread.join(timeout)
+
@@ -0,0 +1,445 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import cv2
+import numpy as np
+from chi_so import REGISTRY, setup as setup_metrics
+
+# =====================================================================
+# NHIỀU NGUỒN VIDEO (NHIỀU LÀN XE) + NHÓM LUỒNG NHẬN DIỆN DÙNG CHUNG
+# ---------------------------------------------------------------------
+# - Nguồn: chỉ số camera ("0", 1, ...), URL RTSP/HTTP, file video hoặc
+#   "synthetic" (khung hình tổng hợp, dùng để thử không cần camera).
+# - Mỗi nguồn có một luồng đọc riêng, chỉ giữ khung hình mới nhất.
+# - Một nhóm luồng nhận diện (mỗi luồng một bản mô hình, mặc định một
+#   luồng mỗi nhân CPU nhưng không quá số làn) lấy khung hình theo vòng
+#   tròn giữa các làn để không làn nào bị bỏ đói.
+# - Trạng thái theo dõi (tracker, bộ đệm OCR, biểu quyết, lập lịch YOLO)
+#   thuộc về từng LÀN; mỗi làn chỉ được một luồng xử lý tại một thời điểm.
+# - Kết quả xác nhận được gắn tên làn, đưa vào result_queue và ghi vào
+#   một kho sự kiện dùng chung (kho_su_kien.py).
+#
+# Ví dụ:
+#   python nguon_video.py rtsp://cam1/stream rtsp://cam2/stream --workers 2
+#   python nguon_video.py synthetic synthetic --seconds 10
+# =====================================================================
+
+logger = logging.getLogger("bien_so.nguon_video")
+
+# Mở lại nguồn mạng / camera khi không có khung hình quá RECONNECT_AFTER
+# giây; thời gian chờ giữa các lần thử tăng gấp đôi từ RECONNECT_MIN tới RECONNECT_MAX
+RECONNECT_AFTER = 2.0
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 30.0
+
+LANE_DROPPED = REGISTRY.gauge("lane_dropped_frames", "Số khung hình bị bỏ (chưa kịp xử lý) của từng làn",
+                              ("lane",))
+RESULT_QUEUE_DEPTH = REGISTRY.gauge("lane_result_queue_depth", "Số kết quả chờ lấy trong result_queue")
+
+
+# ---------------------------------------------------------------------
+# NGUỒN KHUNG HÌNH TỔNG HỢP
+# ---------------------------------------------------------------------
+class SyntheticCapture:
+    def __init__(self, size=(640, 480), fps=25.0, seed=0):
+        """
+        Nguồn giả lập có giao diện giống cv2.VideoCapture: nền xám nhiễu
+        nhẹ với một "biển số" trắng chạy ngang khung hình.
+        """
+        self.size = size
+        self.fps = fps
+        self._rng = np.random.default_rng(seed)
+        self._index = 0
+        self._opened = True
+        self._next_time = time.monotonic()
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        return False  # Không có thuộc tính nào để đặt
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0.0
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        # Giữ nhịp như camera thật
+        delay = self._next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_time = max(self._next_time, time.monotonic()) + 1.0 / self.fps
+
+        w, h = self.size
+        frame = np.full((h, w, 3), 90, dtype=np.uint8)
+        frame += self._rng.integers(0, 8, size=(h, w, 1), dtype=np.uint8)
+        x = (self._index * 4) % (w + 160) - 160
+        y = h // 2
+        cv2.rectangle(frame, (x, y), (x + 160, y + 80), (255, 255, 255), -1)
+        cv2.putText(frame, "59-X1", (x + 20, y + 32), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+        cv2.putText(frame, "123.45", (x + 10, y + 70), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+        self._index += 1
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+def open_capture(source, size=(640, 480)):
+    """
+    Mở một nguồn video.
+        - số nguyên hoặc chuỗi số: chỉ số camera
+        - "synthetic": nguồn tổng hợp (SyntheticCapture)
+        - chuỗi khác: file video hoặc URL (RTSP/HTTP)
+    Với camera, đặt kích thước khung hình theo size.
+    """
+    if isinstance(source, str) and source.strip().isdigit():
+        source = int(source)
+    if source == "synthetic":
+        return SyntheticCapture(size)
+    cap = cv2.VideoCapture(source)
+    if isinstance(source, int):
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+    return cap
+
+
+def _is_file(source):
+    return isinstance(source, str) and os.path.isfile(source)
+
+
+# ---------------------------------------------------------------------
+# MỘT NGUỒN VIDEO VỚI LUỒNG ĐỌC RIÊNG
+# ---------------------------------------------------------------------
+class FrameSource:
+    def __init__(self, source, size=(640, 480), loop_files=False):
+        """
+        Một nguồn video và luồng đọc riêng của nó.
+            - source: xem open_capture
+            - loop_files: đọc lại từ đầu khi file video kết thúc
+        File video được đọc theo đúng FPS của file để giống camera thật.
+        """
+        self.source = source
+        self.size = size
+        self.loop_files = loop_files
+        self.cap = None
+
+        # Khung hình mới nhất và số thứ tự của nó (0 = chưa có)
+        self.frame = None
+        self.seq = 0
+        self.finished = False
+        # Số khung hình bị ghi đè trước khi kịp xử lý
+        self.dropped = 0
+        # Số lần đã mở lại nguồn (mất kết nối RTSP / camera)
+        self.reconnects = 0
+        self.on_frame = None  # Hàm gọi lại khi có khung hình mới
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.cap = open_capture(self.source, self.size)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._read_loop, name=f"source-{self.source}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+
+    def _read_loop(self):
+        is_file = _is_file(self.source)
+        period = 0.0
+        if is_file:
+            fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+            period = 1.0 / fps if fps > 0 else 0.0
+        next_time = time.monotonic()
+        last_frame = time.monotonic()
+        backoff = RECONNECT_MIN
+        # File lặp: đã đọc được khung hình nào từ lần tua về đầu gần nhất chưa
+        looped_frame = False
+
+        while not self._stop_event.is_set():
+            ret, frame = self.cap.read() if self.cap.isOpened() else (False, None)
+            if not ret:
+                if is_file and self.loop_files and looped_frame:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    looped_frame = False
+                    continue
+                if is_file and not self.loop_files:
+                    break
+                if not is_file and self.cap.isOpened() and time.monotonic() - last_frame < RECONNECT_AFTER:
+                    time.sleep(0.01)  # Camera / luồng mạng tạm mất khung hình
+                    continue
+                # Mất nguồn quá lâu, chưa mở được, hoặc file lặp không có khung hình
+                # nào: mở lại, chờ tăng dần giữa các lần thử
+                logger.warning("Mất khung hình từ %s, mở lại sau %.1f giây", self.source, backoff)
+                if self._stop_event.wait(backoff):
+                    break
+                self.cap.release()
+                self.cap = open_capture(self.source, self.size)
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                self.reconnects += 1
+                backoff = min(backoff * 2, RECONNECT_MAX)
+                last_frame = time.monotonic()
+                continue
+            last_frame = time.monotonic()
+            backoff = RECONNECT_MIN
+            looped_frame = True
+
+            with self._lock:
+                if self.frame is not None:
+                    self.dropped += 1
+                self.frame = frame
+                self.seq += 1
+            if self.on_frame is not None:
+                self.on_frame()
+
+            if period:
+                next_time = max(next_time + period, time.monotonic() - period)
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+        self.finished = True
+        if self.on_frame is not None:
+            self.on_frame()
+
+    def take(self):
+        """Lấy (khung hình mới nhất, số thứ tự) và đánh dấu đã lấy."""
+        with self._lock:
+            frame, self.frame = self.frame, None
+            return frame, self.seq
+
+
+# ---------------------------------------------------------------------
+# MỘT LÀN XE: NGUỒN + TRẠNG THÁI NHẬN DIỆN RIÊNG
+# ---------------------------------------------------------------------
+class Lane:
+    def __init__(self, name, source, recognizer):
+        self.name = name
+        self.source = source
+        # PlateRecognizer không mở camera: giữ tracker / bộ đệm / biểu quyết
+        self.recognizer = recognizer
+        self.busy = False
+        self.frames = 0
+        # Số khung hình bị lỗi khi nhận diện
+        self.errors = 0
+        # Khung hình mới nhất đã vẽ kết quả (để hiển thị)
+        self.annotated = None
+
+
+class SourceManager:
+    def __init__(self, sources, workers=None, config=None, ocr_mode=None,
+                 names=None, size=None, loop_files=False):
+        """
+        Quản lý nhiều nguồn video và nhóm luồng nhận diện dùng chung.
+            - sources: danh sách nguồn (xem open_capture)
+            - workers: số luồng nhận diện, mỗi luồng một bản mô hình
+              (mặc định: số nhân CPU, không quá số làn)
+            - config: dict cấu hình (mặc định: cau_hinh.load_config())
+            - names: tên làn (mặc định "lane-1", "lane-2", ...)
+            - size: độ phân giải yêu cầu (mặc định config["capture_size"])
+        """
+        # Import trễ: chuc_nang dùng open_capture của module này
+        from cau_hinh import load_config
+        from chuc_nang import PlateRecognizer
+        from kho_su_kien import EventStore
+        from chu_xe_dang_ky import OwnerRegistry
+        from mo_hinh import ModelBundle
+        from vung_quan_tam import region_from_config
+
+        if not sources:
+            raise ValueError("Cần ít nhất một nguồn video")
+        self.config = config or load_config()
+        names = names or [f"lane-{i + 1}" for i in range(len(sources))]
+        size = tuple(size or self.config["capture_size"])
+        workers = workers or self.config["workers"] or (os.cpu_count() or 1)
+        workers = max(1, min(workers, len(sources)))
+
+        # Mỗi luồng nhận diện một bản mô hình (tải lười ở lần dùng đầu)
+        self.model_bundles = [ModelBundle(self.config) for _ in range(workers)]
+        if self.config["warmup"]:
+            for models in self.model_bundles:
+                models.warmup(background=True)
+        # Một kho sự kiện (một luồng ghi) dùng chung cho mọi làn
+        self.events = EventStore(self.config["event_db"]) if self.config["event_db"] else None
+        # Một danh bạ chủ xe dùng chung (chỉ nạp một lần cho mọi làn)
+        self.owners = None
+        if self.config["owner_registry"]:
+            self.owners = OwnerRegistry(self.config["owner_registry"], fuzzy=self.config["owner_fuzzy"])
+        # Làn video không nhận diện ảnh tĩnh: không mở bộ đệm kết quả ảnh cho từng làn
+        lane_config = dict(self.config, result_cache="")
+        self.lanes = []
+        for name, source in zip(names, sources):
+            recognizer = PlateRecognizer(ocr_mode=ocr_mode, camera_index=None, config=lane_config,
+                                         models=self.model_bundles[0], events=self.events,
+                                         owners=self.owners)
+            recognizer.lane = name
+            # ROI khai báo theo tên làn hoặc theo chính nguồn video
+            recognizer.roi = region_from_config(self.config, name, source)
+            self.lanes.append(Lane(name, FrameSource(source, size, loop_files), recognizer))
+
+        # Kết quả đã xác nhận của mọi làn (mỗi kết quả có khoá "lane")
+        self.result_queue = queue.Queue()
+        self._cond = threading.Condition()
+        self._cursor = 0
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    # -----------------------------------------------------------------
+    # KHỞI ĐỘNG / DỪNG
+    # -----------------------------------------------------------------
+    def start(self):
+        if self._threads:
+            return
+        self._stop_event.clear()
+        for lane in self.lanes:
+            lane.source.on_frame = self._notify
+            lane.source.start()
+        for i, models in enumerate(self.model_bundles):
+            thread = threading.Thread(target=self._worker_loop, args=(models,),
+                                      name=f"plate-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop_event.set()
+        self._notify()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+        for lane in self.lanes:
+            lane.source.stop()
+        if self.events is not None:
+            self.events.close()
+
+    def finished(self):
+        """True khi mọi nguồn đã kết thúc (chỉ xảy ra với file video)."""
+        return all(lane.source.finished and lane.source.frame is None for lane in self.lanes)
+
+    def _notify(self):
+        with self._cond:
+            self._cond.notify()
+
+    # -----------------------------------------------------------------
+    # PHÂN PHỐI KHUNG HÌNH CHO CÁC LUỒNG NHẬN DIỆN
+    # -----------------------------------------------------------------
+    def _next_job(self):
+        """
+        Chọn làn tiếp theo theo vòng tròn: làn rảnh và có khung hình mới.
+        Trả về (làn, khung hình) hoặc None khi đã dừng.
+        """
+        with self._cond:
+            while not self._stop_event.is_set():
+                n = len(self.lanes)
+                for offset in range(n):
+                    index = (self._cursor + offset) % n
+                    lane = self.lanes[index]
+                    if lane.busy or lane.source.frame is None:
+                        continue
+                    frame, _ = lane.source.take()
+                    lane.busy = True
+                    self._cursor = index + 1
+                    return lane, frame
+                self._cond.wait(0.1)
+        return None
+
+    def _worker_loop(self, models):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            lane, frame = job
+            try:
+                recognizer = lane.recognizer
+                current_plates = recognizer.detect_plate(frame, models=models)
+                for result in recognizer.stabilize_plate(current_plates):
+                    self.result_queue.put(result)  # Kết quả đã có khoá "lane"
+                lane.frames += 1
+                lane.annotated = frame
+            except Exception:
+                # Một khung lỗi không được làm mất luồng nhận diện dùng chung
+                lane.errors += 1
+                logger.exception("Lỗi nhận diện khung hình của làn %s", lane.name)
+            finally:
+                with self._cond:
+                    lane.busy = False
+                    self._cond.notify()
+
+    # -----------------------------------------------------------------
+    # LẤY KẾT QUẢ
+    # -----------------------------------------------------------------
+    def poll(self):
+        """Lấy các kết quả đã xác nhận kể từ lần gọi trước (không chặn)."""
+        if REGISTRY.enabled:
+            RESULT_QUEUE_DEPTH.set(self.result_queue.qsize())
+            for lane in self.lanes:
+                LANE_DROPPED.labels(lane.name).set(lane.source.dropped)
+        results = []
+        while True:
+            try:
+                results.append(self.result_queue.get_nowait())
+            except queue.Empty:
+                return results
+
+    def stats(self):
+        """Số khung hình đã xử lý / bị bỏ / lỗi và số lần mở lại nguồn của từng làn."""
+        return {
+            lane.name: {"processed": lane.frames, "dropped": lane.source.dropped,
+                        "errors": lane.errors, "reconnects": lane.source.reconnects}
+            for lane in self.lanes
+        }
+
+
+def main(argv=None):
+    from cau_hinh import load_config
+
+    parser = argparse.ArgumentParser(description="Nhận diện biển số từ nhiều camera / nguồn video")
+    parser.add_argument("sources", nargs="*",
+                        help="Chỉ số camera, URL RTSP, file video hoặc 'synthetic' (mặc định: cấu hình 'sources')")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Số luồng nhận diện (mặc định: số nhân CPU, không quá số nguồn)")
+    parser.add_argument("--seconds", type=float, default=None, help="Dừng sau N giây")
+    parser.add_argument("--loop", action="store_true", help="Phát lại file video khi hết")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    setup_metrics(config)
+    manager = SourceManager(args.sources or config["sources"], workers=args.workers,
+                            config=config, loop_files=args.loop)
+    manager.start()
+    deadline = time.monotonic() + args.seconds if args.seconds else None
+    try:
+        while not manager.finished() and (deadline is None or time.monotonic() < deadline):
+            for result in manager.poll():
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop()
+        for result in manager.poll():
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+        print(json.dumps(manager.stats(), ensure_ascii=False), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# =====================================================================
+# NHẬN DIỆN NHIỀU ẢNH TẢI LÊN (CHẠY NỀN)
+# ---------------------------------------------------------------------
+# - Giao diện chọn nhiều file một lần; các file được nhận diện trên một
+#   nhóm luồng nền để cửa sổ Tkinter không bị treo.
+# - Mỗi luồng một PlateRecognizer riêng (không mở camera, trạng thái
+#   riêng) nhưng dùng chung bộ mô hình, kho sự kiện, danh bạ chủ xe và bộ
+#   đệm kết quả của detector chính: không tải thêm bản YOLO / OCR nào.
+#   YOLO / OCR chạy lần lượt dưới models.infer_lock (chung với luồng
+#   camera); đọc file, giải mã và băm ảnh vẫn chạy song song.
+# - Ảnh đã có trong bộ đệm kết quả (bo_dem_ket_qua.py) trả về ngay, không
+#   chờ khoá mô hình.
+# - Giao diện gọi poll() định kỳ để lấy kết quả và tiến độ.
+# =====================================================================
+
+
+class UploadPool:
+    def __init__(self, detector, workers=None):
+        """
+        Khởi tạo nhóm luồng nhận diện ảnh tải lên.
+            - detector: PlateRecognizer chính (lấy cấu hình và các tài nguyên dùng chung)
+            - workers: số luồng (mặc định config["upload_workers"])
+        """
+        self.detector = detector
+        self.workers = max(1, workers or detector.config["upload_workers"] or 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="upload")
+        self._local = threading.local()
+        # Kết quả đã xong: (đường dẫn, kết quả hoặc None, lỗi hoặc None)
+        self._done_queue = queue.Queue()
+        self._lock = threading.Lock()
+        # Tiến độ của đợt tải hiện tại
+        self.total = 0
+        self.done = 0
+
+    def _recognizer(self):
+        """PlateRecognizer của luồng hiện tại (tạo ở lần dùng đầu)."""
+        recognizer = getattr(self._local, "recognizer", None)
+        if recognizer is None:
+            from chuc_nang import PlateRecognizer
+            detector = self.detector
+            recognizer = PlateRecognizer(ocr_mode=detector.ocr_mode, camera_index=None,
+                                         config=detector.config, models=detector.models,
+                                         events=detector.events, owners=detector.owners,
+                                         results=detector.results)
+            self._local.recognizer = recognizer
+        return recognizer
+
+    def _run(self, path):
+        try:
+            self._done_queue.put((path, self._recognizer().recognize_from_image(path), None))
+        except Exception as exc:  # Một ảnh lỗi không làm dừng cả đợt
+            self._done_queue.put((path, None, exc))
+
+    # -----------------------------------------------------------------
+    # GỬI ẢNH / LẤY KẾT QUẢ
+    # -----------------------------------------------------------------
+    def submit(self, paths):
+        """Đưa danh sách đường dẫn ảnh vào hàng chờ nhận diện."""
+        with self._lock:
+            if self.done >= self.total:
+                # Đợt trước đã xong: bắt đầu đếm tiến độ lại từ đầu
+                self.total = self.done = 0
+            self.total += len(paths)
+        for path in paths:
+            self._executor.submit(self._run, path)
+
+    def poll(self):
+        """
+        Lấy các ảnh đã nhận diện xong kể từ lần gọi trước (không chặn).
+        Trả về danh sách (đường dẫn, kết quả hoặc None, lỗi hoặc None).
+        """
+        items = []
+        while True:
+            try:
+                items.append(self._done_queue.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            self.done += len(items)
+        return items
+
+    def busy(self):
+        """True khi còn ảnh đang chờ hoặc chưa được lấy kết quả."""
+        with self._lock:
+            return self.done < self.total
+
+    def shutdown(self):
+        """Bỏ các ảnh chưa chạy và dừng nhóm luồng (không chờ ảnh đang chạy)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,9 +1,10 @@
 import cv2
 from ultralytics import YOLO
 import easyocr
-from bien_so_map_dau import BIEN_SO_MAP_DAU
-from bien_so_map import BIEN_SO_MAP
+from tinh_thanh import province_name
 from chu_xe import CHU_XE
+from cau_hinh import load_config
+from chuan_hoa_bien_so import normalize_plate
 import tkinter as tk
 from tkinter import Label, Button, Frame, Scrollbar, ttk
 from PIL import Image, ImageTk
@@ -14,9 +15,10 @@ import random
 # 1 CẤU HÌNH MÔ HÌNH & OCR
 # Khởi tạo mô hình YOLO và EasyOCR để phát hiện biển số và nhận diện chữ.
 # =====================================================================
-MODEL_PATH = "D:/Do_An_AI/runs/detect/train_bien_so_100epoch/weights/best.pt" #thay đổi đường dẫn tới mô hình của bạn
+config = load_config()  # Đường dẫn mô hình lấy từ cau_hinh.py / biến môi trường BIEN_SO_MODEL_PATH
+MODEL_PATH = config["model_path"]
 model = YOLO(MODEL_PATH)  # Tải mô hình YOLO đã huấn luyện trước để phát hiện biển số
-reader = easyocr.Reader(['vi'], gpu=True)  # Khởi tạo EasyOCR cho nhận diện chữ tiếng Việt
+reader = easyocr.Reader(config["ocr_languages"], gpu=config["ocr_gpu"] is not False)  # Khởi tạo EasyOCR cho nhận diện chữ tiếng Việt
 
 # =====================================================================
 # 2 KHỞI TẠO GIAO DIỆN NGƯỜI DÙNG
@@ -155,11 +157,12 @@ def detect_plate(frame):
 
             result = reader.readtext(bien_so_crop)  # Thực hiện OCR trên vùng cắt
             text = " ".join([res[1] for res in result]) if result else ""  # Kết hợp kết quả OCR
+            # Chuẩn hoá về dạng "59-X1 123.45"; chuỗi không hợp lệ bị bỏ
+            text = normalize_plate(text) or ""
 
             if text:
-                # Trích xuất mã tỉnh (phần đầu trước '-' hoặc 2 ký tự đầu)
-                ma_tinh = text.split("-")[0] if "-" in text else text[:2]
-                dia_phuong = BIEN_SO_MAP.get(ma_tinh, "Không rõ địa phương")  # Ánh xạ mã tỉnh
+                # Mã tỉnh = 2 ký tự đầu của biển số dạng chuẩn
+                dia_phuong = province_name(text, accented=False)  # Ánh xạ mã tỉnh
 
                 current_plate = text
                 # Hiển thị biển số và địa phương trên khung hình
@@ -192,8 +195,7 @@ def stabilize_plate(current_plate):
 
     # Xác nhận khi có ít nhất 3 lần liên tiếp cùng 1 biển số
     if plate_buffer.count(current_plate) >= 3 and current_plate != last_confirmed_plate:
-        ma_tinh = current_plate.split("-")[0] if "-" in current_plate else current_plate[:2]
-        dia_phuong = BIEN_SO_MAP_DAU.get(ma_tinh, "Không rõ địa phương")
+        dia_phuong = province_name(current_plate)
 
         # --- Gán tên chủ xe (ngẫu nhiên 1 lần duy nhất cho biển đó) ---
         if current_plate not in plate_owner_map:
@@ -0,0 +1,72 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bieu_quyet import CharVoter
+
+# =====================================================================
+# KIỂM TRA BIỂU QUYẾT THEO TỪNG KÝ TỰ (CharVoter)
+# =====================================================================
+
+PLATE = "59X112345"
+
+
+def test_empty_voter_has_no_result():
+    voter = CharVoter()
+    voter.add("", 0.9)
+    assert voter.reads == 0
+    assert voter.consensus() == ""
+    assert voter.result() is None
+
+
+def test_single_read_below_min_weight():
+    voter = CharVoter(min_weight=1.5)
+    voter.add(PLATE, 0.9)
+    assert voter.consensus() == PLATE
+    assert voter.result() is None
+
+
+def test_two_matching_reads_confirm():
+    voter = CharVoter()
+    voter.add(PLATE, 0.9)
+    voter.add(PLATE, 0.9)
+    assert voter.result() == (PLATE, 0.9)
+
+
+def test_one_misread_char_is_outvoted():
+    voter = CharVoter()
+    for text in (PLATE, "59X1123A5", PLATE):
+        voter.add(text, 0.9)
+    # Vị trí bị đọc nhầm: 1.8 / 2.7 phiếu → tỉ lệ 2/3 ≥ min_share
+    assert voter.result() == (PLATE, 0.6)
+
+
+def test_min_share_rejects_tied_position():
+    voter = CharVoter(min_weight=0.5, min_share=0.6)
+    voter.add("ABC", 0.9)
+    voter.add("ABD", 0.9)
+    # Vị trí cuối hoà C/D (tỉ lệ 0.5) → chưa xác nhận dù đủ tổng phiếu
+    assert voter.result() is None
+    voter.add("ABC", 0.9)
+    assert voter.result() == ("ABC", 0.6)
+
+
+def test_length_buckets_pick_heaviest_length():
+    voter = CharVoter()
+    voter.add(PLATE, 0.9)
+    voter.add(PLATE[:-1], 0.9)      # Thiếu ký tự cuối
+    voter.add(PLATE, 0.9)
+    assert set(voter.buckets) == {8, 9}
+    assert voter.length_weight == {9: 1.8, 8: 0.9}
+    plate, _ = voter.result()
+    assert plate == PLATE
+
+
+def test_short_read_still_votes_for_aligned_positions():
+    voter = CharVoter()
+    voter.add(PLATE, 0.9)
+    voter.add(PLATE[:-1], 0.9)
+    bucket = voter.buckets[len(PLATE)]
+    # 8 vị trí khớp được cộng thêm phiếu, vị trí cuối chỉ có lần đọc đầu
+    assert [round(pos[ch], 2) for pos, ch in zip(bucket, PLATE)] == [1.8] * 8 + [0.9]
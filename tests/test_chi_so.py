@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chi_so import MetricsRegistry
+
+# =====================================================================
+# KIỂM TRA CHỈ SỐ VẬN HÀNH (chi_so.py)
+# =====================================================================
+
+
+def _registry():
+    registry = MetricsRegistry()
+    registry.enabled = True
+    return registry
+
+
+def test_labelled_histogram_uses_custom_buckets():
+    histogram = _registry().histogram("size_bytes", "Kích thước", ("kind",), buckets=(10, 100))
+    child = histogram.labels("jpeg")
+    assert child.buckets == (10, 100)
+    assert len(child.counts) == 3
+    for value in (5, 50, 500, 5000):
+        child.observe(value)
+    assert child.counts == [1, 1, 2]
+    assert histogram.labels("jpeg") is child
+
+
+def test_render_histogram_buckets():
+    registry = _registry()
+    registry.histogram("size_bytes", "Kích thước", ("kind",), buckets=(10, 100)).labels("png").observe(50)
+    text = registry.render()
+    assert 'size_bytes_bucket{kind="png",le="10"} 0' in text
+    assert 'size_bytes_bucket{kind="png",le="100"} 1' in text
+    assert 'size_bytes_bucket{kind="png",le="+Inf"} 1' in text
+    assert 'size_bytes_count{kind="png"} 1' in text
+
+
+def test_render_escapes_label_values():
+    registry = _registry()
+    registry.counter("frames_total", "Khung hình", ("source",)).labels('C:\\cam "1"\nx').inc()
+    assert 'frames_total{source="C:\\\\cam \\"1\\"\\nx"} 1' in registry.render()
+
+
+def test_disabled_registry_ignores_updates():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Yêu cầu")
+    counter.inc()
+    histogram = registry.histogram("latency_seconds", "Độ trễ")
+    with histogram.time():
+        pass
+    assert counter.value == 0 and histogram.count == 0
@@ -0,0 +1,115 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chu_xe_dang_ky import OwnerRegistry
+
+# =====================================================================
+# KIỂM TRA DANH BẠ CHỦ XE (OwnerRegistry)
+# =====================================================================
+
+ROWS = [
+    ("59x1-12345", "Nguyễn Văn A"),
+    ("51F-123.45", "Trần Thị B"),
+    ("29-AA 555.01", "Lê Văn C"),
+    ("29-AA 555.02", "Phạm Văn D"),
+    ("khong hop le", "Bỏ qua"),
+]
+
+
+def _write_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("plate,owner\n")
+        for plate, owner in rows:
+            f.write(f"{plate},{owner}\n")
+
+
+def _registry(tmp_path, rows=ROWS, **kwargs):
+    path = str(tmp_path / "owners.csv")
+    _write_csv(path, rows)
+    return OwnerRegistry(path, **kwargs)
+
+
+def _wait_reload():
+    """Chờ luồng nạp lại nền (nếu có) kết thúc."""
+    for thread in threading.enumerate():
+        if thread.name == "owner-reload":
+            thread.join(timeout=5.0)
+
+
+def test_exact_match_uses_normalized_plate(tmp_path):
+    registry = _registry(tmp_path)
+    assert len(registry) == 4 and registry.skipped == 1
+    assert registry.find("59-X1 123.45") == ("59-X1 123.45", "Nguyễn Văn A", 0)
+    assert registry.lookup("51F-123.45") == "Trần Thị B"
+
+
+def test_one_substitution(tmp_path):
+    registry = _registry(tmp_path)
+    assert registry.find("59-X1 123.46") == ("59-X1 123.45", "Nguyễn Văn A", 1)
+    assert registry.find("59-X7 123.45") == ("59-X1 123.45", "Nguyễn Văn A", 1)
+
+
+def test_one_insertion_or_deletion(tmp_path):
+    registry = _registry(tmp_path)
+    assert registry.find("51F-1234")[1] == "Trần Thị B"      # Thiếu một ký tự
+    assert registry.find("59-X1 1234")[1] == "Nguyễn Văn A"
+
+
+def test_no_match(tmp_path):
+    registry = _registry(tmp_path)
+    assert registry.find("30-A1 999.99") is None
+    # Sai 2 ký tự
+    assert registry.find("59-X1 123.99") is None
+
+
+def test_ambiguous_near_match_is_rejected(tmp_path):
+    registry = _registry(tmp_path)
+    # Cách cả 555.01 và 555.02 một ký tự → không đoán
+    assert registry.find("29-AA 555.03") is None
+    assert registry.find("29-AA 555.02")[2] == 0
+
+
+def test_fuzzy_disabled(tmp_path):
+    registry = _registry(tmp_path, fuzzy=False)
+    assert registry.find("59-X1 123.46") is None
+
+
+def test_reload_after_mtime_change(tmp_path):
+    registry = _registry(tmp_path, check_interval=0.0)
+    assert registry.lookup("30-A1 999.99") is None
+
+    _write_csv(registry.path, ROWS + [("30-A1 999.99", "Chủ xe mới")])
+    mtime = os.path.getmtime(registry.path) + 10
+    os.utime(registry.path, (mtime, mtime))
+
+    registry.find("30-A1 999.99")   # Phát hiện thay đổi, nạp lại ở luồng nền
+    _wait_reload()
+    assert registry.lookup("30-A1 999.99") == "Chủ xe mới"
+    assert len(registry) == 5
+
+
+def test_failed_reload_keeps_index_and_warns(tmp_path, caplog):
+    registry = _registry(tmp_path, check_interval=0.0)
+    with open(registry.path, "wb") as f:
+        f.write(b"plate,owner\n\xff\xfe\xfa,\xff\n")   # Không phải UTF-8
+    mtime = os.path.getmtime(registry.path) + 10
+    os.utime(registry.path, (mtime, mtime))
+
+    with caplog.at_level(logging.WARNING, logger="bien_so.chu_xe_dang_ky"):
+        registry.find("59-X1 123.45")
+        _wait_reload()
+    assert "Không thể nạp lại danh bạ chủ xe" in caplog.text
+    assert registry.lookup("59-X1 123.45") == "Nguyễn Văn A"
+
+
+def test_check_interval_limits_stat_calls(tmp_path):
+    registry = _registry(tmp_path, check_interval=60.0)
+    registry._last_check = time.monotonic()
+    os.remove(registry.path)
+    # Chưa tới kỳ kiểm tra: vẫn tra cứu trên chỉ mục cũ, không lỗi
+    assert registry.lookup("51F-123.45") == "Trần Thị B"
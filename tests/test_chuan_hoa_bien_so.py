@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chuan_hoa_bien_so import is_valid_plate, normalize_plate, parse_plate
+
+# =====================================================================
+# KIỂM TRA CHUẨN HOÁ BIỂN SỐ (chuan_hoa_bien_so.py)
+# =====================================================================
+
+
+def test_docstring_examples():
+    assert normalize_plate("59-x1 123 45") == "59-X1 123.45"
+    assert normalize_plate("59X1.12345") == "59-X1 123.45"
+    # S→5 ở vị trí số, I→1 ở vị trí sê-ri, "З" Kirin → 3
+    assert normalize_plate("5S-XI 12З.4S") == "55-X1 123.45"
+
+
+def test_car_plates():
+    assert normalize_plate("51F-123.45") == "51F-123.45"
+    assert normalize_plate("51F 1234") == "51F-1234"
+    assert parse_plate("51LD12345")["kind"] == "o_to"
+
+
+def test_homoglyphs_map_to_latin():
+    # "Х" Kirin, "О" Kirin ở vị trí số, "Β" Hy Lạp ở vị trí sê-ri
+    assert normalize_plate("59-Х1 123.45") == "59-X1 123.45"
+    assert normalize_plate("59-X1 12О.45") == "59-X1 120.45"
+    assert normalize_plate("29-ΒA 123.45") == "29-BA 123.45"
+
+
+def test_only_separators_are_stripped():
+    for text in ("59-X1 123,45", "59-X1 123@45", "59_X1 12345", "59-X1 123.45!"):
+        assert normalize_plate(text) is None, text
+
+
+def test_invalid_plates_rejected():
+    assert normalize_plate("") is None
+    assert normalize_plate("00-X1 123.45") is None   # Mã tỉnh không tồn tại
+    assert normalize_plate("59-X1 12") is None       # Sai độ dài
+    assert normalize_plate("59-X1 1ZZ.ZZ") is None   # Sửa quá MAX_FIXES ký tự
+
+
+def test_is_valid_plate():
+    assert is_valid_plate("59-X1 123.45")
+    assert is_valid_plate("51F-1234")
+    assert not is_valid_plate("59X112345")
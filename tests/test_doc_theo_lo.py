@@ -0,0 +1,82 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cau_hinh import load_config
+from chuc_nang import PlateRecognizer
+from tien_xu_ly import PlatePreprocessor
+
+# =====================================================================
+# KIỂM TRA NHẬN DIỆN NHIỀU ẢNH TRONG MỘT LÔ (PlateRecognizer.read_frames)
+# ---------------------------------------------------------------------
+# Mô hình giả: YOLO trả một hộp cố định, OCR đọc theo độ sáng của từng
+# vùng trên ảnh ghép → ảnh sáng / ảnh tối phải ra hai biển số khác nhau.
+# =====================================================================
+
+BOX = [100, 100, 260, 180, 0.9]
+
+
+class _Detector:
+    def detect_batch(self, frames, imgsz=None):
+        return [np.array([BOX], dtype=np.float32) for _ in frames]
+
+    def detect(self, frame, imgsz=None):
+        return self.detect_batch([frame], imgsz)[0]
+
+
+class _Reader:
+    def recognize(self, image, horizontal_list=None, free_list=None, batch_size=1, detail=1,
+                  paragraph=False, allowlist=None):
+        results = []
+        for x1, x2, y1, y2 in horizontal_list:
+            text = "59X112345" if image[y1:y2, x1:x2].mean() > 128 else "30A199999"
+            results.append(([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], text, 0.9))
+        return results
+
+
+class _Models:
+    def __init__(self):
+        self.detector = _Detector()
+        self.reader = _Reader()
+        self.load_times = {}
+
+    def detect(self, frame, imgsz=None):
+        return self.detector.detect(frame, imgsz)
+
+    def detect_batch(self, frames, imgsz=None):
+        return self.detector.detect_batch(frames, imgsz)
+
+
+def _recognizer(preprocess):
+    config = load_config(event_db="", result_cache="", owner_registry="", ocr_mode="crop",
+                         preprocess=preprocess)
+    return PlateRecognizer(camera_index=None, config=config, models=_Models())
+
+
+def _frames():
+    dark = np.full((480, 640, 3), 20, dtype=np.uint8)
+    bright = np.full((480, 640, 3), 235, dtype=np.uint8)
+    return [dark, bright]
+
+
+def test_read_frames_keeps_each_image_separate():
+    for preprocess in (True, False):
+        plates = _recognizer(preprocess).read_frames(_frames())
+        assert [p[0]["plate"] for p in plates] == ["30-A1 999.99", "59-X1 123.45"], preprocess
+
+
+def test_read_frames_matches_read_frame():
+    recognizer = _recognizer(True)
+    frames = _frames()
+    assert recognizer.read_frames(frames) == [recognizer.read_frame(f) for f in frames]
+
+
+def test_prepare_start_uses_distinct_buffers():
+    preprocessor = PlatePreprocessor(deskew=False)
+    dark, bright = _frames()
+    first = preprocessor.prepare(dark, [tuple(BOX[:4])])
+    second = preprocessor.prepare(bright, [tuple(BOX[:4])], start=1)
+    assert not np.shares_memory(first[0], second[0])
+    assert first[0].mean() < 128 < second[0].mean()
@@ -0,0 +1,79 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lap_lich import DetectionScheduler
+
+# =====================================================================
+# KIỂM TRA LẬP LỊCH CHẠY YOLO (DetectionScheduler)
+# ---------------------------------------------------------------------
+# Cảnh tĩnh dùng cùng một khung hình; cảnh chuyển động xen kẽ khung
+# tối / sáng để mọi điểm ảnh đều thay đổi.
+# =====================================================================
+
+DARK = np.zeros((240, 320, 3), dtype=np.uint8)
+BRIGHT = np.full((240, 320, 3), 255, dtype=np.uint8)
+
+
+def _scheduler(**kwargs):
+    scheduler = DetectionScheduler(**kwargs)
+    assert scheduler.should_detect(DARK) == (True, "refresh")   # Khung đầu luôn chạy
+    return scheduler
+
+
+def _moving(scheduler, count, pending_tracks=False):
+    frames = [BRIGHT, DARK] * count
+    return [scheduler.should_detect(f, pending_tracks)[1] for f in frames[:count]]
+
+
+def test_motion_ratio():
+    scheduler = DetectionScheduler()
+    assert scheduler.motion(DARK) == 1.0        # Chưa có khung trước
+    assert scheduler.motion(DARK) == 0.0
+    assert scheduler.motion(BRIGHT) == 1.0
+
+
+def test_static_scene_skips_until_refresh():
+    scheduler = _scheduler(idle_interval=5)
+    reasons = [scheduler.should_detect(DARK)[1] for _ in range(5)]
+    assert reasons == ["static"] * 4 + ["refresh"]
+    assert scheduler.counters["skip"]["static"] == 4
+    assert scheduler.counters["run"]["refresh"] == 2
+
+
+def test_pending_tracks_run_every_min_interval():
+    scheduler = _scheduler(min_interval=2)
+    reasons = [scheduler.should_detect(DARK, pending_tracks=True)[1] for _ in range(4)]
+    assert reasons == ["interval", "tracks"] * 2
+
+
+def test_motion_runs_every_min_interval_within_budget():
+    scheduler = _scheduler(min_interval=2)
+    scheduler.record(detect_ms=10.0, other_ms=10.0)
+    assert scheduler.budget_interval() == 2
+    assert _moving(scheduler, 4) == ["interval", "motion"] * 2
+
+
+def test_slow_detector_widens_interval():
+    scheduler = _scheduler(min_interval=2, budget_ms=40.0)
+    scheduler.record(detect_ms=60.0, other_ms=20.0)
+    # Dư 20 ms mỗi khung cho YOLO 60 ms → chạy mỗi 3 khung hình
+    assert scheduler.budget_interval() == 3
+    assert _moving(scheduler, 6) == ["interval", "budget", "motion"] * 2
+    assert scheduler.counters["skip"]["budget"] == 2
+
+
+def test_no_spare_budget_falls_back_to_idle_interval():
+    scheduler = DetectionScheduler(idle_interval=30, budget_ms=40.0)
+    scheduler.record(detect_ms=30.0, other_ms=50.0)
+    assert scheduler.budget_interval() == 30
+
+
+def test_record_uses_moving_average():
+    scheduler = DetectionScheduler()
+    scheduler.record(detect_ms=10.0)
+    scheduler.record(detect_ms=20.0, alpha=0.5)
+    assert scheduler.detect_ms == 15.0
+    assert scheduler.other_ms == 0.0
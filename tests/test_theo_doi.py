@@ -0,0 +1,86 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from theo_doi import PlateTracker, iou_matrix
+
+# =====================================================================
+# KIỂM TRA BỘ THEO DÕI BIỂN SỐ (PlateTracker)
+# ---------------------------------------------------------------------
+# Sinh track khi có phát hiện mới, giữ nguyên ID khi hộp dịch chuyển
+# ít, và xoá track sau max_missed lần YOLO không thấy.
+# =====================================================================
+
+
+def _det(x1, y1, x2, y2, confidence=0.9):
+    return np.array([[x1, y1, x2, y2, confidence]], dtype=np.float64)
+
+
+def test_iou_matrix():
+    iou = iou_matrix([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+    assert np.allclose(iou, [[1.0, 1.0 / 3.0, 0.0]])
+    assert iou_matrix([], [[0, 0, 10, 10]]).shape == (0, 1)
+
+
+def test_new_detection_creates_track():
+    tracker = PlateTracker()
+    tracks = tracker.update(_det(100, 100, 200, 150))
+    assert [t.id for t in tracks] == [1]
+    assert tracks[0].hits == 1 and tracks[0].missed == 0
+    assert np.allclose(tracks[0].box, [100, 100, 200, 150])
+
+
+def test_id_stable_while_plate_moves():
+    tracker = PlateTracker()
+    tracker.update(_det(100, 100, 200, 150))
+    for step in range(1, 6):
+        tracker.predict()
+        tracks = tracker.update(_det(100 + 5 * step, 100, 200 + 5 * step, 150))
+        assert [t.id for t in tracks] == [1]
+    assert tracker.get(1).hits == 6
+    assert tracker.get(2) is None
+
+
+def test_two_plates_keep_their_ids():
+    tracker = PlateTracker()
+    tracker.update(np.vstack([_det(0, 0, 100, 50), _det(300, 0, 400, 50)]))
+    tracker.predict()
+    # Thứ tự phát hiện đảo ngược: mỗi hộp vẫn phải về đúng track của nó
+    tracks = tracker.update(np.vstack([_det(303, 0, 403, 50), _det(3, 0, 103, 50)]))
+    by_id = {t.id: t.box[0] for t in tracks}
+    assert sorted(by_id) == [1, 2]
+    assert by_id[1] < 50 < 250 < by_id[2]
+
+
+def test_missed_track_dies_after_max_missed():
+    tracker = PlateTracker(max_missed=2)
+    empty = np.zeros((0, 5))
+    tracker.update(_det(100, 100, 200, 150))
+    for missed in (1, 2):
+        tracker.predict()
+        tracks = tracker.update(empty)
+        assert [t.missed for t in tracks] == [missed]
+        assert tracker.active_tracks() == []
+    tracker.predict()
+    assert tracker.update(empty) == []
+
+
+def test_missed_track_recovers_with_same_id():
+    tracker = PlateTracker(max_missed=2)
+    tracker.update(_det(100, 100, 200, 150))
+    tracker.predict()
+    tracker.update(np.zeros((0, 5)))
+    tracker.predict()
+    tracks = tracker.update(_det(102, 100, 202, 150))
+    assert [(t.id, t.missed) for t in tracks] == [(1, 0)]
+
+
+def test_far_detection_starts_new_track():
+    tracker = PlateTracker()
+    tracker.update(_det(0, 0, 100, 50))
+    tracker.predict()
+    tracks = tracker.update(_det(500, 400, 600, 450))
+    # Track cũ bị lỡ một lần, phát hiện ở xa tạo track mới với ID mới
+    assert [(t.id, t.missed) for t in tracks] == [(1, 1), (2, 0)]
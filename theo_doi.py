@@ -0,0 +1,179 @@
+import numpy as np
+from bieu_quyet import CharVoter
+
+# =====================================================================
+# THEO DÕI NHIỀU BIỂN SỐ (KIỂU SORT: KALMAN + GHÉP CẶP THEO IoU)
+# ---------------------------------------------------------------------
+# - Mỗi biển số được gán một track ID riêng và bộ lọc Kalman riêng.
+# - Giữa các lần chạy YOLO, vị trí hộp được DỰ ĐOÁN bằng Kalman thay vì
+#   dùng lại hộp cũ như thể vẫn đúng.
+# - Khi YOLO chạy, các phát hiện mới được ghép với track hiện có bằng
+#   IoU (thuật toán Hungarian nếu có scipy, ngược lại ghép tham lam).
+# - Mỗi track có bộ biểu quyết ký tự riêng để xác nhận độc lập.
+# =====================================================================
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy không bắt buộc
+    linear_sum_assignment = None
+
+
+def _box_to_z(box):
+    """[x1, y1, x2, y2] → [cx, cy, diện tích, tỉ lệ w/h]."""
+    w, h = box[2] - box[0], box[3] - box[1]
+    return np.array([box[0] + w / 2.0, box[1] + h / 2.0, w * h, w / float(max(h, 1e-6))])
+
+
+def _x_to_box(x):
+    """Trạng thái Kalman → [x1, y1, x2, y2]."""
+    s, r = max(x[2], 1e-6), max(x[3], 1e-6)
+    w = np.sqrt(s * r)
+    h = s / w
+    return np.array([x[0] - w / 2.0, x[1] - h / 2.0, x[0] + w / 2.0, x[1] + h / 2.0])
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Ma trận IoU giữa hai tập hộp (tính vector hoá)."""
+    if not len(boxes_a) or not len(boxes_b):
+        return np.zeros((len(boxes_a), len(boxes_b)))
+    a = np.asarray(boxes_a, dtype=np.float64)[:, None, :4]
+    b = np.asarray(boxes_b, dtype=np.float64)[None, :, :4]
+    ix1, iy1 = np.maximum(a[..., 0], b[..., 0]), np.maximum(a[..., 1], b[..., 1])
+    ix2, iy2 = np.minimum(a[..., 2], b[..., 2]), np.minimum(a[..., 3], b[..., 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+def _assign(iou, threshold):
+    """Ghép cặp (track, phát hiện) có IoU >= threshold."""
+    if iou.size == 0:
+        return []
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(-iou)
+        pairs = zip(rows, cols)
+    else:
+        # Ghép tham lam: cặp IoU lớn nhất trước
+        order = np.dstack(np.unravel_index(np.argsort(-iou, axis=None), iou.shape))[0]
+        used_r, used_c, pairs = set(), set(), []
+        for r, c in order:
+            if r not in used_r and c not in used_c:
+                used_r.add(r)
+                used_c.add(c)
+                pairs.append((r, c))
+    return [(int(r), int(c)) for r, c in pairs if iou[r, c] >= threshold]
+
+
+# ---------------------------------------------------------------------
+# MỘT TRACK BIỂN SỐ
+# ---------------------------------------------------------------------
+class PlateTrack:
+    # Ma trận của mô hình vận tốc không đổi (dùng chung cho mọi track)
+    F = np.eye(7)
+    F[0, 4] = F[1, 5] = F[2, 6] = 1.0
+    H = np.eye(4, 7)
+    Q = np.eye(7)
+    Q[4:, 4:] *= 0.01
+    Q[-1, -1] *= 0.01
+    R = np.eye(4)
+    R[2:, 2:] *= 10.0
+
+    def __init__(self, track_id, detection):
+        """Khởi tạo track từ một phát hiện [x1, y1, x2, y2, confidence]."""
+        self.id = track_id
+        self.x = np.zeros(7)
+        self.x[:4] = _box_to_z(detection)
+        self.P = np.eye(7) * 10.0
+        self.P[4:, 4:] *= 1000.0   # Chưa biết vận tốc ban đầu
+
+        self.det_confidence = float(detection[4])
+        self.hits = 1           # Số lần được YOLO xác nhận
+        self.missed = 0         # Số lần YOLO chạy mà không thấy track này
+        self.age = 0            # Số khung hình đã dự đoán
+
+        # Biểu quyết theo từng ký tự của riêng track (để xác nhận ổn định)
+        self.voter = CharVoter()
+        # Biển số đã xác nhận của track (mỗi track chỉ xác nhận một lần)
+        self.confirmed_plate = None
+
+    @property
+    def box(self):
+        """Hộp hiện tại (x1, y1, x2, y2) theo trạng thái Kalman."""
+        return _x_to_box(self.x)
+
+    def predict(self):
+        """Dự đoán vị trí ở khung hình tiếp theo."""
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        self.age += 1
+        return self.box
+
+    def update(self, detection):
+        """Cập nhật trạng thái bằng phát hiện mới của YOLO."""
+        y = _box_to_z(detection) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self.H) @ self.P
+        self.det_confidence = float(detection[4])
+        self.hits += 1
+        self.missed = 0
+
+
+# ---------------------------------------------------------------------
+# BỘ THEO DÕI NHIỀU TRACK
+# ---------------------------------------------------------------------
+class PlateTracker:
+    def __init__(self, iou_threshold=0.3, max_missed=2):
+        """
+        Khởi tạo bộ theo dõi.
+            - iou_threshold: IoU tối thiểu để ghép phát hiện với track
+            - max_missed: số lần YOLO chạy liên tiếp không thấy track thì xoá
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = []
+        self._next_id = 1
+
+    def predict(self):
+        """Dự đoán vị trí mọi track cho khung hình hiện tại."""
+        for track in self.tracks:
+            track.predict()
+        return self.tracks
+
+    def update(self, detections):
+        """
+        Ghép phát hiện mới (mảng (N, 5)) với các track đã dự đoán.
+        Track không được ghép quá max_missed lần sẽ bị xoá;
+        phát hiện không được ghép tạo track mới.
+        """
+        boxes = [t.box for t in self.tracks]
+        pairs = _assign(iou_matrix(boxes, detections), self.iou_threshold)
+
+        matched_tracks = {r for r, _ in pairs}
+        matched_dets = {c for _, c in pairs}
+        for r, c in pairs:
+            self.tracks[r].update(detections[c])
+        for i, track in enumerate(self.tracks):
+            if i not in matched_tracks:
+                track.missed += 1
+
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+        for c, det in enumerate(detections):
+            if c not in matched_dets:
+                self.tracks.append(PlateTrack(self._next_id, det))
+                self._next_id += 1
+        return self.tracks
+
+    def active_tracks(self):
+        """Các track đang được theo dõi (chưa bị YOLO bỏ lỡ)."""
+        return [t for t in self.tracks if t.missed == 0]
+
+    def get(self, track_id):
+        for track in self.tracks:
+            if track.id == track_id:
+                return track
+        return None
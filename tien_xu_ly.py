@@ -0,0 +1,128 @@
+import cv2
+import numpy as np
+
+# =====================================================================
+# TIỀN XỬ LÝ VÙNG BIỂN SỐ TRƯỚC KHI OCR
+# ---------------------------------------------------------------------
+# - Nới hộp YOLO thêm một chút (padding) để ký tự sát mép không bị cắt.
+# - Chuyển ảnh xám, tăng tương phản cục bộ bằng CLAHE.
+# - Chỉnh nghiêng: góc của tấm biển (vùng nền sáng lớn nhất sau nhị phân
+#   Otsu) lấy từ cv2.minAreaRect; chỉ xoay khi góc đủ lớn và không quá
+#   MAX_ANGLE.
+# - Không co giãn ở đây: doc_ky_tu.build_canvas đưa mọi dòng chữ về
+#   OCR_HEIGHT (bằng chiều cao đầu vào bộ nhận dạng), mọi co giãn trước
+#   đó đều bị ghi đè.
+# - Mọi phép xử lý là hàm OpenCV trên cả ảnh, ghi vào bộ đệm dùng lại
+#   (mỗi vị trí trong lô một bộ đệm): kết quả chỉ có hiệu lực tới lần
+#   gọi prepare() kế tiếp dùng cùng bộ đệm (nhiều khung trong một lần
+#   OCR thì truyền start để mỗi khung dùng các bộ đệm riêng).
+# =====================================================================
+
+PADDING = 0.06          # Tỉ lệ nới hộp mỗi phía (theo kích thước hộp)
+MIN_ANGLE = 1.5         # Góc nghiêng (độ) nhỏ hơn mức này thì bỏ qua
+MAX_ANGLE = 15.0        # Góc lớn hơn mức này coi là ước lượng sai, không xoay
+
+
+def pad_box(box, frame_shape, padding=PADDING):
+    """Nới hộp (x1, y1, x2, y2) theo tỉ lệ padding, giới hạn trong khung hình."""
+    h, w = frame_shape[:2]
+    x1, y1, x2, y2 = box
+    dx, dy = int(round((x2 - x1) * padding)), int(round((y2 - y1) * padding))
+    return max(0, x1 - dx), max(0, y1 - dy), min(w, x2 + dx), min(h, y2 + dy)
+
+
+def skew_angle(gray, min_fill=0.3):
+    """
+    Góc nghiêng (độ) của biển số trong ảnh xám, dấu theo quy ước của
+    cv2.getRotationMatrix2D (dùng trực tiếp để xoay thẳng lại).
+    Lấy hình chữ nhật bao nhỏ nhất (minAreaRect) của vùng nền sáng lớn
+    nhất (tấm biển); trả về 0.0 nếu vùng đó chiếm ít hơn min_fill ảnh.
+    """
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return 0.0
+    plate = max(contours, key=cv2.contourArea)
+    if cv2.contourArea(plate) < min_fill * gray.size:
+        return 0.0
+    # Góc của cạnh dài hình chữ nhật bao (không phụ thuộc quy ước góc của
+    # minAreaRect, vốn khác nhau giữa các phiên bản OpenCV)
+    corners = cv2.boxPoints(cv2.minAreaRect(plate))
+    edges = corners[1:3] - corners[0:2]
+    dx, dy = edges[np.argmax(np.hypot(edges[:, 0], edges[:, 1]))]
+    # y hướng xuống: biển nghiêng ngược chiều kim đồng hồ θ độ → atan2 = -θ
+    return float((np.degrees(np.arctan2(dy, dx)) + 90.0) % 180.0 - 90.0)
+
+
+class _Buffers:
+    """Bộ đệm uint8 lớn dần theo nhu cầu, cắt thành ảnh liên tục (h, w)."""
+
+    def __init__(self):
+        self._data = np.empty(0, dtype=np.uint8)
+
+    def view(self, h, w):
+        if self._data.size < h * w:
+            self._data = np.empty(int(h * w * 1.5), dtype=np.uint8)
+        return self._data[:h * w].reshape(h, w)
+
+
+class PlatePreprocessor:
+    def __init__(self, padding=PADDING, clip_limit=2.0, tile_grid=(4, 4), deskew=True):
+        """
+        Khởi tạo bộ tiền xử lý.
+            - padding: tỉ lệ nới hộp YOLO mỗi phía
+            - clip_limit, tile_grid: tham số CLAHE
+            - deskew: chỉnh nghiêng theo minAreaRect
+        """
+        self.padding = padding
+        self.deskew = deskew
+        self._clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid)
+        # Mỗi vị trí trong lô: bộ đệm ảnh xám, ảnh đã xoay
+        self._slots = []
+
+    def _slot(self, i):
+        while len(self._slots) <= i:
+            self._slots.append((_Buffers(), _Buffers()))
+        return self._slots[i]
+
+    def process(self, frame, box, slot=0):
+        """
+        Tiền xử lý một vùng biển số.
+            - frame: khung hình BGR (hoặc ảnh xám)
+            - box: (x1, y1, x2, y2) đã giới hạn trong khung hình
+        Trả về ảnh xám đã xử lý (trỏ vào bộ đệm của slot) hoặc None nếu
+        vùng rỗng.
+        """
+        x1, y1, x2, y2 = pad_box(box, frame.shape, self.padding)
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            return None
+        crop = frame[y1:y2, x1:x2]
+        h, w = crop.shape[:2]
+        gray_buf, rot_buf = self._slot(slot)
+
+        gray = gray_buf.view(h, w)
+        if crop.ndim == 3:
+            cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY, dst=gray)
+        else:
+            gray[...] = crop
+        self._clahe.apply(gray, dst=gray)
+
+        if self.deskew:
+            angle = skew_angle(gray)
+            if MIN_ANGLE <= abs(angle) <= MAX_ANGLE:
+                matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), angle, 1.0)
+                rotated = rot_buf.view(h, w)
+                cv2.warpAffine(gray, matrix, (w, h), dst=rotated, flags=cv2.INTER_LINEAR,
+                               borderMode=cv2.BORDER_REPLICATE)
+                gray = rotated
+        return gray
+
+    def prepare(self, frame, boxes, start=0):
+        """
+        Tiền xử lý nhiều vùng của cùng một khung hình (mỗi vùng một bộ đệm).
+            - start: bộ đệm đầu tiên dùng cho khung này; khi gom nhiều khung
+              vào một lần OCR, mỗi khung phải bắt đầu sau các vùng của khung
+              trước để không ghi đè lên nhau
+        Trả về danh sách ảnh theo đúng thứ tự boxes (None nếu vùng rỗng).
+        """
+        return [self.process(frame, box, start + i) for i, box in enumerate(boxes)]
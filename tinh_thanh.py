@@ -0,0 +1,135 @@
+import collections
+
+# =====================================================================
+# DANH MỤC TỈNH / THÀNH THEO MÃ BIỂN SỐ (NGUỒN DUY NHẤT)
+# ---------------------------------------------------------------------
+# - Mỗi tỉnh khai báo MỘT lần: tên có dấu, tên không dấu (cho
+#   cv2.putText — font Hershey không vẽ được dấu), vùng miền và các mã.
+# - Khi import, danh mục được dựng thành mảng 100 ô đánh chỉ số bằng mã
+#   hai chữ số, tra cứu O(1) không cần cắt chuỗi.
+# - Kiểm tra ngay khi import: mã trùng, mã ngoài 00-99, hoặc mã 11-99
+#   vừa không thuộc tỉnh nào vừa không nằm trong UNUSED_CODES → lỗi.
+# - bien_so_map.py và bien_so_map_dau.py được sinh từ danh mục này.
+# =====================================================================
+
+Province = collections.namedtuple("Province", ["name", "ascii_name", "region", "codes"])
+
+MIEN_BAC = "Miền Bắc"
+MIEN_TRUNG = "Miền Trung"
+MIEN_NAM = "Miền Nam"
+TRUNG_UONG = "Trung ương"
+
+PROVINCES = (
+    Province("Cao Bằng", "Cao Bang", MIEN_BAC, ("11",)),
+    Province("Lạng Sơn", "Lang Son", MIEN_BAC, ("12",)),
+    Province("Quảng Ninh", "Quang Ninh", MIEN_BAC, ("14",)),
+    Province("Bắc Ninh", "Bac Ninh", MIEN_BAC, ("99", "98")),
+    Province("Tuyên Quang", "Tuyen Quang", MIEN_BAC, ("22", "23")),
+    Province("Lào Cai", "Lao Cai", MIEN_BAC, ("24", "21")),
+    Province("Lai Châu", "Lai Chau", MIEN_BAC, ("25",)),
+    Province("Điện Biên", "Dien Bien", MIEN_BAC, ("27",)),
+    Province("Sơn La", "Son La", MIEN_BAC, ("26",)),
+    Province("Thái Nguyên", "Thai Nguyen", MIEN_BAC, ("20", "97")),
+    Province("Phú Thọ", "Phu Tho", MIEN_BAC, ("19", "28", "88")),
+    Province("Hà Nội", "Ha Noi", MIEN_BAC, ("29", "30", "31", "32", "33", "40")),
+    Province("Hải Phòng", "Hai Phong", MIEN_BAC, ("15", "16", "34")),
+    Province("Hưng Yên", "Hung Yen", MIEN_BAC, ("89", "17")),
+    Province("Ninh Bình", "Ninh Binh", MIEN_BAC, ("35", "18", "90")),
+    Province("Thanh Hoá", "Thanh Hoa", MIEN_TRUNG, ("36",)),
+    Province("Nghệ An", "Nghe An", MIEN_TRUNG, ("37",)),
+    Province("Hà Tĩnh", "Ha Tinh", MIEN_TRUNG, ("38",)),
+    Province("Quảng Trị", "Quang Tri", MIEN_TRUNG, ("74", "73")),
+    Province("TP Huế", "TP Hue", MIEN_TRUNG, ("75",)),
+    Province("Đà Nẵng", "Da Nang", MIEN_TRUNG, ("43", "92")),
+    Province("Quảng Ngãi", "Quang Ngai", MIEN_TRUNG, ("76", "82")),
+    Province("Gia Lai", "Gia Lai", MIEN_TRUNG, ("81", "77")),
+    Province("Đắk Lắk", "Dak Lak", MIEN_TRUNG, ("47", "78")),
+    Province("Khánh Hoà", "Khanh Hoa", MIEN_TRUNG, ("79", "85")),
+    Province("Lâm Đồng", "Lam Dong", MIEN_TRUNG, ("49", "48", "86")),
+    Province("Đồng Nai", "Dong Nai", MIEN_NAM, ("60", "39", "93")),
+    Province("TP Hồ Chí Minh", "TP Ho Chi Minh", MIEN_NAM,
+             ("41", "50", "51", "52", "53", "54", "55", "56", "57", "58", "59", "61")),
+    Province("Tây Ninh", "Tay Ninh", MIEN_NAM, ("62", "70")),
+    Province("Đồng Tháp", "Dong Thap", MIEN_NAM, ("66", "63")),
+    Province("Cần Thơ", "Can Tho", MIEN_NAM, ("65", "83", "95")),
+    Province("Vĩnh Long", "Vinh Long", MIEN_NAM, ("64", "71", "84")),
+    Province("Cà Mau", "Ca Mau", MIEN_NAM, ("69", "94")),
+    Province("An Giang", "An Giang", MIEN_NAM, ("68", "67")),
+    Province("Cục CSGT", "Cuc CSGT", TRUNG_UONG, ("80",)),
+)
+
+# Mã trong khoảng 11-99 hiện không cấp cho tỉnh nào
+UNUSED_CODES = ("13", "42", "44", "45", "46", "72", "87", "91", "96")
+
+UNKNOWN_NAME = "Không rõ địa phương"
+
+
+# ---------------------------------------------------------------------
+# DỰNG BẢNG TRA CỨU (CHẠY MỘT LẦN KHI IMPORT)
+# ---------------------------------------------------------------------
+def _build():
+    slots = [None] * 100
+    for province in PROVINCES:
+        for code in province.codes:
+            if len(code) != 2 or not code.isdigit():
+                raise ValueError(f"Mã tỉnh không hợp lệ: {code!r} ({province.name})")
+            index = int(code)
+            if slots[index] is not None:
+                raise ValueError(f"Mã tỉnh {code} bị trùng: {slots[index].name} và {province.name}")
+            slots[index] = province
+
+    for code in UNUSED_CODES:
+        if slots[int(code)] is not None:
+            raise ValueError(f"Mã {code} nằm trong UNUSED_CODES nhưng đã cấp cho {slots[int(code)].name}")
+    unused = {int(c) for c in UNUSED_CODES}
+    missing = [f"{i:02d}" for i in range(11, 100) if slots[i] is None and i not in unused]
+    if missing:
+        raise ValueError(f"Các mã tỉnh chưa được khai báo: {', '.join(missing)}")
+    return tuple(slots)
+
+
+# Mảng 100 ô: SLOTS[59] → Province("TP Hồ Chí Minh", ...), ô trống = None
+SLOTS = _build()
+
+# Chỉ mục ngược (cho thống kê): tên tỉnh → mã, vùng → tỉnh
+CODES_BY_PROVINCE = {p.name: p.codes for p in PROVINCES}
+PROVINCES_BY_REGION = {}
+for _p in PROVINCES:
+    PROVINCES_BY_REGION.setdefault(_p.region, []).append(_p.name)
+del _p
+
+# Tất cả mã hợp lệ (chuỗi hai chữ số)
+VALID_CODES = frozenset(code for p in PROVINCES for code in p.codes)
+
+
+# ---------------------------------------------------------------------
+# TRA CỨU
+# ---------------------------------------------------------------------
+def _index(plate):
+    """Chỉ số ô từ hai ký tự đầu của biển số (không tạo chuỗi con), -1 nếu không phải số."""
+    if len(plate) < 2:
+        return -1
+    a, b = ord(plate[0]) - 48, ord(plate[1]) - 48
+    if 0 <= a <= 9 and 0 <= b <= 9:
+        return a * 10 + b
+    return -1
+
+
+def lookup(plate):
+    """Province của biển số (hoặc mã tỉnh, VD: "59"), None nếu không rõ."""
+    index = _index(plate)
+    return SLOTS[index] if index >= 0 else None
+
+
+def province_name(plate, accented=True):
+    """Tên địa phương của biển số: có dấu (mặc định) hoặc không dấu (cho cv2.putText)."""
+    province = lookup(plate)
+    if province is None:
+        return UNKNOWN_NAME if accented else "Khong ro dia phuong"
+    return province.name if accented else province.ascii_name
+
+
+def region(plate):
+    """Vùng miền của biển số, None nếu không rõ."""
+    province = lookup(plate)
+    return province.region if province else None
@@ -0,0 +1,128 @@
+import math
+import cv2
+import numpy as np
+from bo_phat_hien import round_imgsz
+
+# =====================================================================
+# VÙNG QUAN TÂM (ROI) CHO TỪNG CAMERA / LÀN
+# ---------------------------------------------------------------------
+# - Camera gắn cố định: biển số chỉ xuất hiện trong một dải gần barie.
+#   Mỗi làn khai báo một đa giác (cấu hình "rois", khoá là tên làn,
+#   nguồn video hoặc "default" cho camera của giao diện).
+# - YOLO chỉ chạy trên hình chữ nhật bao sát đa giác, với imgsz tính theo
+#   DIỆN TÍCH vùng bao (cạnh của hình vuông có cùng số điểm ảnh với vùng
+#   bao ở tỉ lệ khi chạy cả khung) → số điểm ảnh đầu vào giảm theo diện
+#   tích ROI, kể cả khi backend ONNX / OpenVINO letterbox về hình vuông.
+#   Đổi lại, dải ROI dài và hẹp (VD: cả chiều ngang khung) bị thu nhỏ
+#   thêm theo cạnh dài: biển số ít điểm ảnh hơn khi chạy cả khung; cần
+#   giữ nguyên độ phân giải thì đặt roi_imgsz.
+# - Hộp tìm được đưa về toạ độ khung hình gốc; hộp có tâm nằm ngoài đa
+#   giác (xe đỗ phía sau...) bị bỏ trước khi OCR.
+# - Toạ độ đa giác tính bằng điểm ảnh, hoặc tỉ lệ 0..1 theo kích thước
+#   khung hình (khi mọi toạ độ đều không quá 1).
+# =====================================================================
+
+MIN_IMGSZ = 160
+
+
+class RegionOfInterest:
+    def __init__(self, polygon, imgsz=None, base_imgsz=640):
+        """
+        Khởi tạo vùng quan tâm.
+            - polygon: danh sách điểm [x, y] (ít nhất 3 điểm)
+            - imgsz: imgsz cố định cho vùng cắt (None = tự tính theo base_imgsz)
+            - base_imgsz: imgsz khi chạy YOLO trên cả khung hình (config["imgsz"])
+        Mặt nạ và hình chữ nhật bao được dựng ở khung hình đầu tiên (và dựng
+        lại nếu kích thước khung hình thay đổi).
+        """
+        self.polygon = np.asarray(polygon, dtype=np.float32)
+        if self.polygon.ndim != 2 or self.polygon.shape[1] != 2 or len(self.polygon) < 3:
+            raise ValueError(f"Đa giác ROI cần ít nhất 3 điểm [x, y], nhận được: {polygon!r}")
+        self.normalized = float(self.polygon.max()) <= 1.0
+        self.imgsz = imgsz
+        self.base_imgsz = base_imgsz
+
+        self._shape = None
+        self.points = None      # Đa giác theo điểm ảnh (int32)
+        self.bounds = None      # (x1, y1, x2, y2) bao sát đa giác
+        self.mask = None        # Mặt nạ uint8 kích thước khung hình (1 = trong đa giác)
+        self.crop_imgsz = None  # imgsz dùng cho vùng cắt
+        self.area_ratio = None  # Diện tích vùng cắt / diện tích khung hình
+
+    def _prepare(self, shape):
+        h, w = shape[:2]
+        points = self.polygon * (w, h) if self.normalized else self.polygon
+        points = np.round(points).astype(np.int32)
+        points[:, 0] = points[:, 0].clip(0, w - 1)
+        points[:, 1] = points[:, 1].clip(0, h - 1)
+
+        x, y, bw, bh = cv2.boundingRect(points)
+        self.points = points
+        self.bounds = (x, y, x + bw, y + bh)
+        self.mask = np.zeros((h, w), dtype=np.uint8)
+        cv2.fillPoly(self.mask, [points], 1)
+        self.area_ratio = (bw * bh) / float(w * h)
+
+        if self.imgsz:
+            self.crop_imgsz = self.imgsz
+        else:
+            # Hình vuông cùng số điểm ảnh với vùng bao khi thu nhỏ như chạy cả
+            # khung ở base_imgsz (cạnh dài làm imgsz thì dải ngang cả khung vẫn
+            # là base_imgsz và letterbox vuông không tiết kiệm được gì)
+            scaled = math.sqrt(bw * bh) * self.base_imgsz / float(max(h, w))
+            self.crop_imgsz = max(MIN_IMGSZ, min(self.base_imgsz, round_imgsz(scaled)))
+        self._shape = (h, w)
+
+    # -----------------------------------------------------------------
+    # PHÁT HIỆN TRONG VÙNG QUAN TÂM
+    # -----------------------------------------------------------------
+    def detect(self, models, frame, tiler=None):
+        """
+        Chạy YOLO (models.detect) trên vùng bao ROI. Có tiler
+        (chia_o.TiledDetector) thì vùng bao được xử lý theo ô ở độ phân
+        giải gốc thay vì thu nhỏ về crop_imgsz.
+        Trả về mảng (N, 5) theo toạ độ khung hình gốc, chỉ gồm các hộp có
+        tâm nằm trong đa giác.
+        """
+        if frame.shape[:2] != self._shape:
+            self._prepare(frame.shape)
+        x1, y1, x2, y2 = self.bounds
+        crop = frame[y1:y2, x1:x2]
+        if tiler is not None:
+            boxes = tiler.detect(models, crop)
+        else:
+            boxes = models.detect(crop, imgsz=self.crop_imgsz)
+        if not len(boxes):
+            return boxes
+        boxes = boxes.copy()
+        boxes[:, [0, 2]] += x1
+        boxes[:, [1, 3]] += y1
+        return self.filter(boxes)
+
+    def filter(self, boxes):
+        """Giữ các hộp (toạ độ khung hình gốc) có tâm nằm trong đa giác."""
+        if not len(boxes):
+            return boxes
+        h, w = self._shape
+        cx = ((boxes[:, 0] + boxes[:, 2]) / 2).astype(np.int32).clip(0, w - 1)
+        cy = ((boxes[:, 1] + boxes[:, 3]) / 2).astype(np.int32).clip(0, h - 1)
+        return boxes[self.mask[cy, cx] > 0]
+
+    def draw(self, frame, color=(255, 200, 0)):
+        """Vẽ viền đa giác lên khung hình (để căn chỉnh ROI)."""
+        if frame.shape[:2] != self._shape:
+            self._prepare(frame.shape)
+        cv2.polylines(frame, [self.points], True, color, 1)
+
+
+def region_from_config(config, *keys):
+    """
+    RegionOfInterest cho khoá đầu tiên có trong config["rois"] (tên làn,
+    nguồn video, "default"...), None nếu không khai báo ROI.
+    """
+    rois = config["rois"]
+    for key in keys:
+        if key is not None and key in rois:
+            return RegionOfInterest(rois[key], imgsz=config["roi_imgsz"] or None,
+                                    base_imgsz=config["imgsz"])
+    return None
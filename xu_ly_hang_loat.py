@@ -0,0 +1,198 @@
+import argparse
+import csv
+import datetime
+import glob
+import json
+import multiprocessing
+import os
+import sys
+from doc_ky_tu import OCR_MODES
+
+# =====================================================================
+# NHẬN DIỆN BIỂN SỐ HÀNG LOẠT (KHÔNG GIAO DIỆN)
+# ---------------------------------------------------------------------
+# - Đầu vào: thư mục ảnh, mẫu glob (VD: "anh/**/*.jpg") hoặc file video.
+# - Công việc được chia cho một nhóm tiến trình; mỗi tiến trình chỉ tải
+#   mô hình YOLO và EasyOCR MỘT lần khi khởi động.
+# - Kết quả được ghi dần ra JSONL hoặc CSV ngay khi có.
+#
+# Ví dụ:
+#   python xu_ly_hang_loat.py anh_luu_tru/ --workers 8 --output ket_qua.jsonl
+#   python xu_ly_hang_loat.py camera_cong.mp4 --format csv --video-stride 5
+# =====================================================================
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+VIDEO_EXTS = (".mp4", ".avi", ".mkv", ".mov", ".ts")
+
+FIELDS = ["plate", "province", "box", "confidence", "det_confidence",
+          "timestamp", "source", "frame", "offset_s"]
+
+# PlateRecognizer riêng của mỗi tiến trình con (khởi tạo trong _init_worker)
+_recognizer = None
+
+
+# ---------------------------------------------------------------------
+# TIẾN TRÌNH CON
+# ---------------------------------------------------------------------
+def _init_worker(ocr_mode, threads_per_worker):
+    """Tải mô hình một lần cho mỗi tiến trình con."""
+    global _recognizer
+    import cv2
+    # Tránh mỗi tiến trình tự mở quá nhiều luồng (tranh chấp CPU)
+    cv2.setNumThreads(1)
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+
+    from cau_hinh import load_config
+    from chuc_nang import PlateRecognizer
+    # read_frame không dùng bộ đệm kết quả ảnh: không mở một kết nối cho mỗi tiến trình
+    _recognizer = PlateRecognizer(ocr_mode=ocr_mode, camera_index=None, config=load_config(result_cache=""))
+
+
+def _records(plates, source, frame_index=None, offset_s=None):
+    """Gắn thông tin nguồn và thời gian cho các biển số đọc được."""
+    now = datetime.datetime.now().isoformat(timespec="milliseconds")
+    for plate in plates:
+        plate.update(timestamp=now, source=source, frame=frame_index, offset_s=offset_s)
+    return plates
+
+
+def _process_task(task):
+    """Xử lý một công việc: một ảnh hoặc một đoạn video."""
+    import cv2
+
+    if task[0] == "image":
+        _, path = task
+        frame = cv2.imread(path)
+        if frame is None:
+            return [{"source": path, "error": "Không thể đọc ảnh"}]
+        return _records(_recognizer.read_frame(frame), path)
+
+    _, path, start, end, stride, fps = task
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    records = []
+    index = start
+    while index < end:
+        # grab() rẻ hơn read() với các khung hình bị bỏ qua
+        if (index - start) % stride:
+            if not cap.grab():
+                break
+            index += 1
+            continue
+        ret, frame = cap.read()
+        if not ret:
+            break
+        offset = round(index / fps, 3) if fps else None
+        records.extend(_records(_recognizer.read_frame(frame), path, index, offset))
+        index += 1
+    cap.release()
+    return records
+
+
+# ---------------------------------------------------------------------
+# CHUẨN BỊ DANH SÁCH CÔNG VIỆC
+# ---------------------------------------------------------------------
+def _expand_inputs(inputs):
+    """Chuyển thư mục / glob / file thành danh sách đường dẫn cụ thể."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, f) for f in sorted(files))
+        elif glob.has_magic(item):
+            paths.extend(sorted(glob.glob(item, recursive=True)))
+        else:
+            paths.append(item)
+    return [p for p in paths if p.lower().endswith(IMAGE_EXTS + VIDEO_EXTS)]
+
+
+def _build_tasks(paths, stride, chunk_frames):
+    """Tạo công việc: mỗi ảnh là một việc, mỗi video được chia thành nhiều đoạn."""
+    import cv2
+
+    tasks = []
+    for path in paths:
+        if path.lower().endswith(IMAGE_EXTS):
+            tasks.append(("image", path))
+            continue
+        cap = cv2.VideoCapture(path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        cap.release()
+        if total <= 0:
+            print(f"⚠️ Không đọc được số khung hình của video: {path}", file=sys.stderr)
+            continue
+        # Độ dài mỗi đoạn là bội số của stride để không lệch nhịp lấy mẫu
+        chunk = max(stride, chunk_frames - chunk_frames % stride)
+        for start in range(0, total, chunk):
+            tasks.append(("video", path, start, min(start + chunk, total), stride, fps))
+    return tasks
+
+
+# ---------------------------------------------------------------------
+# GHI KẾT QUẢ
+# ---------------------------------------------------------------------
+class _Writer:
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(stream, fieldnames=FIELDS + ["error"], extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, record):
+        if self.fmt == "csv":
+            row = dict(record)
+            if "box" in row:
+                row["box"] = " ".join(str(v) for v in row["box"])
+            self.csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nhận diện biển số hàng loạt không cần giao diện")
+    parser.add_argument("inputs", nargs="+", help="Thư mục ảnh, mẫu glob hoặc file video")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Số tiến trình xử lý (mặc định: số nhân CPU)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("--output", default="-", help="File kết quả (mặc định: stdout)")
+    parser.add_argument("--ocr-mode", default="rows", choices=OCR_MODES)
+    parser.add_argument("--video-stride", type=int, default=5,
+                        help="Chỉ xử lý 1 trên N khung hình của video")
+    parser.add_argument("--chunk-frames", type=int, default=600,
+                        help="Số khung hình video trong mỗi công việc")
+    args = parser.parse_args(argv)
+
+    stride = max(1, args.video_stride)
+    workers = max(1, args.workers)
+    tasks = _build_tasks(_expand_inputs(args.inputs), stride, args.chunk_frames)
+    if not tasks:
+        print("⚠️ Không tìm thấy ảnh hoặc video nào.", file=sys.stderr)
+        return 1
+
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    writer = _Writer(stream, args.format)
+
+    # "spawn" để mỗi tiến trình con tự tải mô hình (an toàn với CUDA/torch)
+    context = multiprocessing.get_context("spawn")
+    try:
+        with context.Pool(workers, initializer=_init_worker,
+                          initargs=(args.ocr_mode, threads_per_worker)) as pool:
+            for records in pool.imap_unordered(_process_task, tasks):
+                for record in records:
+                    writer.write(record)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import sys
+import time
+from cau_hinh import load_config
+
+# =====================================================================
+# XUẤT VÀ KIỂM TRA MÔ HÌNH PHÁT HIỆN BIỂN SỐ CHO CPU
+# ---------------------------------------------------------------------
+# 1. Xuất best.pt sang ONNX và/hoặc OpenVINO (ultralytics export).
+# 2. (Tuỳ chọn) Lượng tử hoá động INT8 mô hình ONNX (onnxruntime).
+# 3. Kiểm tra:
+#    - mAP trên tập validation (--data) cho từng backend so với PyTorch
+#    - Độ khớp hộp và độ trễ trên một thư mục ảnh mẫu (--images)
+#
+# Ví dụ:
+#   python xuat_mo_hinh.py --formats onnx openvino --int8 \
+#       --data data.yaml --images anh_mau/ --report bao_cao_xuat.json
+# Sau đó chọn backend bằng BIEN_SO_DETECTOR_BACKEND=onnxruntime (hoặc openvino)
+# và BIEN_SO_DETECTOR_PATH nếu dùng file INT8 (best_int8.onnx).
+# =====================================================================
+
+
+def export_models(weights, formats, imgsz):
+    """Xuất best.pt sang các định dạng yêu cầu, trả về {backend: đường dẫn}."""
+    from ultralytics import YOLO
+
+    exported = {"torch": weights}
+    for fmt in formats:
+        model = YOLO(weights)
+        if fmt == "onnx":
+            exported["onnxruntime"] = model.export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        elif fmt == "openvino":
+            exported["openvino"] = model.export(format="openvino", imgsz=imgsz)
+        print(f"✔ Đã xuất {fmt}: {exported.get('onnxruntime' if fmt == 'onnx' else fmt)}")
+    return exported
+
+
+def quantize_int8(onnx_path, op_types=("Conv", "MatMul")):
+    """Lượng tử hoá động INT8 (mặc định Conv + MatMul) cho mô hình ONNX."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output = os.path.splitext(onnx_path)[0] + "_int8.onnx"
+    quantize_dynamic(onnx_path, output, weight_type=QuantType.QUInt8,
+                     op_types_to_quantize=list(op_types))
+    print(f"✔ Đã lượng tử INT8: {output}")
+    return output
+
+
+def validate_map(paths, data, imgsz):
+    """Đo mAP50 / mAP50-95 trên tập validation cho từng mô hình."""
+    from ultralytics import YOLO
+
+    metrics = {}
+    for name, path in paths.items():
+        result = YOLO(path, task="detect").val(data=data, imgsz=imgsz, batch=1,
+                                              device="cpu", plots=False, verbose=False)
+        metrics[name] = {"map50": float(result.box.map50), "map50_95": float(result.box.map)}
+    base = metrics.get("torch")
+    if base:
+        for m in metrics.values():
+            m["delta_map50_95"] = m["map50_95"] - base["map50_95"]
+    return metrics
+
+
+def _iou(a, b):
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def compare_on_images(paths, image_dir, config):
+    """
+    Chạy từng backend trên ảnh mẫu, so hộp với PyTorch:
+        - box_match: tỉ lệ hộp PyTorch có hộp tương ứng (IoU >= 0.5)
+        - latency_ms: độ trễ trung bình mỗi ảnh
+    """
+    import cv2
+    from bo_phat_hien import create_detector
+
+    files = sorted(f for f in os.listdir(image_dir) if f.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")))
+    frames = [cv2.imread(os.path.join(image_dir, f)) for f in files]
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        raise ValueError(f"Không có ảnh đọc được (.jpg/.jpeg/.png/.bmp) trong thư mục: {image_dir}")
+
+    boxes, report = {}, {}
+    for name, path in paths.items():
+        cfg = dict(config, detector_backend=name, model_path=paths["torch"],
+                   detector_path="" if name == "torch" else path)
+        detector = create_detector(cfg)
+        detector.detect(frames[0])  # làm nóng
+        start = time.perf_counter()
+        boxes[name] = [detector.detect(f) for f in frames]
+        report[name] = {"latency_ms": (time.perf_counter() - start) * 1000 / len(frames)}
+
+    for name in boxes:
+        matched = total = 0
+        for ref, got in zip(boxes["torch"], boxes[name]):
+            total += len(ref)
+            matched += sum(1 for r in ref if any(_iou(r, g) >= 0.5 for g in got))
+        report[name]["box_match"] = matched / total if total else 1.0
+    return report
+
+
+def main(argv=None):
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Xuất và kiểm tra mô hình phát hiện biển số cho CPU")
+    parser.add_argument("--weights", default=config["model_path"], help="Đường dẫn best.pt")
+    parser.add_argument("--formats", nargs="+", default=["onnx"], choices=("onnx", "openvino"))
+    parser.add_argument("--imgsz", type=int, default=config["imgsz"])
+    parser.add_argument("--int8", action="store_true", help="Lượng tử hoá INT8 mô hình ONNX")
+    parser.add_argument("--data", help="data.yaml của tập validation để đo mAP")
+    parser.add_argument("--images", help="Thư mục ảnh mẫu để so hộp và đo độ trễ")
+    parser.add_argument("--report", help="Ghi báo cáo JSON ra file")
+    args = parser.parse_args(argv)
+
+    paths = export_models(args.weights, args.formats, args.imgsz)
+    if args.int8 and "onnxruntime" in paths:
+        paths["onnxruntime_int8"] = quantize_int8(paths["onnxruntime"])
+
+    report = {"models": paths}
+    if args.data:
+        report["map"] = validate_map(paths, args.data, args.imgsz)
+    if args.images:
+        backends = {k: v for k, v in paths.items() if not k.endswith("_int8")}
+        report["images"] = compare_on_images(backends, args.images, config)
+        if "onnxruntime_int8" in paths:
+            # Bản INT8 chạy bằng backend onnxruntime, so với cùng mốc PyTorch
+            int8 = compare_on_images({"torch": args.weights, "onnxruntime": paths["onnxruntime_int8"]},
+                                     args.images, config)
+            report["images"]["onnxruntime_int8"] = int8["onnxruntime"]
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
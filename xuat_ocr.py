@@ -0,0 +1,219 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from cau_hinh import load_config
+from bo_nhan_dang import OnnxRecognizer, PLATE_CHARSET, RECOG_HEIGHT, create_easyocr, metadata_path
+from chuan_hoa_bien_so import normalize_plate
+from doc_ky_tu import read_plates
+from xuat_mo_hinh import quantize_int8
+
+# =====================================================================
+# XUẤT VÀ KIỂM TRA BỘ NHẬN DẠNG KÝ TỰ (OCR) CHO CPU
+# ---------------------------------------------------------------------
+# 1. Xuất bộ nhận dạng CRNN của easyocr.Reader sang ONNX (chiều rộng ảnh
+#    động) kèm file .json chứa bảng ký tự.
+#    Trước khi lượng tử hoá, logits của ONNX FP32 được so với PyTorch trên
+#    vài ảnh (--parity-tol); lệch quá ngưỡng thì dừng, không xuất INT8.
+# 2. (Tuỳ chọn) Lượng tử hoá động INT8 (Conv + MatMul + LSTM).
+# 3. Kiểm tra trên thư mục ảnh vùng biển số (--crops):
+#    - plate_accuracy: tỉ lệ đọc đúng cả biển số (so với nhãn, nếu có)
+#    - agreement: tỉ lệ đọc giống hệt easyocr (PyTorch)
+#    - latency_ms_per_crop: độ trễ trung bình / p90 mỗi vùng biển số
+#    Nhãn: file CSV (--labels, cột file, plate) hoặc tên file là biển số
+#    (VD: 59X112345.jpg).
+#
+# Ví dụ:
+#   python xuat_ocr.py --int8 --crops vung_bien_so/ --report bao_cao_ocr.json
+# Sau đó chọn BIEN_SO_OCR_BACKEND=onnxruntime (mặc định dùng nhan_dang_int8.onnx).
+# =====================================================================
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+PARITY_TOL = 1e-3   # Sai khác tuyệt đối lớn nhất cho phép giữa logits ONNX và PyTorch
+
+
+def _recognizer_module(reader):
+    """
+    Mô hình nhận dạng của easyocr.Reader ở dạng FP32 trên CPU.
+    Mọi mô hình CTC của EasyOCR (easyocr/model/model.py, vgg_model.py) có
+    forward(self, input, text) và không dùng text; kiểm tra chữ ký để
+    phát hiện sớm khi phiên bản EasyOCR khác thay đổi giao diện này.
+    """
+    import inspect
+
+    model = reader.recognizer
+    model = getattr(model, "module", model)  # Bỏ DataParallel (khi chạy GPU)
+    params = list(inspect.signature(model.forward).parameters)
+    if params != ["input", "text"]:
+        raise RuntimeError(f"forward của bộ nhận dạng EasyOCR có chữ ký khác mong đợi "
+                           f"(input, text): {params}; cần cập nhật xuat_ocr.py")
+    return model.float().cpu().eval()
+
+
+def export_recognizer(reader, output):
+    """Xuất bộ nhận dạng của easyocr.Reader sang ONNX, ghi bảng ký tự ra file .json."""
+    import torch
+
+    model = _recognizer_module(reader)
+
+    class _Recognizer(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, image):
+            # Mô hình CTC của EasyOCR không dùng tham số text
+            return self.inner(image, None)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    dummy = torch.zeros(1, 1, RECOG_HEIGHT, 256)
+    torch.onnx.export(
+        _Recognizer(model), dummy, output,
+        input_names=["image"], output_names=["logits"],
+        dynamic_axes={"image": {0: "batch", 3: "width"}, "logits": {0: "batch", 1: "steps"}},
+        opset_version=13,
+    )
+    with open(metadata_path(output), "w", encoding="utf-8") as f:
+        json.dump({"character": reader.character, "height": RECOG_HEIGHT}, f, ensure_ascii=False)
+    print(f"✔ Đã xuất bộ nhận dạng: {output}")
+    return output
+
+
+def check_parity(reader, onnx_path, images=None, tol=PARITY_TOL):
+    """
+    So logits của mô hình ONNX vừa xuất với PyTorch trên cùng đầu vào.
+    images: ảnh xám một dòng (mặc định: vài ảnh ngẫu nhiên với chiều rộng khác nhau).
+    Trả về sai khác tuyệt đối lớn nhất; lớn hơn tol thì báo lỗi.
+    """
+    import torch
+
+    model = _recognizer_module(reader)
+    onnx_model = OnnxRecognizer(onnx_path)
+    if not images:
+        rng = np.random.default_rng(0)
+        images = [rng.integers(0, 256, (RECOG_HEIGHT, width), dtype=np.uint8) for width in (96, 256, 400)]
+    max_diff = 0.0
+    for image in images:
+        blob = onnx_model._prepare([image])
+        expected = model(torch.from_numpy(blob), None).detach().numpy()
+        actual = onnx_model.session.run(None, {onnx_model.input_name: blob})[0]
+        if expected.shape != actual.shape:
+            raise RuntimeError(f"Đầu ra ONNX {actual.shape} khác PyTorch {expected.shape}")
+        max_diff = max(max_diff, float(np.abs(expected - actual).max()))
+    if max_diff > tol:
+        raise RuntimeError(f"Mô hình ONNX lệch PyTorch: max |Δlogits| = {max_diff:.2e} > {tol:.0e}")
+    print(f"✔ ONNX FP32 khớp PyTorch: max |Δlogits| = {max_diff:.2e}")
+    return max_diff
+
+
+def _load_crops(crop_dir, labels_path=None):
+    """Đọc ảnh vùng biển số và nhãn (biển số chuẩn hoá hoặc None)."""
+    labels = {}
+    if labels_path:
+        with open(labels_path, encoding="utf-8-sig", newline="") as f:
+            labels = {row["file"]: row["plate"] for row in csv.DictReader(f)}
+    crops = []
+    for name in sorted(os.listdir(crop_dir)):
+        if not name.lower().endswith(IMAGE_EXTS):
+            continue
+        image = cv2.imread(os.path.join(crop_dir, name))
+        if image is None:
+            continue
+        label = labels.get(name, os.path.splitext(name)[0])
+        crops.append((name, image, normalize_plate(label)))
+    return crops
+
+
+def compare_backends(readers, crops, mode="rows", allowlist=PLATE_CHARSET):
+    """
+    Đọc từng vùng bằng mỗi backend, so với nhãn và với easyocr.
+    readers: {tên: đối tượng có recognize/readtext}, nên có "easyocr".
+    """
+    images = [image for _, image, _ in crops]
+    labelled = [label for _, _, label in crops]
+    plates = {}
+    report = {}
+    for name, reader in readers.items():
+        # Như khi chạy thật: allowlist chỉ áp dụng cho bộ nhận dạng ONNX
+        charset = None if name == "easyocr" else allowlist
+        read_plates(reader, images[:1], mode, allowlist=charset)  # làm nóng
+        latencies, reads = [], []
+        for image in images:
+            start = time.perf_counter()
+            text, _ = read_plates(reader, [image], mode, allowlist=charset)[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            reads.append(normalize_plate(text))
+        plates[name] = reads
+        report[name] = {
+            "latency_ms_per_crop": round(float(np.mean(latencies)), 3),
+            "latency_p90_ms": round(float(np.percentile(latencies, 90)), 3),
+        }
+        scored = [(r, l) for r, l in zip(reads, labelled) if l is not None]
+        if scored:
+            report[name]["plate_accuracy"] = round(sum(r == l for r, l in scored) / len(scored), 4)
+
+    base = plates.get("easyocr")
+    for name, reads in plates.items():
+        if base is not None:
+            report[name]["agreement"] = round(sum(a == b for a, b in zip(reads, base)) / len(reads), 4)
+        if "easyocr" in report and name != "easyocr":
+            report[name]["speedup"] = round(
+                report["easyocr"]["latency_ms_per_crop"] / report[name]["latency_ms_per_crop"], 2)
+    return report
+
+
+def main(argv=None):
+    config = load_config()
+    default_fp32 = config["ocr_model_path"].replace("_int8.onnx", ".onnx")
+    parser = argparse.ArgumentParser(description="Xuất và kiểm tra bộ nhận dạng OCR (ONNX / INT8)")
+    parser.add_argument("--output", default=default_fp32, help="File ONNX xuất ra")
+    parser.add_argument("--int8", action="store_true", help="Lượng tử hoá động INT8")
+    parser.add_argument("--crops", help="Thư mục ảnh vùng biển số để so độ chính xác và độ trễ")
+    parser.add_argument("--labels", help="CSV nhãn (cột file, plate); mặc định lấy từ tên file")
+    parser.add_argument("--mode", default=config["ocr_mode"], choices=("rows", "crop"))
+    parser.add_argument("--threads", type=int, default=0, help="Số luồng ONNX Runtime (0 = mặc định)")
+    parser.add_argument("--parity-tol", type=float, default=PARITY_TOL,
+                        help="Sai khác logits tối đa giữa ONNX FP32 và PyTorch")
+    parser.add_argument("--report", help="Ghi báo cáo JSON ra file")
+    args = parser.parse_args(argv)
+
+    # So sánh trên CPU: đây là nơi backend ONNX được dùng
+    reader = create_easyocr(config, gpu=False)
+    paths = {"onnxruntime": export_recognizer(reader, args.output)}
+    # Kiểm tra bản FP32 trước khi lượng tử hoá (ưu tiên ảnh vùng biển số thật)
+    crops = _load_crops(args.crops, args.labels) if args.crops else []
+    samples = [cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) for _, image, _ in crops[:8]]
+    try:
+        parity = check_parity(reader, paths["onnxruntime"], samples, args.parity_tol)
+    except RuntimeError as exc:
+        print(f"⚠️ {exc}", file=sys.stderr)
+        return 1
+    if args.int8:
+        int8 = quantize_int8(paths["onnxruntime"], op_types=("Conv", "MatMul", "LSTM"))
+        with open(metadata_path(args.output), encoding="utf-8") as f:
+            meta = f.read()
+        with open(metadata_path(int8), "w", encoding="utf-8") as f:
+            f.write(meta)
+        paths["onnxruntime_int8"] = int8
+
+    report = {"models": paths, "fp32_max_abs_diff": parity}
+    if args.crops:
+        readers = {"easyocr": reader}
+        for name, path in paths.items():
+            readers[name] = OnnxRecognizer(path, threads=args.threads)
+        report["crops"] = compare_backends(readers, crops, args.mode,
+                                           config["ocr_charset"] or None)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())